@@ -1,29 +1,150 @@
 from flask import Flask, render_template, request, redirect, url_for, session, jsonify
-import numpy as np
-import pandas as pd
-import pickle
 import os
+import secrets
+import threading
 from datetime import datetime
-from career_engine import CareerEngine, process_career_recommendation
+from model_registry import ModelRegistry
+from prediction_cache import PredictionCache, SharedPredictionStore, pack_responses
+from quiz_schema import QUESTION_COLUMNS, career_label_to_name, validate_answers
+from request_profiler import RequestProfiler
+from request_metrics import MetricsExporter, instrument_app, instrument_session_interface, metrics, stage
 from roadmap_data import get_roadmap
+from session_store import ServerSideSessionInterface, SQLiteSessionStore
+
+# numpy, pandas, scikit-learn and the model are imported lazily (see model_registry)
+# so worker boot and page routes like / or /quiz don't pay for them
 
 app = Flask(__name__, static_folder='.', static_url_path='')
 app.secret_key = 'your-secret-key-here-change-in-production'  # Required for sessions
 
+# Session payloads live server-side; the cookie only carries a signed session ID
+session_db_path = os.environ.get('JOBSENSEI_SESSION_DB', 'sessions.sqlite3')
+app.session_interface = instrument_session_interface(
+    ServerSideSessionInterface(SQLiteSessionStore(session_db_path))
+)
+
+# Latency histograms for /metrics; with a directory set, every gunicorn worker
+# dumps its counts there and a scrape of any worker returns the merged totals
+metrics_dir = os.environ.get('JOBSENSEI_METRICS_DIR')
+metrics_exporter = MetricsExporter(metrics, metrics_dir)
+instrument_app(app, metrics_exporter)
+
+# On-demand profiling of live requests (armed through /api/admin/profile);
+# output goes to this directory as .pstats or collapsed-stack files
+profile_dir = os.environ.get('JOBSENSEI_PROFILE_DIR', 'profiles')
+request_profiler = RequestProfiler(app, profile_dir)
+
 # Define the model path - use relative path for better portability
 model_path = 'career_recommendation_model.pkl'
 
-# Load model with error handling
-try:
-    with open(model_path, 'rb') as file:
-        model = pickle.load(file)
-    print(f"Model loaded successfully from {model_path}")
-except Exception as e:
-    print(f"Error loading model: {str(e)}")
-    model = None
+# Compiled, memory-mapped export of the model (python forest_compiler.py);
+# workers map it read-only and share one page-cache copy of the trees
+compiled_model_dir = os.environ.get('JOBSENSEI_COMPILED_MODEL_DIR', 'career_model_compiled')
+
+# Explain each recommended career by the answers that drove the forest towards
+# it (forest_explainer.py); set to 0 for the answers-scored-4-or-5 text
+EXPLANATIONS_ENABLED = os.environ.get('JOBSENSEI_EXPLANATIONS', '1') == '1'
+
+# Load the model in a background thread on a worker's first request instead of
+# at import; set to 0 to load only when /predict first needs it
+MODEL_WARMUP = os.environ.get('JOBSENSEI_MODEL_WARMUP', '1') == '1'
+
+# Poll the model files every N seconds and hot-swap retrained versions (0 = off)
+MODEL_WATCH_SECONDS = float(os.environ.get('JOBSENSEI_MODEL_WATCH_SECONDS', 0))
+
+# Token for admin endpoints such as /api/admin/reload-model (unset = disabled)
+ADMIN_TOKEN = os.environ.get('JOBSENSEI_ADMIN_TOKEN')
+
+model_registry = ModelRegistry(model_path, compiled_model_dir)
+
+_warmup_pid = None
+_watch_pid = None
+_warmup_lock = threading.Lock()
+
+def load_model():
+    """Current model version, loading the first one if needed (None if unavailable)"""
+    return model_registry.ensure_loaded()
+
+def start_model_warmup():
+    """Load the model in a daemon thread, once per process"""
+    global _warmup_pid
+    with _warmup_lock:
+        if _warmup_pid == os.getpid():
+            return
+        _warmup_pid = os.getpid()
+    threading.Thread(target=load_model, name='model-warmup', daemon=True).start()
+
+def start_model_watcher():
+    """Start the model file watcher, once per process; it idles until the first load"""
+    global _watch_pid
+    with _warmup_lock:
+        if _watch_pid == os.getpid():
+            return
+        _watch_pid = os.getpid()
+    model_registry.start_watching(MODEL_WATCH_SECONDS)
+
+@app.before_request
+def _warm_up_model():
+    # Started on a worker's first request rather than at import so no thread
+    # crosses gunicorn's fork; the request itself never waits for them. The
+    # watcher runs whether or not warm-up is on (the model then loads lazily)
+    if MODEL_WARMUP and _warmup_pid != os.getpid():
+        start_model_warmup()
+    if MODEL_WATCH_SECONDS > 0 and _watch_pid != os.getpid():
+        start_model_watcher()
 
 # Column names for the features
-columns = [f'Q{i}' for i in range(1, 21)]  # Q1 to Q20
+columns = QUESTION_COLUMNS  # Q1 to Q20
+
+# Upper bound on rows accepted by the batch prediction endpoint
+MAX_BATCH_ROWS = 100000
+
+# Optional micro-batching of concurrent /predict calls (useful with threaded workers)
+MICROBATCH_ENABLED = os.environ.get('JOBSENSEI_MICROBATCH', '0') == '1'
+MICROBATCH_MAX_ROWS = int(os.environ.get('JOBSENSEI_MICROBATCH_MAX_ROWS', 64))
+MICROBATCH_WINDOW_MS = float(os.environ.get('JOBSENSEI_MICROBATCH_WINDOW_MS', 2))
+
+# Memoized single-row predictions: in-process LRU entries (0 disables the cache),
+# TTL, and an optional SQLite store shared by all workers ('' = process-local only)
+PREDICTION_CACHE_SIZE = int(os.environ.get('JOBSENSEI_PREDICTION_CACHE_SIZE', 4096))
+PREDICTION_CACHE_TTL = float(os.environ.get('JOBSENSEI_PREDICTION_CACHE_TTL', 3600))
+PREDICTION_CACHE_DB = os.environ.get('JOBSENSEI_PREDICTION_CACHE_DB', 'prediction_cache.sqlite3')
+PREDICTION_CACHE_SHARED_SIZE = int(os.environ.get('JOBSENSEI_PREDICTION_CACHE_SHARED_SIZE', 100000))
+
+prediction_cache = None
+if PREDICTION_CACHE_SIZE > 0:
+    shared_store = None
+    if PREDICTION_CACHE_DB:
+        try:
+            shared_store = SharedPredictionStore(PREDICTION_CACHE_DB, PREDICTION_CACHE_SHARED_SIZE)
+        except Exception as e:
+            print(f"Shared prediction cache disabled: {str(e)}")
+    prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL, shared_store)
+
+def predict_proba_one(current, responses):
+    """Score a single response vector with one model version, using the prediction cache when enabled"""
+    key = pack_responses(responses) if prediction_cache is not None else None
+    if key is None:
+        return _score_one(current, responses)
+
+    proba = prediction_cache.get(current.version, key)
+    if proba is None:
+        proba = _score_one(current, responses)
+        prediction_cache.put(current.version, key, proba)
+    return proba
+
+def _score_one(current, responses):
+    # Coalesces with concurrent requests when micro-batching is enabled
+    if MICROBATCH_ENABLED:
+        import numpy as np
+        try:
+            future = current.get_batcher(MICROBATCH_MAX_ROWS, MICROBATCH_WINDOW_MS / 1000.0).submit(
+                np.asarray(responses, dtype=np.int64))
+        except RuntimeError:
+            # This version was swapped out and its batcher closed; score directly
+            return current.predict_proba([responses])[0]
+        return future.result()
+    return current.predict_proba([responses])[0]
 
 # Career explanations
 career_descriptions = {
@@ -51,6 +172,165 @@ career_descriptions = {
 # Default explanation for careers not in our dictionary
 default_explanation = "This career aligns with your personality traits and preferences based on the psychometric assessment patterns of professionals in this field."
 
+# Quiz statements in column order (Q1 to Q20)
+QUIZ_QUESTIONS = (
+    "I enjoy solving complex logical and mathematical problems",
+    "I can work on the same task consistently for long periods",
+    "I prefer structured, step-by-step approaches to problem-solving",
+    "I get frustrated when requirements keep changing",
+    "I enjoy creating visual designs and user interfaces",
+    "I like experimenting with new ideas and approaches",
+    "I prefer seeing quick results from my work",
+    "I'm comfortable with ambiguous or unclear requirements",
+    "I can maintain focus on long-term goals without immediate rewards",
+    "I enjoy learning new technologies independently",
+    "I prefer detailed documentation and clear instructions",
+    "I'm comfortable making decisions with incomplete information",
+    "I can stay motivated even when progress is slow",
+    "I enjoy teaching or explaining concepts to others",
+    "I prefer working on one project deeply rather than multiple projects",
+    "I'm comfortable with trial-and-error learning",
+    "I enjoy optimizing and improving existing systems",
+    "I prefer creative freedom over following strict guidelines",
+    "I'm patient with debugging and troubleshooting",
+    "I enjoy competitive environments and challenges"
+)
+
+# Short trait for each quiz statement, used in explanations ("Your strengths
+# in ..." and the answers that drove a recommendation)
+SKILL_NAMES = (
+    "logical problem-solving",
+    "sustained focus on one task",
+    "structured approaches",
+    "preference for stable requirements",
+    "visual design",
+    "experimenting with new ideas",
+    "drive for quick results",
+    "comfort with ambiguity",
+    "long-term focus",
+    "independent learning",
+    "preference for clear instructions",
+    "deciding with incomplete information",
+    "persistence",
+    "teaching and explaining",
+    "deep work on one project",
+    "trial-and-error learning",
+    "optimizing systems",
+    "creative freedom",
+    "patience with debugging",
+    "competitive drive"
+)
+
+# Number of careers shown on the result page
+TOP_N = 5
+
+# Display names and explanations aligned with each model version's classes_
+_class_tables = {}
+_class_tables_lock = threading.Lock()
+
+def class_tables(current):
+    """(names, explanations) object arrays in class order, built once per model version"""
+    tables = _class_tables.get(current.version)
+    if tables is None:
+        import numpy as np
+        names = np.array([career_label_to_name.get(job, job) for job in current.classes_], dtype=object)
+        explanations = np.array([career_descriptions.get(job, default_explanation) for job in current.classes_],
+                                dtype=object)
+        tables = (names, explanations)
+        with _class_tables_lock:
+            # Tables of replaced model versions are dropped
+            _class_tables.clear()
+            _class_tables[current.version] = tables
+    return tables
+
+def top_k_indices(proba, k):
+    """Indices of the k largest probabilities, descending, ties in class order (like a stable sort)"""
+    import numpy as np
+    if k >= len(proba):
+        return np.argsort(-proba, kind='stable')[:k]
+    # argpartition may pick any of several tied values at the boundary, so
+    # keep every candidate >= the k-th value and order them exactly
+    kth = -np.partition(-proba, k - 1)[k - 1]
+    candidates = np.flatnonzero(proba >= kth)
+    return candidates[np.argsort(-proba[candidates], kind='stable')][:k]
+
+def career_contributions(current, responses, class_indices):
+    """
+    Per-question contributions (forest_explainer.py) to the given classes
+
+    Args:
+        current: LoadedModel
+        responses: One response vector (class_indices of shape (k,)) or an
+            (N, 20) array (class_indices of shape (N, k))
+
+    Returns:
+        Contributions of shape (k, 20) or (N, k, 20), or None when the served
+        model keeps no internal node distributions (compact bundles)
+    """
+    import numpy as np
+    from forest_explainer import explain_batch, explain_one, supports_explanations
+    if not supports_explanations(current.compiled_model):
+        return None
+    if np.ndim(class_indices) == 1:
+        return explain_one(current.compiled_model, responses, class_indices)[1]
+    return explain_batch(current.compiled_model, responses, class_indices)[1]
+
+def career_drivers(contributions, n=3):
+    """Questions that raised a career's probability most, as JSON-ready dicts"""
+    from forest_explainer import top_drivers
+    return [
+        {'question': columns[i], 'text': QUIZ_QUESTIONS[i], 'skill': SKILL_NAMES[i],
+         'contribution': round(float(contributions[i]) * 1000, 2)}
+        for i in top_drivers(contributions, n).tolist() if contributions[i] > 0
+    ]
+
+def build_recommendations(current, proba, responses, explain=None):
+    """Top careers for one response vector, with display names and explanations (explain defaults to JOBSENSEI_EXPLANATIONS)"""
+    import numpy as np
+    names, explanations = class_tables(current)
+    top_idx = top_k_indices(proba, TOP_N)
+    scores = np.round(proba[top_idx] * 1000, 2)
+
+    # Strength-based insight: up to 3 skills the user scored high (4 or 5) on
+    relevant_skills = [SKILL_NAMES[i] for i, response in enumerate(responses) if response >= 4][:3]
+    suffix = ""
+    if relevant_skills:
+        suffix = "<br><br>Your strengths in " + ", ".join(relevant_skills) + " are particularly valuable in this career path."
+
+    if explain is None:
+        explain = EXPLANATIONS_ENABLED
+    contributions = None
+    if explain:
+        with stage('explanation'):
+            contributions = career_contributions(current, responses, top_idx)
+    if contributions is None:
+        return [
+            {
+                'career': name,
+                'confidence': score,
+                'explanation': explanation + suffix
+            }
+            for name, explanation, score in zip(names[top_idx], explanations[top_idx], scores)
+        ]
+
+    recommendations = []
+    for name, explanation, score, career_contribution in zip(names[top_idx], explanations[top_idx], scores,
+                                                              contributions):
+        drivers = career_drivers(career_contribution)
+        if drivers:
+            skills = [driver['skill'] for driver in drivers]
+            listed = skills[0] if len(skills) == 1 else ", ".join(skills[:-1]) + " and " + skills[-1]
+            explanation += f"<br><br>Your answers on {listed} did the most to point the model towards this career."
+        else:
+            explanation += suffix
+        recommendations.append({
+            'career': name,
+            'confidence': score,
+            'explanation': explanation,
+            'drivers': drivers
+        })
+    return recommendations
+
 @app.route('/')
 def home():
     return render_template('index.html')
@@ -63,29 +343,7 @@ def serve_pages(filename):
 
 @app.route('/quiz')
 def quiz():
-    questions = [
-        "I enjoy solving complex logical and mathematical problems",
-        "I can work on the same task consistently for long periods",
-        "I prefer structured, step-by-step approaches to problem-solving",
-        "I get frustrated when requirements keep changing",
-        "I enjoy creating visual designs and user interfaces",
-        "I like experimenting with new ideas and approaches",
-        "I prefer seeing quick results from my work",
-        "I'm comfortable with ambiguous or unclear requirements",
-        "I can maintain focus on long-term goals without immediate rewards",
-        "I enjoy learning new technologies independently",
-        "I prefer detailed documentation and clear instructions",
-        "I'm comfortable making decisions with incomplete information",
-        "I can stay motivated even when progress is slow",
-        "I enjoy teaching or explaining concepts to others",
-        "I prefer working on one project deeply rather than multiple projects",
-        "I'm comfortable with trial-and-error learning",
-        "I enjoy optimizing and improving existing systems",
-        "I prefer creative freedom over following strict guidelines",
-        "I'm patient with debugging and troubleshooting",
-        "I enjoy competitive environments and challenges"
-    ]
-    return render_template('quiz.html', questions=questions)
+    return render_template('quiz.html', questions=QUIZ_QUESTIONS)
 
 @app.route('/career-guide')
 def career_guide():
@@ -113,6 +371,7 @@ def process_career_guide():
         experience_level = request.form.get('experience_level', 'beginner')
         
         # Process recommendation
+        from career_engine import process_career_recommendation
         result = process_career_recommendation(
             mcq_responses,
             constraints,
@@ -165,7 +424,8 @@ def commit_path():
         }
         
         # Generate roadmap for chosen path
-        engine = CareerEngine()
+        from career_engine import get_career_engine
+        engine = get_career_engine()
         experience_level = session.get('experience_level', 'beginner')
         
         # Extract time per week from constraints
@@ -238,195 +498,20 @@ def view_roadmap(path_key):
 @app.route('/predict', methods=['POST'])
 def predict():
     try:
-        if model is None:
+        # Loads on the first prediction when warm-up is off or still running;
+        # the whole request then uses this one version even if a reload swaps it
+        current = load_model()
+        if current is None:
             return render_template('result.html', error="Model could not be loaded. Please contact the administrator.")
         
-        career_label_to_name = {
-             "Career_0": "Data Scientist",
-    "Career_1": "Psychologist",
-    "Career_2": "Software Engineer",
-    "Career_3": "Artist",
-    "Career_4": "Doctor",
-    "Career_5": "Teacher",
-    "Career_6": "Business Analyst",
-    "Career_7": "Engineer",
-    "Career_8": "Biologist",
-    "Career_9": "Entrepreneur",
-    "Career_10": "Journalist",
-    "Career_11": "Marketing Manager",
-    "Career_12": "Nurse",
-    "Career_13": "Accountant",
-    "Career_14": "UX Designer",
-    "Career_15": "Financial Analyst",
-    "Career_16": "Architect",
-    "Career_17": "Social Worker",
-    "Career_18": "IT Support Specialist",
-    "Career_19": "Chef",
-    "Career_20": "Human Resources Manager",
-    "Career_21": "Research Scientist",
-    "Career_22": "Lawyer",
-    "Career_23": "Electrician",
-    "Career_24": "Graphic Designer",
-    "Career_25": "Product Manager",
-    "Career_26": "Civil Engineer",
-    "Career_27": "Veterinarian",
-    "Career_28": "Consultant",
-    "Career_29": "Pharmacist",
-    "Career_30": "Event Planner",
-    "Career_31": "Mechanical Engineer",
-    "Career_32": "Environmental Scientist",
-    "Career_33": "Real Estate Agent",
-    "Career_34": "Physical Therapist",
-    "Career_35": "Supply Chain Manager",
-    "Career_36": "Web Developer",
-    "Career_37": "Customer Service Rep",
-    "Career_38": "Project Manager",
-    "Career_39": "College Professor",
-    "Career_40": "Dental Hygienist",
-    "Career_41": "Pilot",
-    "Career_42": "Cybersecurity Analyst",
-    "Career_43": "Fashion Designer",
-    "Career_44": "Speech Therapist",
-    "Career_45": "Investment Banker",
-    "Career_46": "Photographer",
-    "Career_47": "Clinical Psychologist",
-    "Career_48": "Game Developer",
-    "Career_49": "Urban Planner",
-    "Career_50": "Flight Attendant",
-    "Career_51": "Robotics Engineer",
-    "Career_52": "Environmental Lawyer",
-    "Career_53": "Interior Designer",
-    "Career_54": "Music Teacher",
-    "Career_55": "Data Analyst",
-    "Career_56": "Dentist",
-    "Career_57": "Fitness Trainer",
-    "Career_58": "Aerospace Engineer",
-    "Career_59": "Content Creator",
-    "Career_60": "Occupational Therapist",
-    "Career_61": "Financial Planner",
-    "Career_62": "App Developer",
-    "Career_63": "Marriage Counselor",
-    "Career_64": "Geologist",
-    "Career_65": "Chef de Cuisine",
-    "Career_66": "Public Relations Specialist",
-    "Career_67": "Neurologist",
-    "Career_68": "Architect (Software)",
-    "Career_69": "Social Media Manager",
-    "Career_70": "Physicist",
-    "Career_71": "Landscape Designer",
-    "Career_72": "Emergency Medical Technician",
-    "Career_73": "Air Traffic Controller",
-    "Career_74": "Historian",
-    "Career_75": "Hotel Manager",
-    "Career_76": "Nuclear Engineer",
-    "Career_77": "Marine Biologist",
-    "Career_78": "Art Director",
-    "Career_79": "Dental Assistant",
-    "Career_80": "Mechanical Technician",
-    "Career_81": "Special Education Teacher",
-    "Career_82": "Technical Writer",
-    "Career_83": "Pharmaceutical Sales",
-    "Career_84": "Forensic Scientist",
-    "Career_85": "Athletic Trainer",
-    "Career_86": "Database Administrator",
-    "Career_87": "Interior Decorator",
-    "Career_88": "Nurse Practitioner",
-    "Career_89": "Financial Controller",
-    "Career_90": "UI Developer",
-    "Career_91": "School Counselor",
-    "Career_92": "Geophysicist",
-    "Career_93": "Executive Chef",
-    "Career_94": "Digital Marketing Specialist",
-    "Career_95": "Cardiologist",
-    "Career_96": "DevOps Engineer",
-    "Career_97": "Public Speaker",
-    "Career_98": "Quantum Physicist",
-    "Career_99": "Floral Designer",
-    "Career_100": "Speech-Language Pathologist",
-    "Career_101": "Investment Analyst",
-    "Career_102": "3D Artist",
-    "Career_103": "Clinical Nurse Specialist",
-    "Career_104": "Tax Accountant",
-    "Career_105": "UX Researcher",
-    "Career_106": "Marriage Therapist",
-    "Career_107": "Astronomer",
-    "Career_108": "Restaurant Manager",
-    "Career_109": "SEO Specialist",
-    "Career_110": "Surgical Technologist",
-    "Career_111": "Machine Learning Engineer",
-    "Career_112": "Event Host",
-    "Career_113": "Meteorologist",
-    "Career_114": "Fashion Merchandiser",
-    "Career_115": "Physical Education Teacher",
-    "Career_116": "Systems Administrator",
-    "Career_117": "Interior Architect",
-    "Career_118": "Genetic Counselor",
-    "Career_119": "Actuary",
-    "Career_120": "Video Game Artist",
-    "Career_121": "Speech Coach",
-    "Career_122": "Astronaut"
-        }
-        
         # Get user responses
         responses = [int(request.form[f'Q{i+1}']) for i in range(20)]
-        df = pd.DataFrame([responses], columns=columns)
         
         # Get prediction probabilities
-        proba = model.predict_proba(df)[0]
-        classes = model.classes_
+        with stage('model_inference'):
+            proba = predict_proba_one(current, responses)
 
-        # Get top 5 recommendations
-        top_n = sorted(zip(classes, proba), key=lambda x: x[1], reverse=True)[:5]
-        
-        # Format recommendations with explanations
-        recommendations = []
-        for job, score in top_n:
-            # Get explanation for the career (use default if not found)
-            explanation = career_descriptions.get(job, default_explanation)
-            
-            # Add strength-based insights based on user responses
-            high_scores = []
-            for i, response in enumerate(responses):
-                if response >= 4:  # User scored high (4 or 5)
-                    high_scores.append(i)
-            
-            # Map question indices to skills
-            skills_map = {
-                0: "analytical thinking",
-                1: "helping others",
-                2: "working with hands",
-                3: "creativity",
-                4: "business acumen",
-                5: "technical understanding",
-                6: "interest in natural systems",
-                7: "data analysis",
-                8: "organizational skills",
-                9: "independent work",
-                10: "teamwork",
-                11: "leadership",
-                12: "attention to detail",
-                13: "adaptability",
-                14: "understanding human behavior",
-                15: "communication",
-                16: "social contribution",
-                17: "challenge-seeking",
-                18: "work-life balance",
-                19: "decision-making"
-            }
-            
-            # Pick up to 3 relevant high-scoring skills
-            relevant_skills = [skills_map[i] for i in high_scores[:3]]
-            if relevant_skills:
-                explanation += "<br><br>Your strengths in " + ", ".join(relevant_skills) + " are particularly valuable in this career path."
-
-            
-            career_name = career_label_to_name.get(job, job)
-            
-            recommendations.append({
-                'career': career_name,
-                'confidence': round(score * 1000, 2),
-                'explanation': explanation
-            })
+        recommendations = build_recommendations(current, proba, responses)
 
         return render_template('result.html', recommendations=recommendations)
 
@@ -435,5 +520,217 @@ def predict():
         print(error_message)
         return render_template('result.html', error=error_message)
 
+def _parse_batch_responses():
+    """Read response vectors from a CSV upload or a JSON body into an (N, 20) array"""
+    upload = request.files.get('file')
+    if upload is not None:
+        # Extra columns (e.g. Job_Role in exported datasets) are ignored
+        import pandas as pd
+        df = pd.read_csv(upload, usecols=columns)
+        if df.empty:
+            raise ValueError("The batch contains no response rows")
+        return validate_answers(df[columns].to_numpy())
+
+    payload = request.get_json(silent=True) or {}
+    rows = payload.get('responses')
+    if not isinstance(rows, list):
+        raise ValueError("Expected a JSON body with a 'responses' list or a CSV file upload")
+    if not rows:
+        raise ValueError("The batch contains no response rows")
+    if isinstance(rows[0], dict):
+        vectors = []
+        for i, row in enumerate(rows):
+            if not isinstance(row, dict):
+                raise ValueError(f"Row {i}: expected an object with {columns[0]}..{columns[-1]}")
+            missing = [column for column in columns if column not in row]
+            if missing:
+                raise ValueError(f"Row {i}: missing answer for {', '.join(missing)}")
+            vectors.append([row[column] for column in columns])
+        rows = vectors
+    elif any(not isinstance(row, list) or len(row) != len(columns) for row in rows):
+        raise ValueError(f"Each response vector must contain {len(columns)} answers")
+    # Object dtype keeps JSON booleans and strings distinguishable from numbers
+    import numpy as np
+    return validate_answers(np.array(rows, dtype=object))
+
+@app.route('/api/predict/batch', methods=['POST'])
+def predict_batch():
+    """Score many response vectors in a single vectorized call"""
+    import numpy as np
+    current = load_model()
+    if current is None:
+        return jsonify({"error": "Model could not be loaded. Please contact the administrator."}), 503
+
+    try:
+        responses = _parse_batch_responses()
+    except (ValueError, KeyError, TypeError) as e:
+        return jsonify({"error": f"Invalid batch payload: {str(e)}"}), 400
+
+    if len(responses) > MAX_BATCH_ROWS:
+        return jsonify({"error": f"Batch too large: at most {MAX_BATCH_ROWS} rows per request"}), 413
+
+    try:
+        with stage('model_inference_batch'):
+            proba = current.predict_proba(responses)
+
+        # Same ordering as /predict: descending probability, ties in class order
+        top_idx = np.argsort(-proba, axis=1, kind='stable')[:, :TOP_N]
+        top_scores = np.round(np.take_along_axis(proba, top_idx, axis=1) * 1000, 2)
+        names, _ = class_tables(current)
+        top_names = names[top_idx]
+
+        predictions = [
+            {
+                'recommendations': [
+                    {'career': career, 'confidence': score}
+                    for career, score in zip(row_names, row_scores)
+                ]
+            }
+            for row_names, row_scores in zip(top_names.tolist(), top_scores.tolist())
+        ]
+
+        # ?explain=1 adds the top contributing questions of every recommendation (for reports)
+        if request.args.get('explain') == '1':
+            with stage('explanation_batch'):
+                contributions = career_contributions(current, responses, top_idx)
+            if contributions is None:
+                return jsonify({"error": "The served model bundle does not support explanations"}), 409
+            for prediction, row_contributions in zip(predictions, contributions):
+                for recommendation, career_contribution in zip(prediction['recommendations'], row_contributions):
+                    recommendation['drivers'] = career_drivers(career_contribution)
+        return jsonify({"count": len(predictions), "predictions": predictions})
+
+    except Exception as e:
+        error_message = f"Error processing batch prediction: {str(e)}"
+        print(error_message)
+        return jsonify({"error": error_message}), 500
+
+@app.route('/api/ready')
+def ready():
+    """Readiness probe: 200 once this worker's model is loaded, 503 until then"""
+    ready = model_registry.active is not None
+    status = {"status": model_registry.status, "ready": ready, "pid": os.getpid()}
+    return jsonify(status), (200 if ready else 503)
+
+@app.route('/api/model/status')
+def model_status():
+    """Active model version, load/warm-up timings and reload history of this worker"""
+    return jsonify(model_registry.describe())
+
+def _admin_denied():
+    """Error response unless the request carries the admin token, else None"""
+    if not ADMIN_TOKEN:
+        return jsonify({"error": "Admin endpoints are disabled (set JOBSENSEI_ADMIN_TOKEN)"}), 403
+    if not secrets.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN):
+        return jsonify({"error": "Invalid admin token"}), 403
+    return None
+
+@app.route('/api/admin/reload-model', methods=['POST'])
+def reload_model():
+    """Load the model files again in the background and swap them in once warmed up"""
+    denied = _admin_denied()
+    if denied:
+        return denied
+    model_registry.reload_async('admin')
+    return jsonify({"status": "reloading", "pid": os.getpid(),
+                    "current_version": model_registry.active.version if model_registry.active else None}), 202
+
+@app.route('/api/admin/profile', methods=['GET', 'POST', 'DELETE'])
+def admin_profile():
+    """
+    Profile this worker's next requests
+
+    POST {"mode": "sample"|"cprofile", "requests": N, "seconds": T,
+          "interval_ms": 5, "route": "/process-career-guide"} arms a session,
+    GET reports progress and the last output file, DELETE stops early.
+    """
+    denied = _admin_denied()
+    if denied:
+        return denied
+
+    if request.method == 'DELETE':
+        return jsonify({"stopped": request_profiler.stop(), "pid": os.getpid()})
+    if request.method == 'POST':
+        options = request.get_json(silent=True) or {}
+        try:
+            request_profiler.start(
+                mode=options.get('mode', 'sample'),
+                max_requests=int(options.get('requests', 100)),
+                max_seconds=float(options.get('seconds', 60)),
+                interval=float(options.get('interval_ms', 5)) / 1000.0,
+                route=options.get('route')
+            )
+        except (ValueError, TypeError) as e:
+            return jsonify({"error": str(e)}), 400
+        except RuntimeError as e:
+            return jsonify({"error": str(e)}), 409
+        return jsonify(request_profiler.describe()), 202
+    return jsonify(request_profiler.describe())
+
+@app.route('/api/predict/cache-stats')
+def prediction_cache_stats():
+    """Hit rate, evictions and sizes of the prediction cache as seen by this worker"""
+    if prediction_cache is None:
+        return jsonify({"enabled": False, "pid": os.getpid()})
+    return jsonify(dict(prediction_cache.describe(), enabled=True, pid=os.getpid()))
+
+def _runtime_metrics():
+    """Prediction cache and micro-batcher counters plus model gauges for /metrics"""
+    collected = []
+    if prediction_cache is not None:
+        counts = prediction_cache.stats.snapshot()
+        collected.append({
+            "name": "prediction_cache_events_total", "type": "counter",
+            "help": "Prediction cache lookups and evictions by outcome",
+            "samples": [({"event": field}, counts[field]) for field in prediction_cache.stats.fields]
+        })
+    current = model_registry.active
+    if MICROBATCH_ENABLED and current is not None:
+        batch_stats = current.get_batcher(MICROBATCH_MAX_ROWS, MICROBATCH_WINDOW_MS / 1000.0).stats.snapshot()
+        collected.append({
+            "name": "microbatch_rows_total", "type": "counter",
+            "help": "Rows scored through the micro-batcher",
+            "samples": [({}, batch_stats["rows"])]
+        })
+        collected.append({
+            "name": "microbatch_batches_total", "type": "counter",
+            "help": "Batches scored by the micro-batcher",
+            "samples": [({}, batch_stats["batches"])]
+        })
+    collected.append({
+        "name": "model_info", "type": "gauge",
+        "help": "Active model version of the scraped worker (value is always 1)",
+        "samples": [({"version": current.version[:12], "status": model_registry.status}, 1)] if current else []
+    })
+    collected.append({
+        "name": "model_reloads", "type": "gauge",
+        "help": "Successful hot reloads in the scraped worker",
+        "samples": [({}, model_registry.reloads)]
+    })
+    return collected
+
+metrics.add_collector(_runtime_metrics)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus text exposition of request/stage latency and runtime counters"""
+    return app.response_class(metrics_exporter.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/predict/batcher-stats')
+def batcher_stats():
+    """Batch-size and queue-wait metrics of this worker's micro-batcher"""
+    current = model_registry.active
+    stats = {}
+    if MICROBATCH_ENABLED and current is not None:
+        stats = current.get_batcher(MICROBATCH_MAX_ROWS, MICROBATCH_WINDOW_MS / 1000.0).stats.snapshot()
+    return jsonify({
+        "enabled": MICROBATCH_ENABLED,
+        "max_batch_size": MICROBATCH_MAX_ROWS,
+        "window_ms": MICROBATCH_WINDOW_MS,
+        "model_version": current.version if current is not None else None,
+        "pid": os.getpid(),
+        "stats": stats
+    })
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""
+CareerEngine construction benchmark
+Compares building a CareerEngine per request (the old behaviour) with the
+shared, frozen instance from get_career_engine(): allocations per request
+(tracemalloc) and throughput from concurrent worker threads, the way
+gunicorn's gthread workers call into the engine.
+
+Run:  python benchmarks/bench_career_engine.py [--requests 2000] [--threads 8]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from career_engine import CareerEngine, get_career_engine  # noqa: E402
+
+
+def make_payloads(count, seed=0):
+    """Synthetic career-guide submissions"""
+    rng = random.Random(seed)
+    payloads = []
+    for _ in range(count):
+        mcq = [rng.randint(1, 5) for _ in range(20)]
+        constraints = {
+            "time_per_week": rng.randint(5, 40),
+            "academic_year": "year2",
+            "financial": rng.choice(["low", "medium", "high"]),
+            "internet": rng.random() < 0.8,
+            "device": "laptop"
+        }
+        payloads.append((mcq, constraints))
+    return payloads
+
+
+def handle(engine_factory, mcq, constraints):
+    """The engine work done by /process-career-guide followed by /commit-path"""
+    engine = engine_factory()
+    profile = engine.diagnose_profile(mcq, constraints)
+    engine.generate_diagnosis_summary(profile)
+    primary, _ = engine.recommend_paths(profile)
+    engine.generate_roadmap(primary["key"], "beginner", constraints["time_per_week"])
+    # commit_path builds a second engine for the chosen roadmap
+    engine_factory().generate_roadmap(primary["key"], "beginner", constraints["time_per_week"])
+
+
+def measure_allocations(engine_factory, payloads):
+    """Average and worst-case peak traced memory above baseline per request"""
+    tracemalloc.start()
+    total = 0
+    peak = 0
+    for mcq, constraints in payloads:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        handle(engine_factory, mcq, constraints)
+        _, request_peak = tracemalloc.get_traced_memory()
+        total += request_peak - before
+        peak = max(peak, request_peak - before)
+    tracemalloc.stop()
+    return total / len(payloads), peak
+
+
+def measure_throughput(engine_factory, payloads, threads):
+    """Requests per second with a pool of worker threads"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda p: handle(engine_factory, *p), payloads))
+    return len(payloads) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    payloads = make_payloads(args.requests)
+    get_career_engine()  # build the shared instance outside the timed region
+
+    variants = [
+        ("per-request CareerEngine()", CareerEngine),
+        ("shared get_career_engine()", get_career_engine),
+    ]
+    print(f"{'variant':<30}{'avg peak':>14}{'max peak':>14}{'req/s':>12}")
+    for name, factory in variants:
+        avg_alloc, peak_alloc = measure_allocations(factory, payloads[:500])
+        throughput = measure_throughput(factory, payloads, args.threads)
+        print(f"{name:<30}{avg_alloc / 1024:>11.1f} KB{peak_alloc / 1024:>11.1f} KB{throughput:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
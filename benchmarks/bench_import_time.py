@@ -0,0 +1,97 @@
+"""
+Cold-start import benchmark
+Imports app.py in a fresh interpreter under -X importtime and reports the
+total import cost and the slowest modules, then requests the page routes
+through Flask's test client and checks that none of them pulled in the
+scientific stack. Exits non-zero on a regression, so it can run in CI.
+
+Run:  python benchmarks/bench_import_time.py [--budget-ms 400] [--top 15]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that page routes and worker boot must not import
+HEAVY_MODULES = ('numpy', 'pandas', 'sklearn', 'scipy')
+
+PAGE_ROUTES = ('/', '/quiz', '/career-guide', '/view-roadmap/frontend_internship', '/my-roadmaps')
+
+# Runs in the child interpreter: import the app, hit the page routes, report
+# which heavy packages ended up in sys.modules at each step
+CHILD_SCRIPT = """
+import json, sys
+heavy = %r
+def loaded():
+    return sorted({name.split('.')[0] for name in sys.modules if name.split('.')[0] in heavy})
+import app
+report = {"after_import": loaded(), "routes": {}}
+client = app.app.test_client()
+for route in %r:
+    status = client.get(route).status_code
+    report["routes"][route] = {"status": status, "heavy_modules": loaded()}
+sys.stdout.write("\\n" + json.dumps(report))
+"""
+
+
+def parse_importtime(stderr):
+    """Parse -X importtime output into [(module, self_us, cumulative_us)]"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def run_child():
+    env = dict(os.environ, JOBSENSEI_MODEL_WARMUP='0')
+    script = CHILD_SCRIPT % (HEAVY_MODULES, PAGE_ROUTES)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', script],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    # The app may print while loading; the report is the last line
+    return json.loads(result.stdout.splitlines()[-1]), parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=400.0,
+                        help='fail if importing app takes longer than this')
+    parser.add_argument('--top', type=int, default=15, help='number of slowest modules to list')
+    args = parser.parse_args()
+
+    report, rows = run_child()
+    app_row = next(row for row in rows if row[0] == 'app')
+    app_ms = app_row[2] / 1000
+
+    print(f"import app: {app_ms:.1f} ms cumulative ({app_row[1] / 1000:.1f} ms in app.py itself)")
+    print(f"\nSlowest imports (cumulative):")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda row: -row[2])[1:args.top + 1]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {self_us / 1000:7.1f} ms self  {name}")
+
+    failures = []
+    if report["after_import"]:
+        failures.append(f"import app loaded {', '.join(report['after_import'])}")
+    print(f"\nHeavy modules after each page route:")
+    for route, result in report["routes"].items():
+        print(f"  {route:<36} HTTP {result['status']}  {', '.join(result['heavy_modules']) or '-'}")
+        if result["heavy_modules"]:
+            failures.append(f"{route} loaded {', '.join(result['heavy_modules'])}")
+    if app_ms > args.budget_ms:
+        failures.append(f"import app took {app_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    if failures:
+        print("\nFAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Hyperparameter search benchmark: exhaustive grid vs successive halving
+Runs the original 16-config GridSearchCV and the halving search (tree-count
+and sample-count budgets) on the same cached folds and train/test split the
+trainer uses, and reports wall-clock time, fits, best CV accuracy and held-out
+accuracy of each winner.
+
+The bundled psychometric_dataset.csv has random labels, so accuracies on it
+are all near chance; --synthetic generates class prototypes plus answer noise
+to compare the searches on data with learnable structure.
+
+Run:  python benchmarks/bench_model_search.py [--dataset psychometric_dataset.csv] [--synthetic 5000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import warnings
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from model_search import run_search  # noqa: E402
+from training_data import CompactDataset, load_cached_dataset  # noqa: E402
+
+
+def synthetic_dataset(rows: int, n_classes: int = 60, noise: float = 0.9, seed: int = 0) -> CompactDataset:
+    """Every class has a prototype answer vector; rows are noisy copies of it"""
+    rng = np.random.default_rng(seed)
+    prototypes = rng.integers(1, 6, size=(n_classes, 20))
+    codes = rng.integers(0, n_classes, size=rows).astype(np.int32)
+    answers = np.clip(np.rint(prototypes[codes] + rng.normal(0, noise, size=(rows, 20))), 1, 5).astype(np.uint8)
+    return CompactDataset(answers, codes, [f'Career_{i}' for i in range(n_classes)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dataset', default=os.path.join(ROOT, 'psychometric_dataset.csv'))
+    parser.add_argument('--synthetic', type=int, default=0, help='use N synthetic rows instead of --dataset')
+    parser.add_argument('--candidates', type=int, default=27)
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    args = parser.parse_args()
+
+    from sklearn.metrics import accuracy_score
+    from sklearn.model_selection import train_test_split
+    warnings.filterwarnings('ignore')
+
+    with tempfile.TemporaryDirectory() as scratch:
+        if args.synthetic:
+            dataset = synthetic_dataset(args.synthetic)
+            source = f"synthetic ({args.synthetic:,} rows)"
+        else:
+            dataset = load_cached_dataset(args.dataset, os.path.join(scratch, 'dataset_cache'), verbose=False)
+            source = args.dataset
+        X_train, X_test, y_train, y_test = train_test_split(
+            dataset.features(), dataset.labels(), test_size=0.2, random_state=42, stratify=dataset.labels())
+
+        runs = [('grid', 'grid', {}),
+                ('halving/trees', 'halving', {"resource": 'n_estimators', "n_candidates": args.candidates}),
+                ('halving/samples', 'halving', {"resource": 'n_samples', "n_candidates": args.candidates})]
+        results = []
+        for label, mode, options in runs:
+            try:
+                search, wall = run_search(mode, X_train, y_train, y_train.codes, cache_dir=scratch,
+                                          n_jobs=args.n_jobs, verbose=0, **options)
+            except ValueError as e:
+                print(f"{label} skipped: {str(e)}")
+                continue
+            test_accuracy = accuracy_score(y_test, search.best_estimator_.predict(X_test))
+            results.append((label, len(search.cv_results_['params']), wall, search.best_score_, test_accuracy))
+
+    print(f"\n{source}, {len(dataset.categories)} classes, {len(X_train):,} training rows\n")
+    print(f"{'search':<17}{'configs fit':>12}{'wall s':>9}{'speedup':>9}{'cv acc':>9}{'test acc':>10}")
+    grid_wall = results[0][2]
+    for label, fits, wall, cv_score, test_accuracy in results:
+        print(f"{label:<17}{fits:>12}{wall:>9.1f}{grid_wall / wall:>8.1f}x{cv_score:>9.4f}{test_accuracy:>10.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Parallel cross-validation scaling benchmark
+Runs the trainer's 16-config x 5-fold grid with GridSearchCV(n_jobs=w) and
+with parallel_cv.SharedMemoryGridSearch(n_workers=w) for w = 1, 2, 4, ... up
+to --max-workers, on the same folds, and reports wall time, speedup over one
+worker, parallel efficiency and pool utilization (task CPU time / wall x usable CPUs).
+Both executors must agree on every mean CV score.
+
+Run:  python benchmarks/bench_parallel_cv.py [--rows 20000] [--max-workers 8]
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from bench_model_search import synthetic_dataset  # noqa: E402
+from model_search import GRID_PARAMS, fold_assignments, fold_splits, grid_search  # noqa: E402
+from parallel_cv import SharedMemoryGridSearch  # noqa: E402
+
+
+def worker_counts(max_workers: int):
+    counts = [1]
+    while counts[-1] * 2 <= max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000, help='synthetic training rows')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--skip-sklearn', action='store_true', help='only time the shared-memory executor')
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore')
+
+    dataset = synthetic_dataset(args.rows)
+    X, y = dataset.features(), dataset.labels()
+    folds = fold_assignments(y.codes, cache_dir=None)
+    splits = fold_splits(folds)
+    print(f"{args.rows:,} rows, {len(dataset.categories)} classes, 16 configs x {len(splits)} folds, "
+          f"{os.cpu_count()} CPUs")
+    if args.max_workers > (os.cpu_count() or 1):
+        print("Warning: more workers than CPUs; speedup is capped by the CPU count")
+
+    print(f"\n{'executor':<16}{'workers':>8}{'wall s':>9}{'speedup':>9}{'efficiency':>12}{'utilization':>13}")
+    baseline = {}
+    reference_scores = None
+    for workers in worker_counts(args.max_workers):
+        runs = [('shared-memory', workers)] + ([] if args.skip_sklearn else [('GridSearchCV', workers)])
+        for executor, n in runs:
+            started = time.perf_counter()
+            if executor == 'shared-memory':
+                search = SharedMemoryGridSearch(GRID_PARAMS, folds, n, verbose=0).fit(X, y)
+                utilization = f"{search.task_report()['utilization']:.0%}"
+            else:
+                search = grid_search(X, y, splits, n_jobs=n, verbose=0)
+                utilization = '-'
+            wall = time.perf_counter() - started
+
+            scores = np.asarray(search.cv_results_['mean_test_score'])
+            if reference_scores is None:
+                reference_scores = scores
+            elif not np.allclose(np.sort(scores), np.sort(reference_scores)):
+                print(f"MISMATCH: {executor} with {n} workers produced different CV scores")
+
+            baseline.setdefault(executor, wall)
+            speedup = baseline[executor] / wall
+            print(f"{executor:<16}{n:>8}{wall:>9.1f}{speedup:>8.2f}x{speedup / n:>12.0%}{utilization:>13}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+/predict response-assembly benchmark
+Times everything /predict does after the model has scored a row (top-5
+selection, name lookup, explanation text) with the model excluded: the
+probability vectors are precomputed. Compares the original per-request
+sort/dict-building code with app.build_recommendations and checks that both
+produce identical recommendations, including on tied probabilities. The
+decision-path explanations (forest_explainer.py) are timed separately; they
+replace the legacy text, so the comparison runs with explain=False.
+
+Run:  python benchmarks/bench_predict_handler.py [--requests 20000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+
+
+def legacy_recommendations(classes, proba, responses):
+    """The /predict loop before precomputed tables (kept here as the reference)"""
+    top_n = sorted(zip(classes, proba), key=lambda x: x[1], reverse=True)[:5]
+    recommendations = []
+    for job, score in top_n:
+        explanation = app.career_descriptions.get(job, app.default_explanation)
+        high_scores = []
+        for i, response in enumerate(responses):
+            if response >= 4:
+                high_scores.append(i)
+        skills_map = dict(enumerate(app.SKILL_NAMES))
+        relevant_skills = [skills_map[i] for i in high_scores[:3]]
+        if relevant_skills:
+            explanation += "<br><br>Your strengths in " + ", ".join(relevant_skills) + " are particularly valuable in this career path."
+        career_label_to_name = dict(app.career_label_to_name)
+        recommendations.append({
+            'career': career_label_to_name.get(job, job),
+            'confidence': round(score * 1000, 2),
+            'explanation': explanation
+        })
+    return recommendations
+
+
+def make_inputs(current, count, seed=0):
+    """Response vectors with their real probabilities, plus synthetic tied vectors"""
+    rng = np.random.default_rng(seed)
+    responses = rng.integers(1, 6, size=(count, 20))
+    proba = current.predict_proba(responses)
+    # Forests produce many exact ties; add coarse vectors with ties at the top-5 boundary
+    ties = np.round(rng.random((count // 10, proba.shape[1])), 1)
+    ties /= ties.sum(axis=1, keepdims=True)
+    responses = np.vstack([responses, rng.integers(1, 6, size=(len(ties), 20))])
+    return responses.tolist(), np.vstack([proba, ties])
+
+
+def time_per_request(fn, current, responses, proba):
+    started = time.perf_counter()
+    for row, p in zip(responses, proba):
+        fn(current, p, row)
+    return (time.perf_counter() - started) / len(responses)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=20000)
+    args = parser.parse_args()
+
+    current = app.load_model()
+    if current is None:
+        sys.exit("No model available; train career_recommendation_model.pkl first")
+    responses, proba = make_inputs(current, args.requests)
+
+    mismatches = sum(
+        legacy_recommendations(current.classes_, p, row) != app.build_recommendations(current, p, row, explain=False)
+        for row, p in zip(responses, proba)
+    )
+
+    app.build_recommendations(current, proba[0], responses[0])  # build the class tables
+    legacy = time_per_request(lambda c, p, row: legacy_recommendations(c.classes_, p, row), current, responses, proba)
+    fast = time_per_request(lambda c, p, row: app.build_recommendations(c, p, row, explain=False),
+                            current, responses, proba)
+    explained = time_per_request(lambda c, p, row: app.build_recommendations(c, p, row, explain=True),
+                                 current, responses[:2000], proba[:2000])
+
+    print(f"{len(responses)} requests, {len(current.classes_)} classes, model excluded")
+    print(f"  per-request sort + dict rebuild: {legacy * 1e6:8.1f} us")
+    print(f"  build_recommendations:           {fast * 1e6:8.1f} us   ({legacy / fast:.1f}x)")
+    print(f"  ... with explanations:           {explained * 1e6:8.1f} us")
+    print(f"  mismatching responses: {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
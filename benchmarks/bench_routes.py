@@ -0,0 +1,278 @@
+"""
+Route load test with JSON baselines
+Drives the real app with seeded synthetic quiz and career-guide submissions
+and reports throughput and p50/p95/p99 latency for /predict,
+/process-career-guide, /commit-path and /view-roadmap/<path_key>.
+
+By default requests go through Flask's in-process WSGI test client; --url
+targets a running server instead (e.g. gunicorn -w 4 app:app). Each
+simulated user keeps its own cookies, so /commit-path runs against the
+session created by that user's /process-career-guide.
+
+Run:  python benchmarks/bench_routes.py [--users 8] [--iterations 50] [--save baseline.json]
+      python benchmarks/bench_routes.py --compare baseline.json [--threshold 0.15]
+"""
+
+import argparse
+import http.cookiejar
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+ROUTES = ('/predict', '/process-career-guide', '/commit-path', '/view-roadmap/<path_key>')
+ROADMAP_KEYS = ('frontend_internship', 'backend_dsa', 'data_analyst', 'fullstack_web', 'ui_ux_design', 'digital_marketing')
+
+
+def quiz_form(rng: random.Random) -> Dict[str, str]:
+    """Synthetic /predict submission"""
+    return {f'Q{i}': str(rng.randint(1, 5)) for i in range(1, 21)}
+
+
+def career_guide_form(rng: random.Random) -> Dict[str, str]:
+    """Synthetic /process-career-guide submission"""
+    form = {f'Q{i}': str(rng.randint(1, 5)) for i in range(1, 21)}
+    form.update({
+        "time_per_week": str(rng.choice([5, 10, 15, 20, 30])),
+        "academic_year": rng.choice(["year1", "year2", "year3", "year4"]),
+        "financial": rng.choice(["low", "medium", "high"]),
+        "internet": rng.choice(["yes", "yes", "yes", "no"]),
+        "device": rng.choice(["laptop", "mobile"]),
+        "interest": rng.choice(["internship", "job", "skill_building"]),
+        "experience_level": rng.choice(["beginner", "intermediate", "advanced"])
+    })
+    return form
+
+
+class WSGIClient:
+    """One simulated user against the in-process app"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def get(self, path: str) -> int:
+        return self.client.get(path).status_code
+
+    def post(self, path: str, form: Dict[str, str]) -> int:
+        return self.client.post(path, data=form).status_code
+
+
+class HTTPClient:
+    """One simulated user against a running server (redirects are not followed)"""
+
+    class _NoRedirect(urllib.request.HTTPRedirectHandler):
+        def redirect_request(self, *args, **kwargs):
+            return None
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip('/')
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), self._NoRedirect
+        )
+
+    def _open(self, request) -> int:
+        try:
+            with self.opener.open(request, timeout=30) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    def get(self, path: str) -> int:
+        return self._open(urllib.request.Request(self.base_url + path))
+
+    def post(self, path: str, form: Dict[str, str]) -> int:
+        data = urllib.parse.urlencode(form).encode('ascii')
+        return self._open(urllib.request.Request(self.base_url + path, data=data))
+
+
+def user_session(client, rng: random.Random, iterations: int, samples: Dict[str, List], errors: Dict[str, int],
+                 lock: threading.Lock):
+    """Quiz, career guide, commitment and roadmap view, repeated iterations times"""
+    steps = (
+        ('/predict', lambda: client.post('/predict', quiz_form(rng)), (200,)),
+        ('/process-career-guide', lambda: client.post('/process-career-guide', career_guide_form(rng)), (200,)),
+        ('/commit-path', lambda: client.post('/commit-path', {"chosen_path": rng.choice(["primary", "secondary"])}),
+         (302,)),
+        ('/view-roadmap/<path_key>', lambda: client.get(f'/view-roadmap/{rng.choice(ROADMAP_KEYS)}'), (200,)),
+    )
+    local = {route: [] for route in ROUTES}
+    local_errors = {route: 0 for route in ROUTES}
+    for _ in range(iterations):
+        for route, call, ok in steps:
+            started = time.perf_counter()
+            status = call()
+            local[route].append(time.perf_counter() - started)
+            if status not in ok:
+                local_errors[route] += 1
+    with lock:
+        for route in ROUTES:
+            samples[route].extend(local[route])
+            errors[route] += local_errors[route]
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(samples: List[float], errors: int, wall_seconds: float) -> Dict:
+    values = sorted(samples)
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / wall_seconds, 1) if wall_seconds else 0.0,
+        "mean_ms": round(1000 * sum(values) / len(values), 3) if values else 0.0,
+        "p50_ms": round(1000 * percentile(values, 50), 3),
+        "p95_ms": round(1000 * percentile(values, 95), 3),
+        "p99_ms": round(1000 * percentile(values, 99), 3),
+        "max_ms": round(1000 * values[-1], 3) if values else 0.0
+    }
+
+
+def run(make_client, users: int, iterations: int, warmup: int, seed: int) -> Dict:
+    # Warm-up pass (model load, lookup table mapping, template compilation)
+    discard = {route: [] for route in ROUTES}
+    user_session(make_client(), random.Random(seed - 1), warmup, discard, {route: 0 for route in ROUTES},
+                 threading.Lock())
+
+    samples = {route: [] for route in ROUTES}
+    errors = {route: 0 for route in ROUTES}
+    lock = threading.Lock()
+    clients = [make_client() for _ in range(users)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        futures = [pool.submit(user_session, client, random.Random(seed + i), iterations, samples, errors, lock)
+                   for i, client in enumerate(clients)]
+        for future in futures:
+            future.result()
+    wall = time.perf_counter() - started
+
+    # Per-route throughput is that route's share of the mixed workload
+    return {route: summarize(samples[route], errors[route], wall) for route in ROUTES}
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Regressions: p50/p95/p99 more than threshold slower, or throughput more than threshold lower"""
+    regressions = []
+    for route, result in current["results"].items():
+        base = baseline["results"].get(route)
+        if not base:
+            continue
+        for metric in ('p50_ms', 'p95_ms', 'p99_ms'):
+            if base[metric] and result[metric] > base[metric] * (1 + threshold):
+                regressions.append(f"{route} {metric}: {base[metric]:.2f} -> {result[metric]:.2f} "
+                                   f"(+{100 * (result[metric] / base[metric] - 1):.0f}%)")
+        if base["throughput_rps"] and result["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+            regressions.append(f"{route} throughput: {base['throughput_rps']:.0f} -> {result['throughput_rps']:.0f} rps "
+                               f"({100 * (result['throughput_rps'] / base['throughput_rps'] - 1):.0f}%)")
+        if result["errors"] > base["errors"]:
+            regressions.append(f"{route} errors: {base['errors']} -> {result['errors']}")
+    return regressions
+
+
+def print_table(report: Dict, baseline: Dict = None):
+    print(f"{'route':<26}{'req':>7}{'err':>5}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for route, result in report["results"].items():
+        print(f"{route:<26}{result['requests']:>7}{result['errors']:>5}{result['throughput_rps']:>9.0f}"
+              f"{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}")
+        if baseline and route in baseline["results"]:
+            base = baseline["results"][route]
+            print(f"{'  baseline':<26}{base['requests']:>7}{base['errors']:>5}{base['throughput_rps']:>9.0f}"
+                  f"{base['p50_ms']:>9.2f}{base['p95_ms']:>9.2f}{base['p99_ms']:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=8, help='concurrent simulated users')
+    parser.add_argument('--iterations', type=int, default=50, help='quiz/guide/commit/roadmap rounds per user')
+    parser.add_argument('--warmup', type=int, default=5, help='untimed rounds before measuring')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--url', help='benchmark a running server instead of the in-process app')
+    parser.add_argument('--save', help='write the results as a JSON baseline')
+    parser.add_argument('--compare', help='baseline JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.15, help='allowed relative regression (0.15 = 15%%)')
+    args = parser.parse_args()
+
+    if args.url:
+        make_client = lambda: HTTPClient(args.url)  # noqa: E731
+        target = args.url
+    else:
+        # Keep session and cache files of the benchmark out of the working tree
+        scratch = tempfile.mkdtemp(prefix='jobsensei-bench-')
+        os.environ.setdefault('JOBSENSEI_SESSION_DB', os.path.join(scratch, 'sessions.sqlite3'))
+        os.environ.setdefault('JOBSENSEI_PREDICTION_CACHE_DB', os.path.join(scratch, 'prediction_cache.sqlite3'))
+        os.chdir(ROOT)
+        import app as jobsensei_app
+        jobsensei_app.load_model()
+        make_client = lambda: WSGIClient(jobsensei_app.app)  # noqa: E731
+        target = 'in-process WSGI'
+
+    # The app's debug prints go to /dev/null instead of flooding the report
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        results = run(make_client, args.users, args.iterations, args.warmup, args.seed)
+    report = {
+        "created": datetime.now().isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "target": target,
+        "config": {"users": args.users, "iterations": args.iterations, "warmup": args.warmup, "seed": args.seed},
+        "results": results
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        if baseline.get("config") != report["config"]:
+            print(f"Warning: baseline config {baseline.get('config')} differs from {report['config']}")
+
+    print(f"{target}: {args.users} users x {args.iterations} rounds (revision {report['revision']})\n")
+    print_table(report, baseline)
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"\nBaseline written to {args.save}")
+
+    if baseline is not None:
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\nREGRESSIONS (threshold {args.threshold:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%} against {args.compare}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Trainer ingestion benchmark: pd.read_csv vs chunked compact loading
+Writes a synthetic psychometric CSV (random answers, Career_N labels plus a
+few single-entry roles), then loads it in a fresh process per variant and
+reports wall time, peak RSS (Linux VmHWM) and the size of the resulting arrays:
+
+    read_csv  the original path: pd.read_csv (int64 answers, string labels)
+              followed by the Counter/isin single-entry filter
+    chunked   training_data.load_dataset (uint8 answers, int32 label codes,
+              in-place class filtering)
+    cached    training_data.load_cached_dataset, first building the binary
+              cache, then memory-mapping it
+
+Run:  python benchmarks/bench_training_ingest.py [--rows 1000000] [--chunksize 100000]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, %(root)r)
+variant, path, chunksize, cache_dir = sys.argv[1], sys.argv[2], int(sys.argv[3]), sys.argv[4]
+started = time.perf_counter()
+if variant == 'read_csv':
+    from collections import Counter
+    import pandas as pd
+    df = pd.read_csv(path)
+    job_counts = Counter(df['Job_Role'])
+    single_entry_jobs = [job for job, count in job_counts.items() if count == 1]
+    df = df[~df['Job_Role'].isin(single_entry_jobs)]
+    X, y = df.drop('Job_Role', axis=1), df['Job_Role']
+    rows, nbytes = len(X), int(X.memory_usage(deep=True).sum() + y.memory_usage(deep=True))
+elif variant == 'chunked':
+    from training_data import load_dataset
+    dataset = load_dataset(path, chunksize, verbose=False)
+    rows, nbytes = len(dataset), dataset.nbytes
+else:
+    from training_data import load_cached_dataset
+    dataset = load_cached_dataset(path, cache_dir, chunksize, verbose=False)
+    rows, nbytes = len(dataset), dataset.nbytes
+elapsed = time.perf_counter() - started
+# VmHWM, unlike ru_maxrss, is not inherited from the parent across exec
+with open('/proc/self/status') as status:
+    peak_kb = next(int(line.split()[1]) for line in status if line.startswith('VmHWM:'))
+print(json.dumps({"rows": rows, "seconds": elapsed, "data_mb": nbytes / 1e6, "peak_rss_mb": peak_kb / 1024}))
+"""
+
+
+def write_dataset(path, rows, n_classes=100, seed=0, block=200000):
+    """Random answers with Career_0..Career_{n-1} labels and 3 single-entry roles"""
+    rng = np.random.default_rng(seed)
+    with open(path, 'w') as file:
+        file.write(','.join([f'Q{i}' for i in range(1, 21)] + ['Job_Role']) + '\n')
+        for start in range(0, rows, block):
+            n = min(block, rows - start)
+            answers = rng.integers(1, 6, size=(n, 20))
+            labels = rng.integers(0, n_classes, size=n)
+            lines = [','.join(map(str, row)) + f',Career_{label}' for row, label in zip(answers.tolist(), labels.tolist())]
+            file.write('\n'.join(lines) + '\n')
+        for i in range(3):
+            file.write(','.join(['3'] * 20) + f',Career_Single_{i}\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--chunksize', type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        path = os.path.join(scratch, 'psychometric_synthetic.csv')
+        write_dataset(path, args.rows)
+        print(f"{args.rows:,} rows, {os.path.getsize(path) / 1e6:.0f} MB CSV\n")
+        print(f"{'variant':<12}{'rows kept':>12}{'seconds':>10}{'data MB':>10}{'peak RSS MB':>14}")
+        cache_dir = os.path.join(scratch, 'dataset_cache')
+        # 'cache build' parses and writes the cache, 'cache hit' maps it
+        for variant, label in (('read_csv', 'read_csv'), ('chunked', 'chunked'),
+                               ('cached', 'cache build'), ('cached', 'cache hit')):
+            output = subprocess.run(
+                [sys.executable, '-c', CHILD_SCRIPT % {"root": ROOT}, variant, path, str(args.chunksize), cache_dir],
+                capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(output.splitlines()[-1])
+            print(f"{label:<12}{result['rows']:>12,}{result['seconds']:>10.3f}"
+                  f"{result['data_mb']:>10.1f}{result['peak_rss_mb']:>14.0f}")
+
+
+if __name__ == '__main__':
+    main()
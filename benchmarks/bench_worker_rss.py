@@ -0,0 +1,91 @@
+"""
+Per-worker memory benchmark: pickled model vs memory-mapped compiled bundle
+Starts N worker processes at the same time, each loading the model the way
+app.py does and scoring a batch of rows, then reports RSS and PSS per worker.
+PSS splits shared pages between the processes mapping them, so it shows the
+page-cache sharing that RSS alone hides.
+
+Run:  python forest_compiler.py          # export career_model_compiled/ first
+      python benchmarks/bench_worker_rss.py [--workers 4]
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import pickle
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def read_memory():
+    """Rss/Pss/private/shared of the current process in MB (Linux)"""
+    fields = {}
+    with open('/proc/self/smaps_rollup') as file:
+        for line in file:
+            parts = line.split()
+            if len(parts) >= 3 and parts[-1] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    return {
+        "rss": fields.get('Rss', 0.0),
+        "pss": fields.get('Pss', 0.0),
+        "private": fields.get('Private_Clean', 0.0) + fields.get('Private_Dirty', 0.0),
+        "shared": fields.get('Shared_Clean', 0.0) + fields.get('Shared_Dirty', 0.0)
+    }
+
+
+def worker(mode, model_path, bundle_dir, barrier, results):
+    import numpy as np
+    from forest_compiler import compile_pipeline, load_compiled
+
+    baseline = read_memory()
+    if mode == 'pickle':
+        with open(model_path, 'rb') as file:
+            model = compile_pipeline(pickle.load(file))
+    else:
+        model = load_compiled(bundle_dir)
+
+    rows = np.random.default_rng(os.getpid()).integers(1, 6, (2000, 20))
+    model.predict_proba(rows)
+
+    # Measure while every worker is alive so shared pages are split between them
+    barrier.wait()
+    memory = read_memory()
+    memory["baseline_rss"] = baseline["rss"]
+    results.put(memory)
+    barrier.wait()
+
+
+def run(mode, workers, model_path, bundle_dir):
+    ctx = mp.get_context('spawn')
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    processes = [ctx.Process(target=worker, args=(mode, model_path, bundle_dir, barrier, results))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    samples = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--model', default=os.path.join(ROOT, 'career_recommendation_model.pkl'))
+    parser.add_argument('--bundle', default=os.path.join(ROOT, 'career_model_compiled'))
+    args = parser.parse_args()
+
+    print(f"{'mode':<8}{'workers':>8}{'RSS/worker':>13}{'PSS/worker':>13}{'private':>10}{'shared':>10}{'sum PSS':>10}")
+    for mode in ('pickle', 'mmap'):
+        samples = run(mode, args.workers, args.model, args.bundle)
+        mean = {key: sum(s[key] for s in samples) / len(samples) for key in samples[0]}
+        total_pss = sum(s["pss"] for s in samples)
+        print(f"{mode:<8}{args.workers:>8}{mean['rss']:>10.1f} MB{mean['pss']:>10.1f} MB"
+              f"{mean['private']:>7.1f} MB{mean['shared']:>7.1f} MB{total_pss:>7.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,347 @@
+"""
+Offline Bulk Scoring
+Scores exported quiz responses (CSV or JSONL) with the career model and,
+optionally, the career guide engine, writing one JSON line per input row.
+
+The input is read in chunks of raw lines and chunks are fanned out to a
+process pool; each worker maps the model once (the compiled bundle when it
+is fresh, as in the app) and returns its chunk already serialized. Results
+are appended in input order, and at most a few chunks per worker are in
+flight, so neither the input nor the results are ever held in full.
+
+After every written chunk a checkpoint (<output>.checkpoint.json) records
+the input byte offset and the output size. Re-running the same command
+resumes from there: the output is truncated to the last checkpoint and the
+input is read from the recorded offset.
+
+Input columns/keys: Q1..Q20 (integers 1-5, checked like /api/predict/batch),
+optional id, and for --career-guide the /process-career-guide fields
+time_per_week, academic_year, financial, internet, device, interest and
+experience_level (same defaults as the form). Careers are written under
+their display names, as on the result page.
+
+Run:  python bulk_score.py responses.csv results.jsonl [--workers 4] [--chunk-rows 5000] [--career-guide]
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from quiz_schema import QUESTION_COLUMNS, answer_error, career_label_to_name, invalid_answers
+
+CHECKPOINT_SUFFIX = '.checkpoint.json'
+DEFAULT_CHUNK_ROWS = 5000
+TOP_N = 5
+
+# Set in each worker by _init_worker
+_worker: Dict = {}
+
+
+def input_format(path: str) -> str:
+    return 'jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def read_chunks(path: str, chunk_rows: int, offset: int = 0) -> Iterator[Tuple[str, List[str], int]]:
+    """
+    Yield (csv header or '', raw lines, byte offset after the chunk)
+
+    Lines are passed to workers unparsed; offsets let a checkpoint resume
+    mid-file. CSV fields must not contain newlines.
+    """
+    with open(path, 'rb') as file:
+        header = ''
+        if input_format(path) == 'csv':
+            header = file.readline().decode('utf-8-sig')
+            offset = max(offset, file.tell())
+        file.seek(offset)
+        lines: List[str] = []
+        for raw in iter(file.readline, b''):
+            if raw.strip():
+                # Undecodable bytes surface as a per-row parse error, not a crash
+                lines.append(raw.decode('utf-8', errors='replace'))
+            if len(lines) >= chunk_rows:
+                yield header, lines, file.tell()
+                lines = []
+        if lines:
+            yield header, lines, file.tell()
+
+
+def _init_worker(model_path: str, compiled_dir: str, career_guide: bool):
+    from contextlib import redirect_stdout
+    from model_registry import load_model_version
+
+    # Loading messages of every worker would bury the progress output
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        loaded = load_model_version(model_path, compiled_dir)
+    if loaded is None:
+        raise RuntimeError(f"No loadable model at {model_path} or {compiled_dir}")
+    _worker["model"] = loaded
+    if career_guide:
+        from career_engine import get_career_engine
+        get_career_engine()
+    _worker["career_guide"] = career_guide
+
+
+def _parse_rows(header: str, lines: List[str]) -> List[Tuple[Dict, Optional[str]]]:
+    """(row, parse error) per line; a bad JSONL line becomes an error record instead of failing the chunk"""
+    if header:
+        return [(row, None) for row in csv.DictReader(io.StringIO(header + ''.join(lines)))]
+    rows = []
+    for line in lines:
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            rows.append(({}, f"Invalid JSON: {str(e)}"))
+            continue
+        if isinstance(row, dict):
+            rows.append((row, None))
+        else:
+            rows.append(({}, f"Expected a JSON object, got {type(row).__name__}"))
+    return rows
+
+
+def _csv_value(text: str):
+    """A CSV field as a number when it parses as one; anything else is left for validation to reject"""
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return text
+
+
+def _raw_answers(row: Dict, from_csv: bool) -> List:
+    """Answers of one row in column order, unvalidated (KeyError names a missing column)"""
+    answers = [row[column] for column in QUESTION_COLUMNS]
+    return [_csv_value(answer) for answer in answers] if from_csv else answers
+
+
+def _career_guide(row: Dict, responses: List[int]) -> Dict:
+    from career_engine import process_career_recommendation
+
+    # Missing, null and empty values take the form defaults; explicit values (including 0) are kept
+    time_per_week = row.get('time_per_week')
+    internet = row.get('internet')
+    if internet in (None, ''):
+        internet = True
+    constraints = {
+        "time_per_week": 10 if time_per_week in (None, '') else int(time_per_week),
+        "academic_year": row.get('academic_year') or 'year2',
+        "financial": row.get('financial') or 'medium',
+        "internet": internet if isinstance(internet, bool) else str(internet) == 'yes',
+        "device": row.get('device') or 'laptop'
+    }
+    result = process_career_recommendation(responses, constraints, row.get('interest') or 'internship',
+                                           row.get('experience_level') or 'beginner')
+    return {
+        "diagnosis_summary": result["diagnosis_summary"],
+        "primary_path": {key: result["primary_path"][key] for key in ('key', 'name', 'score')},
+        "secondary_path": {key: result["secondary_path"][key] for key in ('key', 'name', 'score')}
+    }
+
+
+def score_chunk(first_row: int, header: str, lines: List[str]) -> Tuple[str, int, int]:
+    """
+    Score one chunk in a worker
+
+    Returns:
+        (JSON lines for every row, rows scored, rows with errors)
+    """
+    import numpy as np
+
+    rows = _parse_rows(header, lines)
+    results: List[Dict] = []
+    candidates: List[int] = []
+    raw: List[List] = []
+    for i, (row, parse_error) in enumerate(rows):
+        result = {"row": first_row + i}
+        if row.get('id') not in (None, ''):
+            result["id"] = row['id']
+        if parse_error is not None:
+            result["error"] = parse_error
+        else:
+            try:
+                raw.append(_raw_answers(row, bool(header)))
+                candidates.append(i)
+            except KeyError as e:
+                result["error"] = f"Invalid responses: missing {e.args[0]}"
+        results.append(result)
+
+    # Same rules as the app's batch endpoint (quiz_schema.validate_answers),
+    # checked for the whole chunk at once
+    answers = np.empty((len(raw), len(QUESTION_COLUMNS)), dtype=object)
+    for j, row_answers in enumerate(raw):
+        answers[j] = row_answers
+    numbers, invalid = invalid_answers(answers)
+    valid: List[int] = []
+    for j, i in enumerate(candidates):
+        if invalid[j].any():
+            question = int(np.argmax(invalid[j]))
+            results[i]["error"] = f"Invalid responses: {answer_error(QUESTION_COLUMNS[question], answers[j, question])}"
+        else:
+            valid.append(i)
+    responses = numbers[~invalid.any(axis=1)].astype(np.int64)
+
+    if valid:
+        loaded = _worker["model"]
+        proba = np.asarray(loaded.predict_proba(responses))
+        # Same ordering as /api/predict/batch: descending probability, ties in class order
+        top_idx = np.argsort(-proba, axis=1, kind='stable')[:, :TOP_N]
+        top_scores = np.round(np.take_along_axis(proba, top_idx, axis=1) * 1000, 2)
+        # Display names, as on the result page
+        names = np.array([career_label_to_name.get(label, label) for label in loaded.classes_], dtype=object)
+        for i, row_names, scores in zip(valid, names[top_idx].tolist(), top_scores.tolist()):
+            results[i]["recommendations"] = [{"job_role": name, "confidence": score}
+                                             for name, score in zip(row_names, scores)]
+
+    errors = len(rows) - len(valid)
+    if _worker["career_guide"]:
+        for i, row_responses in zip(valid, responses.tolist()):
+            try:
+                results[i]["career_guide"] = _career_guide(rows[i][0], row_responses)
+            except (KeyError, TypeError, ValueError) as e:
+                results[i]["error"] = f"Career guide failed: {str(e)}"
+                errors += 1
+
+    return ''.join(json.dumps(result) + '\n' for result in results), len(rows), errors
+
+
+def _input_signature(path: str) -> Dict:
+    stat = os.stat(path)
+    return {"input": os.path.abspath(path), "input_size": stat.st_size, "input_mtime_ns": stat.st_mtime_ns}
+
+
+def load_checkpoint(output_path: str, input_path: str, chunk_rows: int, career_guide: bool) -> Optional[Dict]:
+    """The checkpoint of an interrupted run of the same job, or None"""
+    path = output_path + CHECKPOINT_SUFFIX
+    if not os.path.exists(path) or not os.path.exists(output_path):
+        return None
+    with open(path) as file:
+        checkpoint = json.load(file)
+    expected = dict(_input_signature(input_path), chunk_rows=chunk_rows, career_guide=career_guide)
+    if any(checkpoint.get(key) != value for key, value in expected.items()):
+        raise ValueError(f"{path} belongs to a different input or settings; delete it or use --restart")
+    return checkpoint
+
+
+def save_checkpoint(output_path: str, checkpoint: Dict):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(output_path) or '.', suffix='.tmp')
+    with os.fdopen(fd, 'w') as file:
+        json.dump(checkpoint, file, indent=2)
+    os.replace(tmp_path, output_path + CHECKPOINT_SUFFIX)
+
+
+def bulk_score(input_path: str, output_path: str, model_path: str = 'career_recommendation_model.pkl',
+               compiled_dir: str = 'career_model_compiled', workers: Optional[int] = None,
+               chunk_rows: int = DEFAULT_CHUNK_ROWS, career_guide: bool = False, restart: bool = False,
+               progress_seconds: float = 5.0) -> Dict:
+    """
+    Score input_path into output_path, resuming from a checkpoint when there is one
+
+    Returns:
+        Summary with rows, errors, elapsed seconds and rows/sec of this run
+    """
+    workers = workers or os.cpu_count() or 1
+    checkpoint = None if restart else load_checkpoint(output_path, input_path, chunk_rows, career_guide)
+    if checkpoint is None:
+        checkpoint = dict(_input_signature(input_path), chunk_rows=chunk_rows, career_guide=career_guide,
+                          input_offset=0, output_bytes=0, rows_done=0, errors=0, chunks_done=0)
+        open(output_path, 'wb').close()
+    else:
+        print(f"Resuming after {checkpoint['rows_done']:,} rows ({checkpoint['chunks_done']} chunks)")
+
+    started = time.perf_counter()
+    rows_at_start = checkpoint["rows_done"]
+    last_progress = started
+    chunks = read_chunks(input_path, chunk_rows, checkpoint["input_offset"])
+    next_row = checkpoint["rows_done"]
+    next_submit = next_write = checkpoint["chunks_done"]
+    in_flight: Dict[object, Tuple[int, int]] = {}
+    finished: Dict[int, Tuple[str, int, int, int]] = {}
+    exhausted = False
+
+    with open(output_path, 'r+b') as output, \
+            ProcessPoolExecutor(workers, initializer=_init_worker,
+                                initargs=(model_path, compiled_dir, career_guide)) as pool:
+        output.truncate(checkpoint["output_bytes"])
+        output.seek(checkpoint["output_bytes"])
+        while True:
+            # Keep two chunks per worker queued; more would only hold memory
+            while not exhausted and len(in_flight) + len(finished) < 2 * workers:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                    break
+                header, lines, end_offset = chunk
+                future = pool.submit(score_chunk, next_row, header, lines)
+                in_flight[future] = (next_submit, end_offset)
+                next_submit += 1
+                next_row += len(lines)
+            if not in_flight and not finished:
+                break
+
+            done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            for future in done:
+                index, end_offset = in_flight.pop(future)
+                text, rows, errors = future.result()
+                finished[index] = (text, rows, errors, end_offset)
+
+            # Results are appended strictly in input order
+            while next_write in finished:
+                text, rows, errors, end_offset = finished.pop(next_write)
+                output.write(text.encode('utf-8'))
+                output.flush()
+                os.fsync(output.fileno())
+                next_write += 1
+                checkpoint.update(input_offset=end_offset, output_bytes=output.tell(), chunks_done=next_write,
+                                  rows_done=checkpoint["rows_done"] + rows, errors=checkpoint["errors"] + errors)
+                save_checkpoint(output_path, checkpoint)
+
+            now = time.perf_counter()
+            if now - last_progress >= progress_seconds:
+                last_progress = now
+                rate = (checkpoint["rows_done"] - rows_at_start) / (now - started)
+                print(f"  {checkpoint['rows_done']:,} rows written ({rate:,.0f} rows/s)")
+
+    elapsed = time.perf_counter() - started
+    rows = checkpoint["rows_done"] - rows_at_start
+    summary = {
+        "rows": checkpoint["rows_done"],
+        "rows_this_run": rows,
+        "errors": checkpoint["errors"],
+        "seconds": round(elapsed, 2),
+        "rows_per_second": round(rows / elapsed, 1) if elapsed else 0.0,
+        "workers": workers,
+        "output": output_path
+    }
+    os.remove(output_path + CHECKPOINT_SUFFIX)
+    return summary
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Score exported quiz responses in bulk")
+    parser.add_argument('input', help='CSV with a header row, or JSONL (.jsonl/.ndjson)')
+    parser.add_argument('output', help='JSONL results, one line per input row')
+    parser.add_argument('--model', default='career_recommendation_model.pkl')
+    parser.add_argument('--compiled-model-dir', default='career_model_compiled')
+    parser.add_argument('--workers', type=int, default=None, help='scoring processes (default: all CPUs)')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument('--career-guide', action='store_true',
+                        help='also run process_career_recommendation for every row')
+    parser.add_argument('--restart', action='store_true', help='ignore an existing checkpoint')
+    args = parser.parse_args()
+
+    try:
+        result = bulk_score(args.input, args.output, args.model, args.compiled_model_dir, args.workers,
+                            args.chunk_rows, args.career_guide, args.restart)
+    except ValueError as e:
+        print(f"Error: {str(e)}")
+        sys.exit(1)
+    print(f"Scored {result['rows_this_run']:,} rows in {result['seconds']}s "
+          f"({result['rows_per_second']:,.0f} rows/s, {result['errors']} rows with errors) -> {result['output']}")
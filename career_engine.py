@@ -5,15 +5,68 @@ recommends paths, and generates 90-day roadmaps.
 """
 
 import json
+import threading
+from collections.abc import Mapping
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from types import MappingProxyType
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from career_lookup import engine_fingerprint, get_recommendation_table
+from request_metrics import stage, timed_stage
+
+
+def round_scores(values: np.ndarray, ndigits: int = 1) -> np.ndarray:
+    """
+    Apply Python's round(x, ndigits) elementwise
+    
+    np.round rescales before rounding and can disagree with round() near ties,
+    so the (few) distinct values are rounded in Python and scattered back.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    uniques, inverse = np.unique(values, return_inverse=True)
+    rounded = np.array([round(float(v), ndigits) for v in uniques], dtype=np.float64)
+    return rounded[inverse.reshape(values.shape)]
+
+
+def _freeze(value):
+    """Recursively convert dicts to read-only mappings and lists to tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """Plain dict/list copy of frozen data, safe to hand out and serialize"""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_thaw(item) for item in value]
+    return value
+
 
 class CareerEngine:
     """Core engine for career path recommendation and roadmap generation"""
     
+    # Attribute name, MCQ slice (start, end) and normalizer used by diagnose_profile
+    profile_attributes = (
+        ("logical_intensity", 0, 4, 20.0),
+        ("creativity", 4, 8, 20.0),
+        ("consistency", 8, 12, 20.0),
+        ("ambiguity_tolerance", 12, 15, 15.0),
+        ("self_learning", 15, 18, 15.0),
+        ("time_to_reward", 18, 20, 10.0)
+    )
+    
+    frozen = False
+    
     def __init__(self):
         self.career_paths = self._initialize_career_paths()
         self.roadmap_templates = self._initialize_roadmap_templates()
+        self._compile_path_matrix()
     
     def _initialize_career_paths(self) -> Dict:
         """Define career path profiles with attribute vectors"""
@@ -122,6 +175,7 @@ class CareerEngine:
             }
         }
     
+    @timed_stage('diagnose_profile')
     def diagnose_profile(self, mcq_responses: List[int], constraints: Dict) -> Dict:
         """
         Convert MCQ responses into internal attribute scores
@@ -141,22 +195,10 @@ class CareerEngine:
         # Q16-18: Self-learning capability
         # Q19-20: Time-to-reward preference
         
-        logical_intensity = sum(mcq_responses[0:4]) / 20.0  # Normalize to 0-1
-        creativity = sum(mcq_responses[4:8]) / 20.0
-        consistency = sum(mcq_responses[8:12]) / 20.0
-        ambiguity_tolerance = sum(mcq_responses[12:15]) / 15.0
-        self_learning = sum(mcq_responses[15:18]) / 15.0
-        time_to_reward = sum(mcq_responses[18:20]) / 10.0
-        
-        profile = {
-            "logical_intensity": round(logical_intensity, 2),
-            "creativity": round(creativity, 2),
-            "consistency": round(consistency, 2),
-            "ambiguity_tolerance": round(ambiguity_tolerance, 2),
-            "self_learning": round(self_learning, 2),
-            "time_to_reward": round(time_to_reward, 2),
-            "constraints": constraints
-        }
+        profile = {}
+        for attr, start, end, normalizer in self.profile_attributes:
+            profile[attr] = round(sum(mcq_responses[start:end]) / normalizer, 2)  # Normalize to 0-1
+        profile["constraints"] = constraints
         
         return profile
     
@@ -200,6 +242,139 @@ class CareerEngine:
         total_score = attribute_score + constraint_score
         return round(total_score, 1)
     
+    def _compile_path_matrix(self):
+        """
+        Precompile career_paths into arrays for broadcasted scoring
+        
+        Each path keeps its own attribute order (positions in attribute_index),
+        so the vectorized sums add similarities in the same order as
+        compute_compatibility and produce identical scores.
+        """
+        self.path_keys = list(self.career_paths.keys())
+        
+        # Columns of the user value matrix: profile attributes first, then any
+        # path-only attributes (which always read the 0.5 default)
+        columns = [attr for attr, _, _, _ in self.profile_attributes]
+        for path in self.career_paths.values():
+            columns.extend(attr for attr in path["attributes"] if attr not in columns)
+        self.score_attributes = columns
+        
+        n_paths = len(self.path_keys)
+        width = max(len(path["attributes"]) for path in self.career_paths.values())
+        self.attribute_index = np.zeros((n_paths, width), dtype=np.intp)
+        self.attribute_values = np.zeros((n_paths, width))
+        self.attribute_mask = np.zeros((n_paths, width), dtype=bool)
+        self.attribute_count = np.zeros(n_paths)
+        
+        for p, key in enumerate(self.path_keys):
+            attributes = self.career_paths[key]["attributes"]
+            for j, (attr, path_value) in enumerate(attributes.items()):
+                self.attribute_index[p, j] = columns.index(attr)
+                self.attribute_values[p, j] = path_value
+                self.attribute_mask[p, j] = True
+            self.attribute_count[p] = len(attributes)
+        
+        requirements = [self.career_paths[key]["requirements"] for key in self.path_keys]
+        self.min_time_per_week = np.array([req["min_time_per_week"] for req in requirements])
+        self.internet_required = np.array([req["internet_required"] for req in requirements], dtype=bool)
+        self.high_barrier = np.array([req["financial_barrier"] == "high" for req in requirements], dtype=bool)
+        self.path_fingerprint = engine_fingerprint(self)
+    
+    def freeze(self) -> "CareerEngine":
+        """
+        Make path and template data immutable so one instance can be shared
+        across requests and threads. Outputs are still returned as plain copies.
+        """
+        self.career_paths = _freeze(self.career_paths)
+        self.roadmap_templates = _freeze(self.roadmap_templates)
+        for array in (self.attribute_index, self.attribute_values, self.attribute_mask,
+                      self.attribute_count, self.min_time_per_week, self.internet_required,
+                      self.high_barrier):
+            array.setflags(write=False)
+        self.frozen = True
+        return self
+    
+    def profile_matrix(self, user_profiles: List[Dict]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Convert diagnosed profiles into arrays for score_matrix
+        
+        Returns:
+            (user_values (N, n_score_attributes), time_per_week (N,), internet (N,), low_budget (N,))
+        """
+        user_values = np.array([
+            [profile.get(attr, 0.5) for attr in self.score_attributes]
+            for profile in user_profiles
+        ], dtype=np.float64).reshape(len(user_profiles), len(self.score_attributes))
+        
+        constraints = [profile["constraints"] for profile in user_profiles]
+        time_per_week = np.array([c.get("time_per_week", 0) for c in constraints], dtype=np.float64)
+        internet = np.array([bool(c.get("internet", True)) for c in constraints], dtype=bool)
+        low_budget = np.array([c.get("financial", "medium") == "low" for c in constraints], dtype=bool)
+        return user_values, time_per_week, internet, low_budget
+    
+    def attribute_scores(self, user_values: np.ndarray) -> np.ndarray:
+        """Unrounded attribute part (70% weight) of the compatibility, shape (N, n_paths)"""
+        total = None
+        for j in range(self.attribute_index.shape[1]):
+            user_value = user_values[:, self.attribute_index[:, j]]
+            similarity = 1 - np.abs(user_value - self.attribute_values[:, j])
+            if total is None:
+                total = similarity
+            else:
+                # Adding 0.0 for paths with fewer attributes leaves their sums unchanged
+                total = total + np.where(self.attribute_mask[:, j], similarity, 0.0)
+        return (total / self.attribute_count) * 70
+    
+    def constraint_scores(self, time_per_week: np.ndarray, internet: np.ndarray,
+                          low_budget: np.ndarray) -> np.ndarray:
+        """Constraint part (30% weight) of the compatibility, shape (N, n_paths)"""
+        time_per_week = np.asarray(time_per_week)[:, np.newaxis]
+        internet = np.asarray(internet, dtype=bool)[:, np.newaxis]
+        low_budget = np.asarray(low_budget, dtype=bool)[:, np.newaxis]
+        
+        constraint_score = np.full((time_per_week.shape[0], len(self.path_keys)), 30)
+        constraint_score -= 15 * (time_per_week < self.min_time_per_week)
+        constraint_score -= 10 * (self.internet_required & ~internet)
+        constraint_score -= 5 * (low_budget & self.high_barrier)
+        return constraint_score
+    
+    def score_matrix(self, user_values: np.ndarray, time_per_week: np.ndarray,
+                     internet: np.ndarray, low_budget: np.ndarray) -> np.ndarray:
+        """
+        Score many profiles against all paths in one broadcasted pass
+        
+        Returns:
+            Array (N, n_paths) equal to compute_compatibility for every pair
+        """
+        total = self.attribute_scores(user_values) + self.constraint_scores(time_per_week, internet, low_budget)
+        return round_scores(total, 1)
+    
+    def score_profiles(self, user_profiles: List[Dict]) -> np.ndarray:
+        """Compatibility of every profile with every path, shape (N, n_paths)"""
+        return self.score_matrix(*self.profile_matrix(user_profiles))
+    
+    def top_paths(self, scores: np.ndarray, k: int = 2) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Select the k best paths per row without a full sort
+        
+        Ties are broken by path order, like the stable sort in the scalar code.
+        
+        Returns:
+            (path indices (N, k), scores (N, k)), best first
+        """
+        scores = np.atleast_2d(scores)
+        n_paths = scores.shape[1]
+        k = min(k, n_paths)
+        # Scores are rounded to 0.1, so tenths plus a reversed path index form a unique integer key
+        key = np.rint(scores * 10).astype(np.int64) * n_paths + (n_paths - 1 - np.arange(n_paths))
+        if k < n_paths:
+            top = np.argpartition(-key, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(n_paths), key.shape)
+        order = np.argsort(-np.take_along_axis(key, top, axis=1), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        return top, np.take_along_axis(scores, top, axis=1)
+    
     def recommend_paths(self, user_profile: Dict) -> Tuple[Dict, Dict]:
         """
         Recommend exactly 1 primary and 1 secondary career path
@@ -207,36 +382,34 @@ class CareerEngine:
         Returns:
             Tuple of (primary_path, secondary_path) with scores and rationale
         """
-        # Compute compatibility for all paths
-        scores = []
-        for path_key in self.career_paths.keys():
-            score = self.compute_compatibility(user_profile, path_key)
-            scores.append((path_key, score))
+        # One profile: the per-path loop beats building the broadcast matrix
+        # (score_profiles/top_paths are for batches of profiles)
+        scores = [(path_key, self.compute_compatibility(user_profile, path_key)) for path_key in self.path_keys]
         
-        # Sort by score descending
+        # Sort by score descending (stable, so ties keep path order)
         scores.sort(key=lambda x: x[1], reverse=True)
         
-        # Get top 2
-        primary_key, primary_score = scores[0]
-        secondary_key, secondary_score = scores[1]
-        
-        primary_path = {
-            "key": primary_key,
-            "name": self.career_paths[primary_key]["name"],
-            "score": primary_score,
-            "rationale": self._generate_rationale(user_profile, primary_key, "primary"),
-            "outcomes": self.career_paths[primary_key]["outcomes"]
-        }
+        return self.build_recommendation(user_profile, scores[0], scores[1])
+    
+    def build_recommendation(self, user_profile: Dict, primary: Tuple[str, float],
+                             secondary: Tuple[str, float]) -> Tuple[Dict, Dict]:
+        """
+        Build the primary/secondary path output from already ranked (path_key, score) pairs
         
-        secondary_path = {
-            "key": secondary_key,
-            "name": self.career_paths[secondary_key]["name"],
-            "score": secondary_score,
-            "rationale": self._generate_rationale(user_profile, secondary_key, "secondary"),
-            "outcomes": self.career_paths[secondary_key]["outcomes"]
-        }
+        Returns:
+            Tuple of (primary_path, secondary_path) with scores and rationale
+        """
+        paths = []
+        for (path_key, score), rank in ((primary, "primary"), (secondary, "secondary")):
+            paths.append({
+                "key": path_key,
+                "name": self.career_paths[path_key]["name"],
+                "score": score,
+                "rationale": self._generate_rationale(user_profile, path_key, rank),
+                "outcomes": list(self.career_paths[path_key]["outcomes"])
+            })
         
-        return primary_path, secondary_path
+        return paths[0], paths[1]
     
     def _generate_rationale(self, user_profile: Dict, path_key: str, rank: str) -> str:
         """Generate human-readable rationale for path recommendation"""
@@ -478,6 +651,7 @@ class CareerEngine:
             # Add more templates for other paths...
         }
     
+    @timed_stage('generate_roadmap')
     def generate_roadmap(self, path_key: str, user_level: str, time_per_week: int) -> Dict:
         """
         Generate personalized 90-day roadmap
@@ -510,7 +684,7 @@ class CareerEngine:
             phase = template[phase_key]
             roadmap["phases"].append({
                 "name": phase["name"],
-                "weeks": phase["weeks"]
+                "weeks": _thaw(phase["weeks"])
             })
         
         # Add current week focus
@@ -579,6 +753,25 @@ class CareerEngine:
         return summary
 
 
+_shared_engine: Optional[CareerEngine] = None
+_shared_engine_lock = threading.Lock()
+
+
+def get_career_engine() -> CareerEngine:
+    """
+    Process-wide, read-only CareerEngine
+    
+    Built on first use and reused by every request, instead of rebuilding the
+    path and roadmap dictionaries each time.
+    """
+    global _shared_engine
+    if _shared_engine is None:
+        with _shared_engine_lock:
+            if _shared_engine is None:
+                _shared_engine = CareerEngine().freeze()
+    return _shared_engine
+
+
 # Utility function for integration
 def process_career_recommendation(mcq_responses: List[int], constraints: Dict, 
                                   interest: str, experience_level: str) -> Dict:
@@ -594,7 +787,7 @@ def process_career_recommendation(mcq_responses: List[int], constraints: Dict,
     Returns:
         Complete recommendation output with diagnosis, paths, and roadmap
     """
-    engine = CareerEngine()
+    engine = get_career_engine()
     
     # Step 1: Diagnose profile
     user_profile = engine.diagnose_profile(mcq_responses, constraints)
@@ -602,8 +795,14 @@ def process_career_recommendation(mcq_responses: List[int], constraints: Dict,
     # Step 2: Generate diagnosis summary
     diagnosis_summary = engine.generate_diagnosis_summary(user_profile)
     
-    # Step 3: Recommend paths
-    primary_path, secondary_path = engine.recommend_paths(user_profile)
+    # Step 3: Recommend paths (O(1) from the precomputed table when it is enabled and built)
+    with stage('recommend_paths'):
+        table = get_recommendation_table(engine)
+        ranked = table.lookup(mcq_responses, constraints) if table is not None else None
+        if ranked is not None:
+            primary_path, secondary_path = engine.build_recommendation(user_profile, *ranked)
+        else:
+            primary_path, secondary_path = engine.recommend_paths(user_profile)
     
     # Step 4: Generate roadmap for primary path
     roadmap = engine.generate_roadmap(
@@ -0,0 +1,246 @@
+"""
+Career Recommendation Lookup Table
+Precomputes CareerEngine.recommend_paths for every reachable input so the
+web tier can rank paths with a single array lookup.
+
+diagnose_profile only depends on six bucketed answer sums, and
+compute_compatibility only reads three constraint facts (which time
+thresholds are met, internet access, low budget). Both spaces are small and
+finite, so the top-2 ranking is enumerated once and stored as one packed
+uint32 per (constraint class, sum tuple):
+
+    primary_score*10 (10 bits) | secondary_score*10 (10 bits) | primary (6) | secondary (6)
+
+Memory: with the current engine the table is 8 constraint classes x 7.47M sum
+tuples of uint32, about 239 MB on disk. It is memory-mapped, so gunicorn
+workers share one page-cache copy, but a busy host still ends up with most
+of it resident, and it only saves the ~30us of CareerEngine.recommend_paths.
+The lookup is therefore off unless JOBSENSEI_RECOMMENDATION_TABLE=1 is set.
+When enabled, a missing table is looked for again every TABLE_RETRY_SECONDS,
+so one built after startup is picked up without a restart.
+
+Build with:  python career_lookup.py
+"""
+
+import hashlib
+import json
+import os
+import time
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+TABLE_PATH = 'career_recommendation_table.npy'
+META_PATH = 'career_recommendation_table.json'
+
+# Set to 1 to rank paths from the table instead of CareerEngine.recommend_paths
+TABLE_ENABLED = os.environ.get('JOBSENSEI_RECOMMENDATION_TABLE', '0') == '1'
+# How long a missing, stale or unreadable table is remembered before trying again
+TABLE_RETRY_SECONDS = 60.0
+
+MIN_ANSWER = 1
+MAX_ANSWER = 5
+MAX_PATHS = 64  # 6-bit path index
+MAX_DECI_SCORE = 1023  # 10-bit score field
+
+
+def engine_fingerprint(engine) -> str:
+    """Hash of everything the ranking depends on, used to reject stale tables"""
+    payload = {
+        "profile_attributes": engine.profile_attributes,
+        "career_paths": {
+            key: {"attributes": path["attributes"], "requirements": path["requirements"]}
+            for key, path in engine.career_paths.items()
+        }
+    }
+    # default=dict also serializes the read-only mappings of a frozen engine
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=dict).encode('utf-8')).hexdigest()
+
+
+class RecommendationTable:
+    """Packed top-2 path ranking for every (constraint class, answer-sum tuple)"""
+
+    def __init__(self, table: np.ndarray, meta: Dict):
+        self.table = table
+        self.meta = meta
+        self.path_keys: List[str] = meta["path_keys"]
+        self.time_thresholds: List[int] = meta["time_thresholds"]
+        self.class_map = meta["class_map"]
+        self.slices = [(start, end) for start, end in meta["slices"]]
+        self.radix = meta["radix"]
+        self.n_questions = max(end for _, end in self.slices)
+
+    def _tuple_index(self, mcq_responses: List[int]) -> Optional[int]:
+        if len(mcq_responses) != self.n_questions:
+            return None
+        for answer in mcq_responses:
+            if type(answer) is not int or not MIN_ANSWER <= answer <= MAX_ANSWER:
+                return None
+        index = 0
+        for (start, end), radix in zip(self.slices, self.radix):
+            index = index * radix + (sum(mcq_responses[start:end]) - (end - start) * MIN_ANSWER)
+        return index
+
+    def _constraint_class(self, constraints: Dict) -> Optional[int]:
+        time_per_week = constraints.get("time_per_week", 0)
+        if not isinstance(time_per_week, (int, float)):
+            return None
+        time_class = bisect_right(self.time_thresholds, time_per_week)
+        no_internet = int(not constraints.get("internet", True))
+        low_budget = int(constraints.get("financial", "medium") == "low")
+        return self.class_map[(time_class * 2 + no_internet) * 2 + low_budget]
+
+    def lookup(self, mcq_responses: List[int], constraints: Dict) -> Optional[Tuple[Tuple[str, float], Tuple[str, float]]]:
+        """
+        Return ((primary_key, score), (secondary_key, score)) exactly as recommend_paths ranks them
+
+        Returns None for inputs outside the enumerated space (caller falls back to the engine).
+        """
+        index = self._tuple_index(mcq_responses)
+        row = self._constraint_class(constraints)
+        if index is None or row is None:
+            return None
+
+        packed = int(self.table[row, index])
+        primary_score = (packed >> 22) / 10
+        secondary_score = ((packed >> 12) & 0x3FF) / 10
+        primary = self.path_keys[(packed >> 6) & 0x3F]
+        secondary = self.path_keys[packed & 0x3F]
+        return (primary, primary_score), (secondary, secondary_score)
+
+
+def build_table(engine) -> Tuple[np.ndarray, Dict]:
+    """
+    Enumerate recommend_paths over the full input space of an engine
+
+    Args:
+        engine: CareerEngine whose career_paths define the ranking
+
+    Returns:
+        (packed uint32 table of shape (n_constraint_classes, n_sum_tuples), metadata)
+    """
+    from career_engine import round_scores
+
+    path_keys = engine.path_keys
+    if not 2 <= len(path_keys) <= MAX_PATHS:
+        raise ValueError(f"Lookup table supports 2-{MAX_PATHS} paths, got {len(path_keys)}")
+
+    # Every reachable rounded attribute value, one axis per profile attribute
+    slices = [(start, end) for _, start, end, _ in engine.profile_attributes]
+    radix = [(end - start) * (MAX_ANSWER - MIN_ANSWER) + 1 for start, end in slices]
+    axis_values = {}
+    for axis, (attr, start, end, normalizer) in enumerate(engine.profile_attributes):
+        sums = range((end - start) * MIN_ANSWER, (end - start) * MAX_ANSWER + 1)
+        values = np.array([round(s / normalizer, 2) for s in sums])
+        shape = [1] * len(slices)
+        shape[axis] = len(values)
+        axis_values[attr] = values.reshape(shape)
+
+    # Attribute part of compute_compatibility, accumulated in the same order
+    attribute_scores = []
+    for key in path_keys:
+        attributes = engine.career_paths[key]["attributes"]
+        total = None
+        for attr, path_value in attributes.items():
+            user_value = axis_values.get(attr, 0.5)
+            similarity = 1 - np.abs(user_value - path_value)
+            total = similarity if total is None else total + similarity
+        total = np.broadcast_to((total / len(attributes)) * 70, radix).ravel()
+        attribute_scores.append(np.unique(total, return_inverse=True))
+
+    # Constraint classes: which time thresholds are met, internet, low budget
+    time_thresholds = sorted(set(engine.min_time_per_week.tolist()))
+    time_per_week, internet, low_budget = [], [], []
+    for time_class in range(len(time_thresholds) + 1):
+        for no_internet in (False, True):
+            for low in (False, True):
+                # Smallest time that meets exactly time_class thresholds
+                time_per_week.append(time_thresholds[time_class - 1] if time_class else min(time_thresholds) - 1)
+                internet.append(not no_internet)
+                low_budget.append(low)
+    penalties = [tuple(row) for row in engine.constraint_scores(time_per_week, internet, low_budget).tolist()]
+
+    # Classes with identical constraint scores share a table row
+    unique_penalties = list(dict.fromkeys(penalties))
+    class_map = [unique_penalties.index(p) for p in penalties]
+
+    n_tuples = int(np.prod(radix))
+    table = np.empty((len(unique_penalties), n_tuples), dtype=np.uint32)
+    rows = np.arange(n_tuples)
+    for row, constraint_scores in enumerate(unique_penalties):
+        scores = np.empty((n_tuples, len(path_keys)), dtype=np.int16)
+        for p, ((uniques, inverse), constraint_score) in enumerate(zip(attribute_scores, constraint_scores)):
+            tenths = np.rint(round_scores(uniques + constraint_score, 1) * 10).astype(np.int16)
+            scores[:, p] = tenths[inverse.ravel()]
+        if scores.max() > MAX_DECI_SCORE or scores.min() < 0:
+            raise ValueError("Compatibility scores do not fit the packed table format")
+
+        # argmax returns the first maximum, matching the stable sort in recommend_paths
+        primary = np.argmax(scores, axis=1)
+        primary_score = scores[rows, primary].astype(np.uint32)
+        scores[rows, primary] = -1
+        secondary = np.argmax(scores, axis=1)
+        secondary_score = scores[rows, secondary].astype(np.uint32)
+
+        table[row] = (primary_score << 22) | (secondary_score << 12) | (primary.astype(np.uint32) << 6) | secondary.astype(np.uint32)
+
+    meta = {
+        "fingerprint": engine_fingerprint(engine),
+        "path_keys": path_keys,
+        "time_thresholds": time_thresholds,
+        "class_map": class_map,
+        "slices": slices,
+        "radix": radix
+    }
+    return table, meta
+
+
+def save_table(table: np.ndarray, meta: Dict, table_path: str = TABLE_PATH, meta_path: str = META_PATH):
+    """Write the table as a plain .npy (memory-mappable) with a JSON sidecar"""
+    np.save(table_path, table)
+    with open(meta_path, 'w') as file:
+        json.dump(meta, file, indent=2)
+
+
+def load_table(fingerprint: str, table_path: str = TABLE_PATH,
+               meta_path: str = META_PATH) -> Optional[RecommendationTable]:
+    """Memory-map a previously built table; returns None if missing or stale"""
+    if not (os.path.exists(table_path) and os.path.exists(meta_path)):
+        return None
+    with open(meta_path) as file:
+        meta = json.load(file)
+    if meta.get("fingerprint") != fingerprint:
+        print(f"Ignoring stale recommendation table {table_path}; rebuild with python career_lookup.py")
+        return None
+    return RecommendationTable(np.load(table_path, mmap_mode='r'), meta)
+
+
+# fingerprint -> (table or None, time.monotonic() of the attempt)
+_table_cache: Dict[str, Tuple[Optional[RecommendationTable], float]] = {}
+
+
+def get_recommendation_table(engine) -> Optional[RecommendationTable]:
+    """Process-wide table for an engine's path data (None if disabled or unavailable)"""
+    if not TABLE_ENABLED:
+        return None
+    fingerprint = engine.path_fingerprint
+    table, checked = _table_cache.get(fingerprint, (None, None))
+    if table is None and (checked is None or time.monotonic() - checked >= TABLE_RETRY_SECONDS):
+        try:
+            table = load_table(fingerprint)
+        except Exception as e:
+            print(f"Error loading recommendation table: {str(e)}")
+            table = None
+        _table_cache[fingerprint] = (table, time.monotonic())
+    return table
+
+
+if __name__ == '__main__':
+    from career_engine import CareerEngine
+
+    start = time.perf_counter()
+    table, meta = build_table(CareerEngine())
+    save_table(table, meta)
+    print(f"Built {table.shape[0]} constraint classes x {table.shape[1]} sum tuples "
+          f"({table.nbytes / 1e6:.1f} MB) in {time.perf_counter() - start:.1f}s -> {TABLE_PATH}")
@@ -1,84 +1,147 @@
 # Career Recommendation - Random Forest Model
 # Clean version with display() removed and model path fixed
+#
+# Run:  python career_model_trainer.py [--dataset psychometric_dataset.csv] [--no-cache]
+#                                  [--search halving|grid|grid-shared] [--resource n_estimators|n_samples]
+#                                  [--compare-models --objective accuracy --max-p99-ms 1.0]
+#       python career_model_trainer.py --incremental [--new-trees 50] [--window-trees 300] [--compare-full]
 
+import argparse
+import json
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split, GridSearchCV
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
+from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
-from sklearn.pipeline import Pipeline
-from collections import Counter
+from model_search import DEFAULT_FOLDS, RESOURCES, SEARCH_MODES, run_search
+from incremental_training import (COMPILED_DIR, KEEP_VERSIONS, VERSIONS_DIR, full_training_state, load_training_state,
+                                  publish_model, train_incremental)
+from model_selection import OBJECTIVES, compare_models, print_selection_report, select_model
+from training_data import (DATASET_CACHE_DIR, DEFAULT_CHUNKSIZE, QUESTION_COLUMNS, count_rows, describe,
+                           load_cached_dataset, load_dataset)
 import pickle
 import warnings
 warnings.filterwarnings('ignore')
 
-# Load the dataset
-df = pd.read_csv('psychometric_dataset.csv')
-
-# Display basic info
-print("Dataset Shape:", df.shape)
-print("\nFirst few rows:")
-print(df.head())
-
-# Check for missing values
-print("\nMissing values:")
-print(df.isnull().sum())
-
-# Check class distribution
-job_counts = Counter(df['Job_Role'])
-print("\nJob role distribution:")
-for job, count in job_counts.items():
-    print(f"{job}: {count}")
-
-# Remove single-entry jobs
-single_entry_jobs = [job for job, count in job_counts.items() if count == 1]
-if single_entry_jobs:
-    print(f"\nRemoving {len(single_entry_jobs)} job roles with single entries")
-    df = df[~df['Job_Role'].isin(single_entry_jobs)]
-
-# Prepare data
-X = df.drop('Job_Role', axis=1)
-y = df['Job_Role']
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42, stratify=y)
-
-# Model pipeline
-pipeline = Pipeline([
-    ('scaler', StandardScaler()),
-    ('rf', RandomForestClassifier(random_state=42))
-])
-
-# Hyperparameter tuning
-param_grid = {
-    'rf__n_estimators': [100, 200],
-    'rf__max_depth': [None, 15],
-    'rf__min_samples_split': [2, 5],
-    'rf__max_features': ['sqrt', 'log2']
-}
-
-grid_search = GridSearchCV(
-    pipeline, param_grid, cv=5, scoring='accuracy', n_jobs=-1, verbose=1
-)
-grid_search.fit(X_train, y_train)
-
-# Get best model
-best_model = grid_search.best_estimator_
-
-# Evaluation
-y_pred = best_model.predict(X_test)
-print("\nAccuracy:", accuracy_score(y_test, y_pred))
-print("\nClassification Report:")
-print(classification_report(y_test, y_pred))
-
-# Save model
-with open('career_recommendation_model.pkl', 'wb') as file:
-    pickle.dump(best_model, file)
+MODEL_PATH = 'career_recommendation_model.pkl'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the career recommendation model")
+    parser.add_argument('--dataset', default='psychometric_dataset.csv')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help='rows parsed per chunk while streaming the CSV')
+    parser.add_argument('--min-class-count', type=int, default=2,
+                        help='drop job roles with fewer rows (2 removes single-entry jobs)')
+    parser.add_argument('--cache-dir', default=DATASET_CACHE_DIR,
+                        help='binary dataset cache, keyed by the CSV content hash')
+    parser.add_argument('--no-cache', action='store_true', help='always parse the CSV')
+    parser.add_argument('--rebuild-cache', action='store_true', help='re-parse the CSV and overwrite its cache entry')
+    parser.add_argument('--search', choices=SEARCH_MODES, default='halving',
+                        help='successive halving over a wide space, or the original 16-config grid '
+                             '(grid-shared: on a process pool with memory-mapped folds)')
+    parser.add_argument('--resource', choices=RESOURCES, default='n_estimators',
+                        help='budget grown between halving rounds')
+    parser.add_argument('--candidates', type=int, default=27, help='configs in the first halving round')
+    parser.add_argument('--folds', type=int, default=DEFAULT_FOLDS)
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--compare-models', action='store_true',
+                        help='also fit RF variants, HistGradientBoosting and kNN and select by --objective')
+    parser.add_argument('--objective', choices=OBJECTIVES, default='accuracy')
+    parser.add_argument('--max-p99-ms', type=float, help='single-row p99 latency budget for --compare-models')
+    parser.add_argument('--max-size-mb', type=float, help='pickled size budget for --compare-models')
+    parser.add_argument('--selection-report', help='write the --compare-models results as JSON')
+    parser.add_argument('--publish-any-model', action='store_true',
+                        help='let --compare-models publish HistGradientBoosting/kNN (breaks the compiled '
+                             'bundle, --incremental and explanations)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='add trees fitted on rows appended since the last version instead of retraining')
+    parser.add_argument('--new-trees', type=int, default=50, help='trees added by --incremental')
+    parser.add_argument('--window-trees', type=int, help='retire the oldest trees beyond this many')
+    parser.add_argument('--holdout', type=float, default=0.2, help='share of new rows held out for the drift report')
+    parser.add_argument('--compare-full', action='store_true',
+                        help='also retrain from scratch and report accuracy drift of the incremental model')
+    parser.add_argument('--versions-dir', default=VERSIONS_DIR)
+    parser.add_argument('--keep-versions', type=int, default=KEEP_VERSIONS,
+                        help='versioned pickles kept in --versions-dir (0 keeps all)')
+    parser.add_argument('--compiled-model-dir', default=COMPILED_DIR,
+                        help="compiled bundle re-exported on every publish ('' to skip)")
+    parser.add_argument('--output', default=MODEL_PATH)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.incremental:
+        return train_incremental_model(args)
+
+    # Load the dataset: uint8 answers and job role codes, memory-mapped from the
+    # binary cache, or streamed from the CSV in chunks when it changed;
+    # single-entry jobs are removed in place (see training_data.py)
+    if args.no_cache:
+        dataset = load_dataset(args.dataset, args.chunksize, args.min_class_count)
+    else:
+        dataset = load_cached_dataset(args.dataset, args.cache_dir, args.chunksize, args.min_class_count,
+                                      rebuild=args.rebuild_cache)
+    describe(dataset)
+
+    # Prepare data
+    X = dataset.features()
+    y = dataset.labels()
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y)
+
+    # Hyperparameter tuning (scaler + random forest pipeline, see model_search.py)
+    options = {"resource": args.resource, "n_candidates": args.candidates} if args.search == 'halving' else {}
+    search, _ = run_search(args.search, X_train, y_train, y_train.codes, n_splits=args.folds,
+                           cache_dir=None if args.no_cache else args.cache_dir, n_jobs=args.n_jobs, **options)
+
+    # Get best model
+    best_model = search.best_estimator_
+
+    # Optionally weigh serving latency and size against accuracy (see model_selection.py)
+    if args.compare_models:
+        results, models = compare_models(best_model, X_train, y_train, X_test, y_test)
+        chosen, within_budget = select_model(results, args.objective, args.max_p99_ms, args.max_size_mb,
+                                             publishable_only=not args.publish_any_model)
+        print_selection_report(results, chosen, within_budget, publishable_only=not args.publish_any_model)
+        best_model = models[chosen["name"]]
+        if args.selection_report:
+            with open(args.selection_report, 'w') as file:
+                json.dump({"objective": args.objective, "max_p99_ms": args.max_p99_ms,
+                           "max_size_mb": args.max_size_mb, "selected": chosen["name"],
+                           "candidates": results}, file, indent=2)
+
+    # Evaluation
+    y_pred = best_model.predict(X_test)
+    print("\nAccuracy:", accuracy_score(y_test, y_pred))
+    print("\nClassification Report:")
+    print(classification_report(y_test, y_pred))
+
+    # Save model as a new version (see incremental_training.py)
+    forest = best_model.steps[-1][1] if hasattr(best_model, 'steps') else best_model
+    state = full_training_state(load_training_state(args.output), args.dataset, count_rows(args.dataset),
+                                len(getattr(forest, 'estimators_', [])))
+    path = publish_model(best_model, args.output, state, args.versions_dir, args.keep_versions,
+                         args.compiled_model_dir or None)
+    print(f"\nVersion {state['version']} written to {path} and published as {args.output}")
+
+
+def train_incremental_model(args):
+    # Every row in file order: new rows are found by position, and rows of
+    # single-entry jobs are still valid additions to existing classes
+    if args.no_cache:
+        dataset = load_dataset(args.dataset, args.chunksize, min_class_count=1)
+    else:
+        dataset = load_cached_dataset(args.dataset, args.cache_dir, args.chunksize, min_class_count=1,
+                                      rebuild=args.rebuild_cache)
+    train_incremental(args.output, dataset, args.dataset, args.new_trees, args.window_trees,
+                      args.holdout, args.compare_full, args.versions_dir, keep_versions=args.keep_versions,
+                      compiled_dir=args.compiled_model_dir or None)
+
 
 # Recommendation functions
 def recommend_careers(user_responses, model, top_n=5):
-    column_names = X.columns
-    user_df = pd.DataFrame([user_responses], columns=column_names)
+    user_df = pd.DataFrame([user_responses], columns=QUESTION_COLUMNS)
     proba = model.predict_proba(user_df)
     return pd.DataFrame({
         'Job_Role': model.classes_,
@@ -86,7 +149,7 @@ def recommend_careers(user_responses, model, top_n=5):
     }).sort_values(by='Match_Percentage', ascending=False).head(top_n)
 
 def get_career_recommendations_for_webapp(user_responses):
-    with open('career_recommendation_model.pkl', 'rb') as file:
+    with open(MODEL_PATH, 'rb') as file:
         model = pickle.load(file)
     recommendations = recommend_careers(user_responses, model)
     return {
@@ -96,3 +159,7 @@ def get_career_recommendations_for_webapp(user_responses):
             'explanation': f"Based on your assessment, {row['Job_Role']} is a good match."
         } for _, row in recommendations.iterrows()]
     }
+
+
+if __name__ == '__main__':
+    main()
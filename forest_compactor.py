@@ -0,0 +1,412 @@
+"""
+Forest Compactor - Smaller Serving Bundles for the Career Model
+Post-training compaction of a CompiledForest (see forest_compiler.py):
+
+    leaves    only leaf nodes keep a class distribution, and each keeps its
+              top_k classes (uint8/uint16 ids) with float16 or float32
+              probabilities instead of a dense float64 row per node
+    nodes     feature ids as uint8, child links as int32, and thresholds as
+              int8: answers are integers 1-5, so "x <= t" is the same test
+              as "x <= floor(t)" for every valid input
+    pruning   optionally keep only the trees whose own top-5 agrees most
+              often with the full ensemble's top-5 on half of the
+              validation rows
+
+Unlike the exact compiled forest, a compact forest is an approximation (and
+only valid for integer answers); build_report measures its top-1/top-5
+agreement with the original next to the size and latency gains, on rows
+that were not used to rank trees. The CLI refuses to write a bundle whose
+top-5 set agreement is below --min-agreement (MIN_TOP5_AGREEMENT). With the
+shipped 200-tree, 100-class forest the top-5 set of half a forest matches
+the full one on only ~4% of rows whichever trees are kept, so pruning it is
+refused; leaf compaction alone keeps ~99.7%.
+
+Bundles use the same manifest layout, so load_compiled and the app load
+them directly:
+
+    python forest_compactor.py career_recommendation_model.pkl career_model_compact [--top-k 8] [--keep-trees 0.5] [--min-agreement 0.99]
+    JOBSENSEI_COMPILED_MODEL_DIR=career_model_compact gunicorn app:app
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from forest_compiler import MANIFEST_NAME, CompiledForest, file_sha256
+
+COMPACT_FORMAT = 2
+COMPACT_ARRAYS = ('feature', 'threshold', 'children', 'leaf_index', 'leaf_classes', 'leaf_proba', 'roots')
+VALUE_DTYPES = ('float16', 'float32')
+# Lowest held-out top-5 set agreement with the exact forest a bundle may have
+MIN_TOP5_AGREEMENT = 0.99
+
+# Threshold for leaves: every answer goes "left", i.e. back to the leaf itself
+LEAF_THRESHOLD = np.iinfo(np.int8).max
+
+
+class CompactForest:
+    """Integer-input forest with sparse top-k leaf distributions"""
+
+    # Upper bound on the (trees x rows x top_k) buffer gathered per chunk
+    max_chunk_elements = 1 << 22
+    version: Optional[str] = None
+    source_sha256: Optional[str] = None
+
+    def __init__(self, classes: np.ndarray, feature: np.ndarray, threshold: np.ndarray, children: np.ndarray,
+                 leaf_index: np.ndarray, leaf_classes: np.ndarray, leaf_proba: np.ndarray,
+                 roots: np.ndarray, max_depth: int, n_features: int):
+        self.classes_ = classes
+        self.feature = feature
+        self.threshold = threshold
+        # children[2 * node + went_left], as in CompiledForest; stored as int32,
+        # but walked as intp, since numpy converts every narrower index array
+        # on each fancy-indexing step (about +60% single-row latency)
+        self.children = children
+        self._links = np.asarray(children, dtype=np.intp)
+        self.leaf_index = leaf_index
+        self.leaf_classes = leaf_classes
+        self.leaf_proba = leaf_proba
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.n_features_in_ = int(n_features)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.feature)
+
+    @property
+    def top_k(self) -> int:
+        return self.leaf_classes.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in COMPACT_ARRAYS)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Global leaf node reached in every tree, shape (n_trees, n_rows)"""
+        X = np.ascontiguousarray(X, dtype=np.int16)
+        flat_x = X.ravel()
+        row_offset = (np.arange(X.shape[0]) * X.shape[1])[np.newaxis, :]
+        node = np.repeat(self.roots[:, np.newaxis], X.shape[0], axis=1)
+        for _ in range(self.max_depth):
+            go_left = flat_x.take(row_offset + self.feature.take(node)) <= self.threshold.take(node)
+            node = self._links.take(2 * node + go_left)
+        return node
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        Approximate class probabilities for integer answers
+
+        Args:
+            X: Answers, shape (n_rows, n_features) or (n_features,)
+
+        Returns:
+            Array of shape (n_rows, n_classes)
+        """
+        X = np.asarray(X)
+        if X.ndim == 1 or X.shape[0] == 1:
+            return self.predict_proba_one(X.reshape(-1))[np.newaxis, :]
+
+        n_classes = len(self.classes_)
+        chunk = max(1, self.max_chunk_elements // max(1, self.n_trees * self.top_k))
+        proba = np.empty((X.shape[0], n_classes), dtype=np.float64)
+        for start in range(0, X.shape[0], chunk):
+            leaves = self.leaf_index[self.apply(X[start:start + chunk])]
+            rows = leaves.shape[1]
+            # One bincount scatters every (tree, row, k) entry into its row's class slot
+            slots = np.arange(rows)[np.newaxis, :, np.newaxis] * n_classes + self.leaf_classes[leaves]
+            proba[start:start + rows] = np.bincount(slots.ravel(), weights=self.leaf_proba[leaves].ravel(),
+                                                    minlength=rows * n_classes).reshape(rows, n_classes)
+        # Row sums rather than n_trees, so float16 rounding still yields distributions
+        proba /= proba.sum(axis=1, keepdims=True)
+        return proba
+
+    def predict_proba_one(self, x: np.ndarray) -> np.ndarray:
+        """Approximate class probabilities for a single answer vector"""
+        x = np.asarray(x, dtype=np.int16)
+        node = self.roots
+        feature, threshold, links = self.feature, self.threshold, self._links
+        for _ in range(self.max_depth):
+            node = links[2 * node + (x[feature[node]] <= threshold[node])]
+        leaves = self.leaf_index[node]
+        proba = np.bincount(self.leaf_classes[leaves].ravel(), weights=self.leaf_proba[leaves].ravel(),
+                            minlength=len(self.classes_))
+        proba /= proba.sum()
+        return proba
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Most probable class label for each row"""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def tree_agreement(forest: CompiledForest, X: np.ndarray, top_n: int = 5, chunk_rows: int = 256) -> np.ndarray:
+    """
+    How often each tree's own top_n classes are the full ensemble's top_n
+
+    Returns:
+        Per-tree mean fraction of the ensemble's top_n classes that are also
+        in the tree's top_n, shape (n_trees,)
+    """
+    X = np.asarray(X)
+    totals = np.zeros(forest.n_trees)
+    for start in range(0, len(X), chunk_rows):
+        leaves = forest.apply(X[start:start + chunk_rows])
+        per_tree = np.asarray(forest.value[leaves])  # (trees, rows, classes)
+        ensemble_top = np.argsort(-per_tree.mean(axis=0), axis=1, kind='stable')[:, :top_n]
+        tree_top = np.argsort(-per_tree, axis=2, kind='stable')[:, :, :top_n]
+        shared = (tree_top[:, :, :, np.newaxis] == ensemble_top[np.newaxis, :, np.newaxis, :]).any(axis=3)
+        totals += shared.sum(axis=(1, 2))
+    return totals / (len(X) * top_n)
+
+
+def split_validation(X: np.ndarray, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Shuffle validation answers into (rows that rank trees, held-out rows that validate the result)"""
+    X = np.asarray(X)
+    order = np.random.default_rng(seed).permutation(len(X))
+    half = len(X) // 2
+    return X[order[:half]], X[order[half:]]
+
+
+def compact_forest(forest: CompiledForest, top_k: int = 8, value_dtype: str = 'float16',
+                   keep_trees: Optional[int] = None, X_validation: Optional[np.ndarray] = None) -> CompactForest:
+    """
+    Build a CompactForest from an exact CompiledForest
+
+    Args:
+        forest: Source forest
+        top_k: Classes kept per leaf
+        value_dtype: 'float16' or 'float32' leaf probabilities
+        keep_trees: Keep this many trees, ranked by tree_agreement on X_validation (None keeps all)
+        X_validation: Answers used to rank trees for pruning
+
+    Returns:
+        CompactForest
+    """
+    if value_dtype not in VALUE_DTYPES:
+        raise ValueError(f"value_dtype must be one of {', '.join(VALUE_DTYPES)}")
+    if forest.n_features_in_ > np.iinfo(np.uint8).max:
+        raise ValueError("Too many features for uint8 feature ids")
+
+    roots = np.asarray(forest.roots)
+    tree_ends = np.append(roots[1:], forest.node_count)
+    trees = np.arange(forest.n_trees)
+    if keep_trees is not None and keep_trees < forest.n_trees:
+        if X_validation is None:
+            raise ValueError("Pruning needs validation answers to rank the trees")
+        agreement = tree_agreement(forest, X_validation)
+        trees = np.sort(np.argsort(-agreement, kind='stable')[:keep_trees])
+
+    # Gather the kept trees' nodes and renumber them contiguously
+    node_ids = np.concatenate([np.arange(roots[t], tree_ends[t]) for t in trees])
+    new_id = np.full(forest.node_count, -1, dtype=np.int64)
+    new_id[node_ids] = np.arange(len(node_ids))
+    if len(node_ids) >= np.iinfo(np.int32).max // 2:
+        raise ValueError("Too many nodes for int32 child links")
+
+    left = new_id[np.asarray(forest.left)[node_ids]]
+    right = new_id[np.asarray(forest.right)[node_ids]]
+    is_leaf = left == np.arange(len(node_ids))
+
+    threshold = np.asarray(forest.threshold)[node_ids]
+    with np.errstate(invalid='ignore'):
+        threshold = np.floor(np.clip(threshold, -128, 127))
+    threshold = threshold.astype(np.int8)
+    threshold[is_leaf] = LEAF_THRESHOLD
+
+    leaf_nodes = node_ids[is_leaf]
+    leaf_index = np.full(len(node_ids), -1, dtype=np.int32)
+    leaf_index[is_leaf] = np.arange(len(leaf_nodes), dtype=np.int32)
+
+    n_classes = len(forest.classes_)
+    top_k = min(top_k, n_classes)
+    class_dtype = np.uint8 if n_classes <= np.iinfo(np.uint8).max + 1 else np.uint16
+    leaf_classes = np.empty((len(leaf_nodes), top_k), dtype=class_dtype)
+    leaf_proba = np.empty((len(leaf_nodes), top_k), dtype=value_dtype)
+    for start in range(0, len(leaf_nodes), 65536):
+        values = np.asarray(forest.value[leaf_nodes[start:start + 65536]])
+        top = np.argsort(-values, axis=1, kind='stable')[:, :top_k]
+        leaf_classes[start:start + len(top)] = top
+        kept = np.take_along_axis(values, top, axis=1)
+        # Renormalize what is left of each leaf, so every tree keeps an equal vote
+        leaf_proba[start:start + len(top)] = kept / kept.sum(axis=1, keepdims=True)
+
+    return CompactForest(
+        classes=np.asarray(forest.classes_),
+        feature=np.asarray(forest.feature)[node_ids].astype(np.uint8),
+        threshold=threshold,
+        children=np.stack([right, left], axis=1).ravel().astype(np.int32),
+        leaf_index=leaf_index,
+        leaf_classes=leaf_classes,
+        leaf_proba=leaf_proba,
+        roots=new_id[roots[trees]].astype(np.int32),
+        max_depth=forest.max_depth,
+        n_features=forest.n_features_in_
+    )
+
+
+def save_compact(forest: CompactForest, directory: str, source_path: Optional[str] = None,
+                 report: Optional[Dict] = None) -> Dict:
+    """Export a compact forest as an mmap-able bundle (manifest written last, like save_compiled)"""
+    os.makedirs(directory, exist_ok=True)
+    files = {}
+    for name in COMPACT_ARRAYS:
+        filename = f'{name}.npy'
+        path = os.path.join(directory, filename)
+        np.save(path, np.ascontiguousarray(getattr(forest, name)))
+        files[name] = {"file": filename, "sha256": file_sha256(path)}
+
+    manifest = {
+        "format": COMPACT_FORMAT,
+        "kind": 'compact',
+        "classes": [str(c) for c in forest.classes_],
+        "max_depth": forest.max_depth,
+        "n_features": forest.n_features_in_,
+        "n_trees": forest.n_trees,
+        "node_count": forest.node_count,
+        "top_k": forest.top_k,
+        "value_dtype": str(forest.leaf_proba.dtype),
+        "integer_inputs": True,
+        "files": files,
+        "source_sha256": file_sha256(source_path) if source_path else None
+    }
+    manifest["version"] = hashlib.sha256(json.dumps(manifest, sort_keys=True).encode('utf-8')).hexdigest()
+    if report is not None:
+        manifest["validation"] = report
+
+    tmp_path = os.path.join(directory, MANIFEST_NAME + '.tmp')
+    with open(tmp_path, 'w') as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(tmp_path, os.path.join(directory, MANIFEST_NAME))
+    return manifest
+
+
+def load_compact(directory: str, manifest: Dict, mmap: bool = True, verify: bool = True) -> CompactForest:
+    """Load a bundle written by save_compact (called by forest_compiler.load_compiled)"""
+    arrays = {}
+    for name in COMPACT_ARRAYS:
+        entry = manifest["files"][name]
+        path = os.path.join(directory, entry["file"])
+        if verify and file_sha256(path) != entry["sha256"]:
+            raise ValueError(f"Compact model file {path} does not match its manifest hash")
+        arrays[name] = np.load(path, mmap_mode='r' if mmap else None, allow_pickle=False)
+
+    forest = CompactForest(
+        classes=np.array(manifest["classes"], dtype=object),
+        roots=arrays.pop("roots"),
+        max_depth=manifest["max_depth"],
+        n_features=manifest["n_features"],
+        **arrays
+    )
+    forest.version = manifest["version"]
+    forest.source_sha256 = manifest.get("source_sha256")
+    return forest
+
+
+def build_report(original: CompiledForest, compact: CompactForest, X: np.ndarray) -> Dict:
+    """Top-1/top-5 agreement, probability error, size and latency of compact vs original"""
+    from model_selection import measure_latency
+
+    X = np.asarray(X)
+    exact = original.predict_proba(X)
+    approx = compact.predict_proba(X)
+    exact_top = np.argsort(-exact, axis=1, kind='stable')[:, :5]
+    approx_top = np.argsort(-approx, axis=1, kind='stable')[:, :5]
+    same_set = (np.sort(exact_top, axis=1) == np.sort(approx_top, axis=1)).all(axis=1)
+
+    original_latency = measure_latency(original, X)
+    compact_latency = measure_latency(compact, X)
+    return {
+        "rows": len(X),
+        "top1_agreement": float(np.mean(exact_top[:, 0] == approx_top[:, 0])),
+        "top5_set_agreement": float(np.mean(same_set)),
+        "top5_order_agreement": float(np.mean((exact_top == approx_top).all(axis=1))),
+        "max_abs_proba_error": float(np.abs(exact - approx).max()),
+        "trees": [original.n_trees, compact.n_trees],
+        "nodes": [original.node_count, compact.node_count],
+        "megabytes": [original.nbytes / 1e6, compact.nbytes / 1e6],
+        "single_row_p50_ms": [original_latency["p50_ms"], compact_latency["p50_ms"]],
+        "single_row_p99_ms": [original_latency["p99_ms"], compact_latency["p99_ms"]],
+        "batch_ms": [original_latency["batch_ms"], compact_latency["batch_ms"]]
+    }
+
+
+def check_agreement(report: Dict, min_agreement: float = MIN_TOP5_AGREEMENT):
+    """Raise ValueError when a compact forest's top-5 set agreement is below min_agreement"""
+    if report["top5_set_agreement"] < min_agreement:
+        raise ValueError(f"top-5 set agreement {report['top5_set_agreement']:.2%} on {report['rows']:,} held-out rows "
+                         f"is below the {min_agreement:.2%} threshold; keep more trees or lower --min-agreement")
+
+
+def print_report(report: Dict):
+    print(f"\nValidation on {report['rows']:,} rows: top-1 agreement {report['top1_agreement']:.2%}, "
+          f"top-5 set {report['top5_set_agreement']:.2%}, top-5 order {report['top5_order_agreement']:.2%}, "
+          f"max |p - p'| {report['max_abs_proba_error']:.4f}")
+    print(f"{'':<20}{'original':>12}{'compact':>12}")
+    for key, label, fmt in (('trees', 'trees', '{:,}'), ('nodes', 'nodes', '{:,}'), ('megabytes', 'MB', '{:.2f}'),
+                            ('single_row_p50_ms', 'single row p50 ms', '{:.3f}'),
+                            ('single_row_p99_ms', 'single row p99 ms', '{:.3f}'),
+                            ('batch_ms', '256-row batch ms', '{:.2f}')):
+        original, compact = report[key]
+        print(f"{label:<20}{fmt.format(original):>12}{fmt.format(compact):>12}")
+
+
+if __name__ == '__main__':
+    import argparse
+    import pickle
+    import sys
+    import time
+
+    from forest_compiler import compile_pipeline
+
+    parser = argparse.ArgumentParser(description="Export a compact, optionally pruned career model bundle")
+    parser.add_argument('model_path', nargs='?', default='career_recommendation_model.pkl')
+    parser.add_argument('output_dir', nargs='?', default='career_model_compact')
+    parser.add_argument('--top-k', type=int, default=8, help='classes kept per leaf')
+    parser.add_argument('--dtype', choices=VALUE_DTYPES, default='float16', help='leaf probability dtype')
+    parser.add_argument('--keep-trees', type=float,
+                        help='trees to keep after pruning: a count, or a fraction of the forest if below 1')
+    parser.add_argument('--validation', default='psychometric_dataset.csv',
+                        help='CSV whose answers rank trees and validate the result')
+    parser.add_argument('--random-rows', type=int, default=5000,
+                        help='uniformly random answer vectors added to the validation set')
+    parser.add_argument('--min-agreement', type=float, default=MIN_TOP5_AGREEMENT,
+                        help='lowest held-out top-5 set agreement with the exact forest that is exported')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with open(args.model_path, 'rb') as file:
+        compiled = compile_pipeline(pickle.load(file))
+
+    from training_data import load_dataset
+    validation = [np.asarray(load_dataset(args.validation, min_class_count=1, verbose=False).answers)]
+    validation.append(np.random.default_rng(0).integers(1, 6, size=(args.random_rows, compiled.n_features_in_)))
+    X_validation = np.concatenate(validation).astype(np.int64)
+
+    keep = None
+    X_ranking, X_held_out = None, X_validation
+    if args.keep_trees is not None:
+        keep = int(round(args.keep_trees * compiled.n_trees)) if args.keep_trees < 1 else int(args.keep_trees)
+        # Trees are ranked on one half and the result is judged on the other
+        X_ranking, X_held_out = split_validation(X_validation)
+    compact = compact_forest(compiled, args.top_k, args.dtype, keep, X_ranking)
+    report = build_report(compiled, compact, X_held_out)
+    report["min_top5_set_agreement"] = args.min_agreement
+    print_report(report)
+
+    try:
+        check_agreement(report, args.min_agreement)
+    except ValueError as e:
+        print(f"\nNot exported: {str(e)}")
+        sys.exit(1)
+    manifest = save_compact(compact, args.output_dir, source_path=args.model_path, report=report)
+    print(f"\nExported {manifest['n_trees']} trees / {manifest['node_count']} nodes "
+          f"({compact.nbytes / 1e6:.2f} MB) to {args.output_dir} in {time.perf_counter() - start:.1f}s "
+          f"(top-5 set agreement {report['top5_set_agreement']:.2%}, threshold {args.min_agreement:.2%})")
+    print(f"Version: {manifest['version']}")
@@ -0,0 +1,383 @@
+"""
+Forest Compiler - Array-Compiled Inference for the Career Model
+Flattens the trained scaler + RandomForest pipeline into plain NumPy node
+arrays so predictions can be made without pandas or sklearn's per-tree dispatch.
+
+Compiled forests can be exported as a directory of uncompressed .npy files
+plus a manifest. Loading it with mmap lets every gunicorn worker share one
+page-cache copy of the trees instead of each holding a private unpickled copy:
+
+    python forest_compiler.py career_recommendation_model.pkl career_model_compiled
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+BUNDLE_FORMAT = 1
+MANIFEST_NAME = 'manifest.json'
+# Node arrays written to the bundle, one .npy file each
+BUNDLE_ARRAYS = ('feature', 'threshold', 'left', 'right', 'value', 'roots')
+
+
+def _to_ordered(values: np.ndarray) -> np.ndarray:
+    """Map float64 values to int64 keys with the same total ordering"""
+    bits = values.view(np.int64)
+    return np.where(bits < 0, np.int64(-2**63) - bits - 1, bits)
+
+
+def _from_ordered(keys: np.ndarray) -> np.ndarray:
+    """Inverse of _to_ordered"""
+    bits = np.where(keys < 0, np.int64(-2**63) - keys - 1, keys)
+    return bits.view(np.float64)
+
+
+def fold_thresholds(thresholds: np.ndarray, mean: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """
+    Fold a StandardScaler into split thresholds
+
+    sklearn evaluates ``float32((x - mean) / scale) <= threshold``. That test is
+    monotone in x, so for every node there is a largest float64 raw value that
+    still goes left. It is found by bisecting over the ordered float64 bit
+    patterns, which makes ``x <= folded`` agree with sklearn for every finite x.
+
+    Args:
+        thresholds: Split thresholds in scaled space (float64)
+        mean: Per-node mean of the split feature
+        scale: Per-node scale of the split feature
+
+    Returns:
+        Float64 thresholds in raw feature space
+    """
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    mean = np.asarray(mean, dtype=np.float64)
+    scale = np.asarray(scale, dtype=np.float64)
+
+    def goes_left(x):
+        with np.errstate(over='ignore', invalid='ignore'):
+            scaled = ((x - mean) / scale).astype(np.float32).astype(np.float64)
+        return scaled <= thresholds
+
+    lo = np.full(thresholds.shape, _to_ordered(np.array(-np.finfo(np.float64).max))[()])
+    hi = np.full(thresholds.shape, _to_ordered(np.array(np.finfo(np.float64).max))[()])
+
+    all_left = goes_left(_from_ordered(hi))
+    none_left = ~goes_left(_from_ordered(lo))
+
+    # Invariant: goes_left(lo) and not goes_left(hi)
+    for _ in range(64):
+        mid = (lo >> 1) + (hi >> 1) + (lo & hi & 1)  # overflow-free midpoint
+        left = goes_left(_from_ordered(mid))
+        lo = np.where(left, mid, lo)
+        hi = np.where(left, hi, mid)
+
+    folded = _from_ordered(lo)
+    folded[all_left] = np.inf
+    folded[none_left] = -np.inf
+    return folded
+
+
+def _leaf_distributions(tree, n_classes: int) -> np.ndarray:
+    """Per-node class distribution exactly as DecisionTreeClassifier.predict_proba returns it"""
+    value = tree.tree_.value[:, 0, :n_classes].astype(np.float64, copy=True)
+    normalizer = value.sum(axis=1)[:, np.newaxis]
+    normalizer[normalizer == 0.0] = 1.0
+    if not np.allclose(normalizer, 1.0):
+        # Older sklearn stores weighted counts and normalizes at predict time
+        value /= normalizer
+    return value
+
+
+class CompiledForest:
+    """RandomForest pipeline flattened into contiguous node arrays"""
+
+    # Upper bound on the (trees x rows x classes) buffer gathered per chunk
+    max_chunk_elements = 1 << 22
+    # Set for forests loaded from a bundle (see load_compiled)
+    version: Optional[str] = None
+    source_sha256: Optional[str] = None
+
+    def __init__(self, classes: np.ndarray, feature: np.ndarray, threshold: np.ndarray,
+                 left: np.ndarray, right: np.ndarray, value: np.ndarray,
+                 roots: np.ndarray, max_depth: int, n_features: int):
+        self.classes_ = classes
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.n_features_in_ = int(n_features)
+        # children[2 * node + went_left] is the next node, one gather per step
+        self.children = np.stack([right, left], axis=1).ravel()
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.feature)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """
+        Find the leaf reached in every tree
+
+        Args:
+            X: Raw (unscaled) responses of shape (n_rows, n_features)
+
+        Returns:
+            Global leaf indices of shape (n_trees, n_rows)
+        """
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        flat_x = X.ravel()
+        row_offset = (np.arange(X.shape[0]) * X.shape[1])[np.newaxis, :]
+        node = np.repeat(self.roots[:, np.newaxis], X.shape[0], axis=1)
+        # Leaves point at themselves, so a fixed number of steps is branch-free
+        for _ in range(self.max_depth):
+            go_left = flat_x.take(row_offset + self.feature.take(node)) <= self.threshold.take(node)
+            node = self.children.take(2 * node + go_left)
+        return node
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        Class probabilities identical to the source pipeline's predict_proba
+
+        Args:
+            X: Raw responses, shape (n_rows, n_features) or (n_features,)
+
+        Returns:
+            Array of shape (n_rows, n_classes)
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1 or X.shape[0] == 1:
+            return self.predict_proba_one(X.reshape(-1))[np.newaxis, :]
+
+        n_classes = self.value.shape[1]
+        chunk = max(1, self.max_chunk_elements // max(1, self.n_trees * n_classes))
+        proba = np.empty((X.shape[0], n_classes), dtype=np.float64)
+        for start in range(0, X.shape[0], chunk):
+            leaves = self.apply(X[start:start + chunk])
+            # Reducing over the leading tree axis adds trees one at a time in
+            # estimator order, matching sklearn's accumulation bit for bit
+            proba[start:start + chunk] = np.add.reduce(self.value[leaves], axis=0)
+        proba /= self.n_trees
+        return proba
+
+    def predict_proba_one(self, x: np.ndarray) -> np.ndarray:
+        """Class probabilities for a single response vector"""
+        x = np.asarray(x, dtype=np.float64)
+        node = self.roots
+        feature, threshold, children = self.feature, self.threshold, self.children
+        for _ in range(self.max_depth):
+            node = children[2 * node + (x[feature[node]] <= threshold[node])]
+        proba = np.add.reduce(self.value[node], axis=0)
+        proba /= self.n_trees
+        return proba
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Most probable class label for each row"""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the node arrays"""
+        return sum(getattr(self, name).nbytes for name in BUNDLE_ARRAYS) + self.children.nbytes
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """Streaming SHA-256 of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def save_compiled(forest: CompiledForest, directory: str, source_path: Optional[str] = None) -> Dict:
+    """
+    Export a compiled forest as an mmap-able bundle
+
+    Args:
+        forest: CompiledForest to export
+        directory: Output directory (created if needed)
+        source_path: Pickled model it was compiled from, recorded so stale bundles can be detected
+
+    Returns:
+        The manifest that was written
+    """
+    os.makedirs(directory, exist_ok=True)
+    files = {}
+    for name in BUNDLE_ARRAYS:
+        filename = f'{name}.npy'
+        path = os.path.join(directory, filename)
+        np.save(path, np.ascontiguousarray(getattr(forest, name)))
+        files[name] = {"file": filename, "sha256": file_sha256(path)}
+
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "classes": [str(c) for c in forest.classes_],
+        "max_depth": forest.max_depth,
+        "n_features": forest.n_features_in_,
+        "n_trees": forest.n_trees,
+        "node_count": forest.node_count,
+        "files": files,
+        "source_sha256": file_sha256(source_path) if source_path else None
+    }
+    # The bundle version is a hash over all array hashes and metadata
+    manifest["version"] = hashlib.sha256(json.dumps(manifest, sort_keys=True).encode('utf-8')).hexdigest()
+
+    # Manifest goes last and atomically, so a half-written bundle never verifies
+    tmp_path = os.path.join(directory, MANIFEST_NAME + '.tmp')
+    with open(tmp_path, 'w') as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(tmp_path, os.path.join(directory, MANIFEST_NAME))
+    return manifest
+
+
+def load_compiled(directory: str, mmap: bool = True, verify: bool = True) -> CompiledForest:
+    """
+    Load a bundle written by save_compiled
+
+    Args:
+        directory: Bundle directory
+        mmap: Map arrays read-only instead of reading them into private memory
+        verify: Check every array file against the manifest hash
+
+    Returns:
+        CompiledForest backed by the bundle files (or a forest_compactor.CompactForest
+        for bundles written by save_compact)
+
+    Raises:
+        ValueError: If the manifest is unsupported or a file does not match its hash
+    """
+    with open(os.path.join(directory, MANIFEST_NAME)) as file:
+        manifest = json.load(file)
+    if manifest.get("kind") == 'compact':
+        from forest_compactor import load_compact
+        return load_compact(directory, manifest, mmap, verify)
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"Unsupported compiled model format: {manifest.get('format')}")
+
+    arrays = {}
+    for name in BUNDLE_ARRAYS:
+        entry = manifest["files"][name]
+        path = os.path.join(directory, entry["file"])
+        if verify and file_sha256(path) != entry["sha256"]:
+            raise ValueError(f"Compiled model file {path} does not match its manifest hash")
+        arrays[name] = np.load(path, mmap_mode='r' if mmap else None, allow_pickle=False)
+
+    forest = CompiledForest(
+        classes=np.array(manifest["classes"], dtype=object),
+        feature=arrays["feature"],
+        threshold=arrays["threshold"],
+        left=arrays["left"],
+        right=arrays["right"],
+        value=arrays["value"],
+        roots=np.array(arrays["roots"]),
+        max_depth=manifest["max_depth"],
+        n_features=manifest["n_features"]
+    )
+    forest.version = manifest["version"]
+    forest.source_sha256 = manifest.get("source_sha256")
+    return forest
+
+
+def _split_pipeline(model) -> Tuple[object, object]:
+    """Return (scaler or None, forest) from a fitted Pipeline or bare forest"""
+    steps = [step for _, step in model.steps] if hasattr(model, 'steps') else [model]
+    *transformers, forest = steps
+    if len(transformers) > 1:
+        raise ValueError("Only a single StandardScaler step is supported before the forest")
+    scaler = transformers[0] if transformers else None
+    if scaler is not None and type(scaler).__name__ != 'StandardScaler':
+        raise ValueError(f"Cannot fold {type(scaler).__name__} into tree thresholds")
+    if not hasattr(forest, 'estimators_') or getattr(forest, 'n_outputs_', 1) != 1:
+        raise ValueError("Expected a fitted single-output forest classifier")
+    return scaler, forest
+
+
+def compile_pipeline(model) -> CompiledForest:
+    """
+    Compile a fitted (StandardScaler +) RandomForestClassifier into node arrays
+
+    Args:
+        model: Pipeline from career_model_trainer.py or a bare forest
+
+    Returns:
+        CompiledForest whose predict_proba matches model.predict_proba exactly
+    """
+    scaler, forest = _split_pipeline(model)
+    n_features = forest.n_features_in_
+    n_classes = len(forest.classes_)
+
+    mean = np.zeros(n_features)
+    scale = np.ones(n_features)
+    if scaler is not None:
+        if scaler.mean_ is not None:
+            mean = scaler.mean_.astype(np.float64)
+        if scaler.scale_ is not None:
+            scale = scaler.scale_.astype(np.float64)
+
+    features: List[np.ndarray] = []
+    thresholds: List[np.ndarray] = []
+    lefts: List[np.ndarray] = []
+    rights: List[np.ndarray] = []
+    values: List[np.ndarray] = []
+    roots = np.empty(len(forest.estimators_), dtype=np.int64)
+    max_depth = 0
+    offset = 0
+
+    for i, estimator in enumerate(forest.estimators_):
+        tree = estimator.tree_
+        node_ids = np.arange(tree.node_count)
+        is_leaf = tree.children_left == -1
+
+        feature = np.where(is_leaf, 0, tree.feature).astype(np.int64)
+        threshold = fold_thresholds(tree.threshold, mean[feature], scale[feature])
+        threshold[is_leaf] = np.inf
+
+        features.append(feature)
+        thresholds.append(threshold)
+        lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+        rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+        values.append(_leaf_distributions(estimator, n_classes))
+
+        roots[i] = offset
+        max_depth = max(max_depth, tree.max_depth)
+        offset += tree.node_count
+
+    return CompiledForest(
+        classes=np.asarray(forest.classes_),
+        feature=np.concatenate(features),
+        threshold=np.concatenate(thresholds),
+        left=np.concatenate(lefts),
+        right=np.concatenate(rights),
+        value=np.concatenate(values),
+        roots=roots,
+        max_depth=max_depth,
+        n_features=n_features
+    )
+
+
+if __name__ == '__main__':
+    import argparse
+    import pickle
+    import time
+
+    parser = argparse.ArgumentParser(description="Export a pickled career model as an mmap-able bundle")
+    parser.add_argument('model_path', nargs='?', default='career_recommendation_model.pkl')
+    parser.add_argument('output_dir', nargs='?', default='career_model_compiled')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with open(args.model_path, 'rb') as file:
+        compiled = compile_pipeline(pickle.load(file))
+    manifest = save_compiled(compiled, args.output_dir, source_path=args.model_path)
+    print(f"Exported {manifest['n_trees']} trees / {manifest['node_count']} nodes "
+          f"({compiled.nbytes / 1e6:.1f} MB) to {args.output_dir} in {time.perf_counter() - start:.1f}s")
+    print(f"Version: {manifest['version']}")
@@ -0,0 +1,131 @@
+"""
+Forest Explainer - Per-Feature Contributions for Career Predictions
+Decomposes the compiled forest's probability for a class into a bias plus one
+contribution per answer, in the style of treeinterpreter:
+
+    proba[c] = bias[c] + sum(contributions[c, q] for q in questions)
+
+Walking a tree from root to leaf, every split on question q moves the node's
+class distribution from value[parent] to value[child]; that change is credited
+to q. The bias is the root distribution (the class balance of the bootstrap
+sample), and both are averaged over the trees.
+
+All paths are recorded in one vectorized walk over the CompiledForest arrays
+(see forest_compiler.py), and only the requested classes (e.g. the top 5)
+are gathered, so a single-row explanation costs about as much as a prediction.
+Compact bundles (forest_compactor.py) drop internal node distributions and
+cannot be explained.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+
+def supports_explanations(forest) -> bool:
+    """Whether forest keeps the per-node class distributions an explanation needs"""
+    return forest is not None and hasattr(forest, 'value') and hasattr(forest, 'left')
+
+
+def _gather_values(forest, flat_index: np.ndarray) -> np.ndarray:
+    """value[node, class] for flattened node * n_classes + class indices (one take, no 2-D fancy indexing)"""
+    return forest.value.reshape(-1).take(flat_index)
+
+
+def decision_paths(forest, X: np.ndarray) -> np.ndarray:
+    """
+    Nodes visited by every row in every tree
+
+    Args:
+        forest: CompiledForest
+        X: Raw responses of shape (n_rows, n_features)
+
+    Returns:
+        Global node indices of shape (max_depth + 1, n_trees, n_rows); rows
+        that reach a leaf early repeat it for the remaining steps
+    """
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    flat_x = X.ravel()
+    row_offset = (np.arange(X.shape[0]) * X.shape[1])[np.newaxis, :]
+    path = np.empty((forest.max_depth + 1, forest.n_trees, X.shape[0]), dtype=np.intp)
+    path[0] = forest.roots[:, np.newaxis]
+    for step in range(forest.max_depth):
+        node = path[step]
+        go_left = flat_x.take(row_offset + forest.feature.take(node)) <= forest.threshold.take(node)
+        path[step + 1] = forest.children.take(2 * node + go_left)
+    return path
+
+
+def explain_batch(forest, X: np.ndarray, class_indices: np.ndarray,
+                  max_chunk_elements: int = 1 << 22) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-feature contributions to selected classes for many rows
+
+    Args:
+        forest: CompiledForest
+        X: Raw responses of shape (n_rows, n_features)
+        class_indices: Class columns to explain per row, shape (n_rows, k)
+        max_chunk_elements: Upper bound on the (steps x trees x rows x k) buffer per chunk
+
+    Returns:
+        (bias of shape (n_rows, k), contributions of shape (n_rows, k, n_features))
+    """
+    X = np.asarray(X)
+    class_indices = np.asarray(class_indices, dtype=np.intp)
+    n_rows, k = class_indices.shape
+    n_features = forest.n_features_in_
+    bias = np.empty((n_rows, k))
+    contributions = np.empty((n_rows, k, n_features))
+
+    chunk = max(1, max_chunk_elements // ((forest.max_depth + 1) * forest.n_trees * k))
+    for start in range(0, n_rows, chunk):
+        path = decision_paths(forest, X[start:start + chunk])
+        classes = class_indices[start:start + chunk]
+        rows = path.shape[2]
+        # Distribution of every visited node over just the requested classes
+        visited = _gather_values(forest, path[..., np.newaxis] * forest.value.shape[1]
+                                 + classes[np.newaxis, np.newaxis])
+        delta = visited[1:] - visited[:-1]
+        # Leaf self-loops add zero, so the split feature of leaves does not matter
+        split_feature = forest.feature.take(path[:-1])
+        slots = (np.arange(rows)[:, np.newaxis] * k + np.arange(k))[np.newaxis, np.newaxis] * n_features \
+            + split_feature[..., np.newaxis]
+        totals = np.bincount(slots.ravel(), weights=delta.ravel(), minlength=rows * k * n_features)
+        contributions[start:start + rows] = totals.reshape(rows, k, n_features) / forest.n_trees
+        bias[start:start + rows] = visited[0].sum(axis=0) / forest.n_trees
+    return bias, contributions
+
+
+def explain_one(forest, x: np.ndarray, class_indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-feature contributions to selected classes for a single response vector
+
+    Args:
+        forest: CompiledForest
+        x: Raw responses of shape (n_features,)
+        class_indices: Class columns to explain, shape (k,)
+
+    Returns:
+        (bias of shape (k,), contributions of shape (k, n_features))
+    """
+    x = np.asarray(x, dtype=np.float64).reshape(-1)
+    classes = np.asarray(class_indices, dtype=np.intp).reshape(-1)
+    n_features = forest.n_features_in_
+    feature, threshold, children = forest.feature, forest.threshold, forest.children
+
+    path = np.empty((forest.max_depth + 1, forest.n_trees), dtype=np.intp)
+    path[0] = node = forest.roots
+    for step in range(forest.max_depth):
+        node = children[2 * node + (x[feature[node]] <= threshold[node])]
+        path[step + 1] = node
+
+    visited = _gather_values(forest, path[..., np.newaxis] * forest.value.shape[1] + classes)
+    delta = visited[1:] - visited[:-1]
+    slots = np.arange(len(classes)) * n_features + feature[path[:-1]][..., np.newaxis]
+    totals = np.bincount(slots.ravel(), weights=delta.ravel(), minlength=len(classes) * n_features)
+    return visited[0].sum(axis=0) / forest.n_trees, totals.reshape(len(classes), n_features) / forest.n_trees
+
+
+def top_drivers(contributions: np.ndarray, n: int = 3) -> np.ndarray:
+    """Indices of the n largest contributions along the last axis, descending, ties in feature order"""
+    return np.argsort(-contributions, axis=-1, kind='stable')[..., :n]
@@ -0,0 +1,376 @@
+"""
+Incremental Forest Training
+Grows the served RandomForest with trees fitted only on rows appended to the
+dataset since the last version, instead of retraining from scratch.
+
+A training state file next to the model (<model>.training.json) records how
+many CSV rows the current version has seen, a hash of that prefix of the
+file (so an edited rather than appended dataset is detected), and the tree
+batches the forest is made of. New trees are added with warm_start; the
+fitted StandardScaler is kept as is, and an optional rolling window retires
+the oldest trees once the forest exceeds a tree budget.
+
+Every version is written to the versions directory as <model>-vNNNN.pkl and
+then atomically replaces the served pickle, which the app's model watcher
+(JOBSENSEI_MODEL_WATCH_SECONDS) or /api/admin/reload-model picks up. Only the
+newest keep_versions artifacts are kept. The compiled bundle is re-exported
+from the same pickle before the swap (or removed if the model does not
+compile), so the registry never maps an old forest next to a new pickle.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import re
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+STATE_SUFFIX = '.training.json'
+STATE_FORMAT = 1
+VERSIONS_DIR = 'model_versions'
+KEEP_VERSIONS = 5
+COMPILED_DIR = 'career_model_compiled'
+
+
+def state_path(model_path: str) -> str:
+    return model_path + STATE_SUFFIX
+
+
+def prefix_sha256(path: str, n_bytes: int, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of the first n_bytes of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        remaining = n_bytes
+        while remaining > 0:
+            chunk = file.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+def load_training_state(model_path: str) -> Optional[Dict]:
+    path = state_path(model_path)
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        state = json.load(file)
+    if state.get("format") != STATE_FORMAT:
+        raise ValueError(f"Unsupported training state format in {path}: {state.get('format')}")
+    return state
+
+
+def source_snapshot(dataset_path: str, rows_seen: int) -> Dict:
+    """Row count, byte size and content hash of the dataset as trained on"""
+    size = os.path.getsize(dataset_path)
+    return {
+        "dataset": os.path.abspath(dataset_path),
+        "rows_seen": rows_seen,
+        "source_bytes": size,
+        "source_prefix_sha256": prefix_sha256(dataset_path, size)
+    }
+
+
+def check_appended(dataset_path: str, state: Dict):
+    """
+    Make sure the dataset only grew since the state was written
+
+    Raises:
+        ValueError: If the trained-on prefix of the file changed
+    """
+    size = os.path.getsize(dataset_path)
+    if size < state["source_bytes"] or prefix_sha256(dataset_path, state["source_bytes"]) != state["source_prefix_sha256"]:
+        raise ValueError(f"{dataset_path} was modified, not appended to, since version {state['version']}; "
+                         f"run a full retrain")
+
+
+def _atomic_pickle(model, path: str):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    with os.fdopen(fd, 'wb') as file:
+        pickle.dump(model, file)
+    os.replace(tmp_path, path)
+
+
+def prune_versions(versions_dir: str, stem: str, keep: int) -> List[str]:
+    """Delete all but the newest keep <stem>-vNNNN.pkl artifacts; returns the deleted paths"""
+    pattern = re.compile(re.escape(stem) + r'-v(\d+)\.pkl$')
+    versions = sorted((int(match.group(1)), name) for name in os.listdir(versions_dir)
+                      for match in [pattern.match(name)] if match)
+    deleted = []
+    for _, name in versions[:max(0, len(versions) - keep)]:
+        path = os.path.join(versions_dir, name)
+        os.remove(path)
+        deleted.append(path)
+    return deleted
+
+
+def _replace_compiled(model, compiled_dir: str, source_path: str) -> bool:
+    """
+    Re-export the compiled bundle for source_path, or remove it if the model does not compile
+
+    The new bundle is written to a sibling directory and renamed into place,
+    so files that running workers have memory-mapped are never rewritten.
+
+    Returns:
+        True if a fresh bundle was exported
+    """
+    from forest_compiler import compile_pipeline, save_compiled
+
+    parent = os.path.dirname(os.path.abspath(compiled_dir))
+    name = os.path.basename(os.path.abspath(compiled_dir))
+    try:
+        compiled = compile_pipeline(model)
+    except ValueError as e:
+        print(f"Model does not compile ({str(e)}); removing {compiled_dir} so the pickle is served")
+        compiled = None
+
+    fresh = None
+    if compiled is not None:
+        fresh = tempfile.mkdtemp(dir=parent, prefix=f'.{name}-')
+        save_compiled(compiled, fresh, source_path=source_path)
+    if os.path.exists(compiled_dir):
+        retired = tempfile.mkdtemp(dir=parent, prefix=f'.{name}-old-')
+        os.replace(compiled_dir, os.path.join(retired, name))
+        shutil.rmtree(retired)
+    if fresh is not None:
+        os.replace(fresh, compiled_dir)
+    return fresh is not None
+
+
+def publish_model(model, model_path: str, state: Dict, versions_dir: str = VERSIONS_DIR,
+                  keep_versions: int = KEEP_VERSIONS, compiled_dir: Optional[str] = COMPILED_DIR) -> str:
+    """
+    Write <versions_dir>/<model>-vNNNN.pkl, refresh the compiled bundle, then swap the
+    artifact in as model_path, save the state and prune old versions
+
+    Args:
+        keep_versions: Versioned artifacts to keep (0 keeps every version)
+        compiled_dir: Bundle to re-export (None leaves bundles alone)
+
+    Returns:
+        Path of the versioned artifact
+    """
+    os.makedirs(versions_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    versioned = os.path.join(versions_dir, f"{stem}-v{state['version']:04d}.pkl")
+    _atomic_pickle(model, versioned)
+
+    # The bundle records the hash of the artifact, which the served copy will
+    # match byte for byte; until the swap the registry sees it as stale and
+    # keeps using the old pickle
+    if compiled_dir:
+        if _replace_compiled(model, compiled_dir, versioned):
+            print(f"Compiled bundle re-exported to {compiled_dir}")
+
+    # Copy, then rename over the served file so readers never see a partial pickle
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(model_path) or '.', suffix='.tmp')
+    os.close(fd)
+    shutil.copyfile(versioned, tmp_path)
+    os.replace(tmp_path, model_path)
+
+    state = dict(state, artifact=versioned)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(model_path) or '.', suffix='.tmp')
+    with os.fdopen(fd, 'w') as file:
+        json.dump(state, file, indent=2)
+    os.replace(tmp_path, state_path(model_path))
+
+    if keep_versions > 0:
+        for path in prune_versions(versions_dir, stem, keep_versions):
+            print(f"Removed old version {path}")
+    return versioned
+
+
+def full_training_state(previous: Optional[Dict], dataset_path: str, rows_seen: int, n_trees: int) -> Dict:
+    """State for a model trained from scratch on the first rows_seen rows"""
+    return dict(source_snapshot(dataset_path, rows_seen),
+                format=STATE_FORMAT,
+                version=(previous["version"] + 1) if previous else 1,
+                created=datetime.now().isoformat(),
+                batches=[{"version": (previous["version"] + 1) if previous else 1, "kind": 'full',
+                          "rows": [0, rows_seen], "trees": n_trees}])
+
+
+def _forest_steps(model) -> Tuple[object, object]:
+    steps = dict(model.steps) if hasattr(model, 'steps') else {}
+    if 'rf' not in steps or not hasattr(steps['rf'], 'estimators_'):
+        raise ValueError("Incremental training needs the fitted scaler + RandomForest pipeline from the trainer")
+    return steps.get('scaler'), steps['rf']
+
+
+def grow_forest(model, X_new, y_new, n_trees: int, window_trees: Optional[int] = None) -> int:
+    """
+    Add n_trees trees fitted on the new rows (in place), then apply the rolling window
+
+    Args:
+        model: Fitted scaler + RandomForest pipeline
+        X_new: New rows (raw answers)
+        y_new: Their labels; every label must already be one of the model's classes
+        n_trees: Trees to add
+        window_trees: Keep only the newest window_trees trees (None keeps all)
+
+    Returns:
+        Number of trees retired by the window
+    """
+    scaler, forest = _forest_steps(model)
+    X = scaler.transform(X_new) if scaler is not None else np.asarray(X_new, dtype=np.float64)
+    y = np.asarray(y_new, dtype=object)
+
+    # warm_start re-derives classes_ from y, so every known class gets one
+    # zero-weight row; the new trees then share the forest's class layout
+    classes = forest.classes_
+    X_fit = np.vstack([X, np.zeros((len(classes), X.shape[1]))])
+    y_fit = np.concatenate([y, classes.astype(object)])
+    weights = np.concatenate([np.ones(len(y)), np.zeros(len(classes))])
+
+    forest.set_params(warm_start=True, n_estimators=len(forest.estimators_) + n_trees)
+    forest.fit(X_fit, y_fit, sample_weight=weights)
+    forest.set_params(warm_start=False)
+
+    retired = 0
+    if window_trees is not None and len(forest.estimators_) > window_trees:
+        retired = len(forest.estimators_) - window_trees
+        forest.estimators_ = forest.estimators_[retired:]
+        forest.n_estimators = window_trees
+    return retired
+
+
+def retire_batches(batches: List[Dict], retired: int) -> List[Dict]:
+    """Drop retired trees from the oldest batches first"""
+    kept = []
+    for batch in batches:
+        take = min(retired, batch["trees"])
+        retired -= take
+        if batch["trees"] > take:
+            kept.append(dict(batch, trees=batch["trees"] - take))
+    return kept
+
+
+def _scores(model, X, y) -> Dict[str, float]:
+    proba = model.predict_proba(X)
+    classes = np.asarray(model.classes_)
+    ranked = np.argsort(-proba, axis=1, kind='stable')
+    truth = np.asarray(y, dtype=object)[:, np.newaxis]
+    return {
+        "accuracy": float(np.mean(classes[ranked[:, 0]] == truth[:, 0])),
+        "top5_accuracy": float(np.mean((classes[ranked[:, :5]] == truth).any(axis=1)))
+    }
+
+
+def drift_report(models: Dict[str, object], X_holdout, y_holdout, X_old, y_old) -> Dict[str, Dict]:
+    """Accuracy of each model on held-out new rows and on a sample of old rows"""
+    report = {}
+    for name, model in models.items():
+        report[name] = {
+            "new_rows": _scores(model, X_holdout, y_holdout) if len(y_holdout) else None,
+            "old_rows": _scores(model, X_old, y_old) if len(y_old) else None
+        }
+    return report
+
+
+def print_drift_report(report: Dict[str, Dict], timings: Dict[str, float]):
+    print(f"\n{'model':<14}{'new acc':>9}{'new top5':>10}{'old acc':>9}{'old top5':>10}{'fit s':>8}")
+    for name, scores in report.items():
+        new, old = scores["new_rows"] or {}, scores["old_rows"] or {}
+        fit = timings.get(name)
+        print(f"{name:<14}{new.get('accuracy', float('nan')):>9.3f}{new.get('top5_accuracy', float('nan')):>10.3f}"
+              f"{old.get('accuracy', float('nan')):>9.3f}{old.get('top5_accuracy', float('nan')):>10.3f}"
+              f"{fit if fit is not None else float('nan'):>8.1f}")
+
+
+def train_incremental(model_path: str, dataset, dataset_path: str, n_trees: int,
+                      window_trees: Optional[int] = None, holdout: float = 0.2, compare_full: bool = False,
+                      versions_dir: str = VERSIONS_DIR, seed: int = 42, keep_versions: int = KEEP_VERSIONS,
+                      compiled_dir: Optional[str] = COMPILED_DIR) -> Optional[Dict]:
+    """
+    Grow the model at model_path with the rows appended to dataset_path since its last version
+
+    Args:
+        model_path: Served pickle with a training state file next to it
+        dataset: CompactDataset of the whole CSV, unfiltered and in file order
+        dataset_path: The CSV it was loaded from
+        n_trees: Trees to fit on the new rows
+        window_trees: Rolling window size in trees (None keeps every tree)
+        holdout: Fraction of the new rows kept out of training for the drift report
+        compare_full: Also retrain from scratch on all rows and report the accuracy difference
+        versions_dir: Where versioned artifacts go
+        seed: Holdout sampling seed
+        keep_versions, compiled_dir: See publish_model
+
+    Returns:
+        The new training state, or None if there were no new rows
+    """
+    state = load_training_state(model_path)
+    if state is None:
+        raise ValueError(f"No training state for {model_path}; run a full training first")
+    check_appended(dataset_path, state)
+    with open(model_path, 'rb') as file:
+        model = pickle.load(file)
+    previous = pickle.loads(pickle.dumps(model)) if compare_full else None
+
+    start = state["rows_seen"]
+    if len(dataset) <= start:
+        print(f"No new rows since version {state['version']} ({start:,} rows)")
+        return None
+
+    # Rows of job roles the forest has never seen cannot be added to its trees
+    _, forest = _forest_steps(model)
+    labels = np.asarray(dataset.categories, dtype=object)[np.asarray(dataset.codes[start:])]
+    known = np.isin(labels, forest.classes_)
+    if not known.all():
+        unknown = sorted(set(labels[~known]))
+        print(f"Skipping {int((~known).sum())} rows of {len(unknown)} new job roles "
+              f"({', '.join(unknown[:5])}{'...' if len(unknown) > 5 else ''}); run a full retrain to add them")
+    new_index = start + np.flatnonzero(known)
+
+    rng = np.random.default_rng(seed)
+    is_holdout = rng.random(len(new_index)) < holdout
+    train_index, holdout_index = new_index[~is_holdout], new_index[is_holdout]
+    if not len(train_index):
+        print("No trainable new rows")
+        return None
+
+    answers = dataset.features()
+    X_train, y_train = answers.iloc[train_index], labels[train_index - start]
+    print(f"Growing version {state['version']} with {n_trees} trees on {len(train_index):,} new rows "
+          f"({len(holdout_index):,} held out)")
+    started = time.perf_counter()
+    retired = grow_forest(model, X_train, y_train, n_trees, window_trees)
+    timings = {"incremental": time.perf_counter() - started}
+
+    version = state["version"] + 1
+    batches = retire_batches(state["batches"], retired) + [
+        {"version": version, "kind": 'incremental', "rows": [start, len(dataset)], "trees": n_trees}
+    ]
+    new_state = dict(source_snapshot(dataset_path, len(dataset)), format=STATE_FORMAT, version=version,
+                     created=datetime.now().isoformat(), batches=batches, parent=state["version"])
+    print(f"Forest now has {len(forest.estimators_)} trees ({retired} retired) after "
+          f"{timings['incremental']:.1f}s")
+
+    if compare_full:
+        from sklearn.base import clone
+
+        all_labels = np.asarray(dataset.categories, dtype=object)[np.asarray(dataset.codes)]
+        full_index = np.setdiff1d(np.flatnonzero(np.isin(all_labels, forest.classes_)), holdout_index)
+        full = clone(model)
+        full.set_params(rf__n_estimators=len(forest.estimators_))
+        started = time.perf_counter()
+        full.fit(answers.iloc[full_index], all_labels[full_index])
+        timings["full_retrain"] = time.perf_counter() - started
+
+        old_sample = rng.choice(start, size=min(start, 2000), replace=False)
+        report = drift_report({"previous": previous, "incremental": model, "full_retrain": full},
+                              answers.iloc[holdout_index], labels[holdout_index - start],
+                              answers.iloc[old_sample], all_labels[old_sample])
+        print_drift_report(report, timings)
+        new_state["drift"] = {"report": report, "fit_seconds": timings}
+
+    path = publish_model(model, model_path, new_state, versions_dir, keep_versions, compiled_dir)
+    print(f"Version {version} written to {path} and published as {model_path}")
+    return new_state
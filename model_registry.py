@@ -0,0 +1,290 @@
+"""
+Model Registry
+Owns the model that /predict scores with and replaces it without a restart.
+
+A new version is loaded and warmed up in the background, then published by
+rebinding a single reference. Requests take that reference once and finish
+on whichever version they started with, so a swap never mixes the
+probabilities of one model with the class labels of another.
+
+numpy and the model files are only touched when a version is loaded, keeping
+`import app` free of the scientific stack.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Rows scored against a freshly loaded version before it is published
+WARMUP_ROWS = 64
+
+
+class LoadedModel:
+    """One immutable model version plus its scoring helpers"""
+
+    def __init__(self, model, compiled_model, version: str, source: str, load_seconds: float):
+        self.model = model
+        self.compiled_model = compiled_model
+        self.version = version
+        self.source = source
+        self.load_seconds = load_seconds
+        self.warmup_seconds: Optional[float] = None
+        self.loaded_at = datetime.now().isoformat()
+        self.classes_ = compiled_model.classes_ if compiled_model is not None else model.classes_
+
+        self._batcher = None
+        self._batcher_pid = None
+        self._batcher_lock = threading.Lock()
+
+    def predict_proba(self, responses):
+        """Score an (N, 20) array of responses, preferring the compiled forest"""
+        if self.compiled_model is not None:
+            return self.compiled_model.predict_proba(responses)
+        import pandas as pd
+        columns = [f'Q{i}' for i in range(1, 21)]
+        return self.model.predict_proba(pd.DataFrame(responses, columns=columns))
+
+    def get_batcher(self, max_batch_size: int, max_wait: float):
+        """Per-process micro-batcher for this version, created lazily so it survives gunicorn's fork"""
+        if self._batcher is None or self._batcher_pid != os.getpid():
+            with self._batcher_lock:
+                if self._batcher is None or self._batcher_pid != os.getpid():
+                    from predict_batcher import MicroBatcher
+                    self._batcher = MicroBatcher(self.predict_proba, max_batch_size, max_wait)
+                    self._batcher_pid = os.getpid()
+        return self._batcher
+
+    def close(self):
+        """Drain and stop this version's micro-batcher once it has been replaced"""
+        if self._batcher is not None and self._batcher_pid == os.getpid():
+            self._batcher.close()
+
+    def warm_up(self):
+        """Score a fixed sample batch and a single row, checking the output shape"""
+        import numpy as np
+
+        started = time.perf_counter()
+        sample = np.random.default_rng(0).integers(1, 6, size=(WARMUP_ROWS, 20))
+        proba = np.asarray(self.predict_proba(sample))
+        if proba.shape != (WARMUP_ROWS, len(self.classes_)):
+            raise ValueError(f"Warm-up produced shape {proba.shape}, expected {(WARMUP_ROWS, len(self.classes_))}")
+        if not np.allclose(proba.sum(axis=1), 1.0):
+            raise ValueError("Warm-up probabilities do not sum to 1")
+        self.predict_proba(sample[:1])
+        self.warmup_seconds = round(time.perf_counter() - started, 3)
+
+    def describe(self) -> Dict:
+        compiled = self.compiled_model
+        return {
+            "version": self.version,
+            "source": self.source,
+            "loaded_at": self.loaded_at,
+            "load_seconds": self.load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "n_classes": len(self.classes_),
+            "n_trees": compiled.n_trees if compiled is not None else None
+        }
+
+
+def load_model_version(model_path: str, compiled_model_dir: str) -> Optional[LoadedModel]:
+    """
+    Map the compiled bundle, or unpickle and compile the model
+
+    Args:
+        model_path: Pickled sklearn pipeline
+        compiled_model_dir: Bundle exported by forest_compiler.py (preferred when fresh)
+
+    Returns:
+        LoadedModel, or None if neither file could be loaded
+    """
+    from forest_compiler import MANIFEST_NAME, compile_pipeline, file_sha256, load_compiled
+
+    started = time.perf_counter()
+    model = None
+    compiled = None
+    source = None
+
+    if os.path.exists(os.path.join(compiled_model_dir, MANIFEST_NAME)):
+        try:
+            compiled = load_compiled(compiled_model_dir)
+            if (compiled.source_sha256 and os.path.exists(model_path)
+                    and compiled.source_sha256 != file_sha256(model_path)):
+                print(f"Compiled model in {compiled_model_dir} is stale; re-export with python forest_compiler.py")
+                compiled = None
+            else:
+                print(f"Compiled model mapped from {compiled_model_dir} (version {compiled.version[:12]})")
+                source = compiled_model_dir
+        except Exception as e:
+            print(f"Error loading compiled model: {str(e)}")
+            compiled = None
+
+    # Load model with error handling
+    if compiled is None:
+        import pickle
+        try:
+            with open(model_path, 'rb') as file:
+                model = pickle.load(file)
+            print(f"Model loaded successfully from {model_path}")
+            source = model_path
+        except Exception as e:
+            print(f"Error loading model: {str(e)}")
+            return None
+
+        # Compile the forest into flat node arrays for pandas-free scoring
+        try:
+            compiled = compile_pipeline(model)
+            print(f"Model compiled: {compiled.n_trees} trees, {compiled.node_count} nodes")
+        except Exception as e:
+            print(f"Model compilation skipped, using predict_proba: {str(e)}")
+
+    version = compiled.version if compiled is not None and compiled.version else file_sha256(model_path)
+    return LoadedModel(model, compiled, version, source, round(time.perf_counter() - started, 3))
+
+
+class ModelRegistry:
+    """Holds the active LoadedModel and swaps in new versions atomically"""
+
+    # How many past loads/reloads the status endpoint reports
+    history_size = 10
+
+    def __init__(self, model_path: str, compiled_model_dir: str):
+        self.model_path = model_path
+        self.compiled_model_dir = compiled_model_dir
+        self.active: Optional[LoadedModel] = None
+        # 'pending' -> 'loading' -> 'ready' | 'failed'; 'reloading' while a new version warms up
+        self.status = 'pending'
+        self.last_error: Optional[str] = None
+        self.reloads = 0
+        self.history: List[Dict] = []
+        self.watch_interval: Optional[float] = None
+
+        self._lock = threading.Lock()
+        self._watch_pid = None
+        self._signature = None
+
+    def _watched_files(self) -> List[str]:
+        from forest_compiler import MANIFEST_NAME
+        return [self.model_path, os.path.join(self.compiled_model_dir, MANIFEST_NAME)]
+
+    def signature(self) -> Tuple:
+        """(mtime, size) of the pickle and the bundle manifest; changes when either is replaced"""
+        signature = []
+        for path in self._watched_files():
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _record(self, event: str, loaded: Optional[LoadedModel], error: Optional[str] = None):
+        entry = {"event": event, "at": datetime.now().isoformat(), "error": error}
+        if loaded is not None:
+            entry.update(version=loaded.version, load_seconds=loaded.load_seconds,
+                         warmup_seconds=loaded.warmup_seconds)
+        self.history = (self.history + [entry])[-self.history_size:]
+
+    def _load_and_warm(self) -> LoadedModel:
+        loaded = load_model_version(self.model_path, self.compiled_model_dir)
+        if loaded is None:
+            raise RuntimeError(f"No loadable model at {self.model_path} or {self.compiled_model_dir}")
+        loaded.warm_up()
+        return loaded
+
+    def ensure_loaded(self) -> Optional[LoadedModel]:
+        """Load the first version once (thread-safe); returns the active model or None"""
+        if self.status in ('ready', 'failed', 'reloading'):
+            return self.active
+        with self._lock:
+            if self.status in ('pending', 'loading'):
+                self.status = 'loading'
+                signature = self.signature()
+                try:
+                    self.active = self._load_and_warm()
+                    self._signature = signature
+                    self.status = 'ready'
+                    self._record('load', self.active)
+                except Exception as e:
+                    print(f"Error loading model: {str(e)}")
+                    self.last_error = str(e)
+                    self.status = 'failed'
+                    # The watcher reloads once the files change, so fixing them on disk recovers
+                    self._signature = signature
+                    self._record('load', None, str(e))
+        return self.active
+
+    def reload(self, reason: str = 'manual') -> bool:
+        """
+        Load, warm up and publish a new version; the old one keeps serving until the swap
+
+        Returns:
+            True if a new version was published, False if loading or warm-up failed
+        """
+        with self._lock:
+            previous_status = self.status
+            self.status = 'reloading' if self.active is not None else 'loading'
+            signature = self.signature()
+            try:
+                loaded = self._load_and_warm()
+            except Exception as e:
+                print(f"Model reload ({reason}) failed, keeping the current version: {str(e)}")
+                self.last_error = str(e)
+                self.status = previous_status if self.active is not None else 'failed'
+                self._record(f"reload:{reason}", None, str(e))
+                return False
+
+            previous, self.active = self.active, loaded
+            self._signature = signature
+            self.status = 'ready'
+            self.last_error = None
+            self.reloads += 1
+            self._record(f"reload:{reason}", loaded)
+            print(f"Model reloaded ({reason}): version {loaded.version[:12]}")
+
+        # Requests already holding the old version finish on it; its batcher
+        # scores whatever is queued before stopping
+        if previous is not None:
+            previous.close()
+        return True
+
+    def reload_async(self, reason: str = 'manual'):
+        """Run reload() in a daemon thread"""
+        threading.Thread(target=self.reload, args=(reason,), name='model-reload', daemon=True).start()
+
+    def start_watching(self, interval: float):
+        """Poll the model files every interval seconds and reload when they change (once per process)"""
+        if self._watch_pid == os.getpid():
+            return
+        self._watch_pid = os.getpid()
+        self.watch_interval = interval
+        threading.Thread(target=self._watch, args=(interval,), name='model-watch', daemon=True).start()
+
+    def _watch(self, interval: float):
+        pending = None
+        while True:
+            time.sleep(interval)
+            signature = self.signature()
+            if self._signature is None or signature == self._signature:
+                pending = None
+                continue
+            # Only reload once the files have stopped changing, so a pickle
+            # that is still being written is never read
+            if signature == pending:
+                self.reload('watch')
+                pending = None
+            else:
+                pending = signature
+
+    def describe(self) -> Dict:
+        """Active version, load timings and reload history for the status endpoint"""
+        return {
+            "status": self.status,
+            "active": self.active.describe() if self.active is not None else None,
+            "last_error": self.last_error,
+            "reloads": self.reloads,
+            "watch_interval_seconds": self.watch_interval if self._watch_pid == os.getpid() else None,
+            "history": list(self.history),
+            "pid": os.getpid()
+        }
@@ -0,0 +1,232 @@
+"""
+Model Search
+Hyperparameter search for the career model pipeline (StandardScaler +
+RandomForest, so the result still compiles with forest_compiler.py).
+
+    grid      the original exhaustive GridSearchCV: 16 configs x 5 folds,
+              every config trained to completion
+    grid-shared
+              the same grid on parallel_cv.SharedMemoryGridSearch: training
+              data memory-mapped by a process pool, one task per config/fold
+    halving   successive halving over a wider random sample of configs:
+              every candidate starts on a small budget (trees or training
+              rows), and only the best 1/factor of each round moves on to
+              a factor-times larger budget
+
+All modes score on the folds GridSearchCV(cv=5) used in the original
+trainer: an unshuffled StratifiedKFold. The fold of every training row is
+computed once and cached as a small int8 array keyed by the labels' hash, so
+repeated (nightly) runs and every search mode reuse identical splits.
+"""
+
+import hashlib
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_FOLDS = 5
+FOLDS_CACHE_DIR = 'dataset_cache'
+
+# The grid the trainer has always searched
+GRID_PARAMS = {
+    'rf__n_estimators': [100, 200],
+    'rf__max_depth': [None, 15],
+    'rf__min_samples_split': [2, 5],
+    'rf__max_features': ['sqrt', 'log2']
+}
+
+# Wider space sampled by the halving search (n_estimators is added when the
+# budget is the sample count rather than the tree count)
+HALVING_PARAMS = {
+    'rf__max_depth': [None, 10, 15, 20, 30],
+    'rf__min_samples_split': [2, 5, 10],
+    'rf__min_samples_leaf': [1, 2, 4],
+    'rf__max_features': ['sqrt', 'log2', 0.3, 0.5],
+    'rf__criterion': ['gini', 'entropy'],
+    'rf__class_weight': [None, 'balanced_subsample']
+}
+
+RESOURCES = ('n_estimators', 'n_samples')
+SEARCH_MODES = ('halving', 'grid', 'grid-shared')
+
+
+def make_pipeline(random_state: int = 42):
+    """The pipeline every search mode tunes"""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    return Pipeline([
+        ('scaler', StandardScaler()),
+        ('rf', RandomForestClassifier(random_state=random_state))
+    ])
+
+
+def fold_assignments(codes: np.ndarray, n_splits: int = DEFAULT_FOLDS,
+                     cache_dir: Optional[str] = FOLDS_CACHE_DIR) -> np.ndarray:
+    """
+    Stratified fold number of every row, cached per (labels, n_splits)
+
+    Args:
+        codes: Integer class code of every training row
+        n_splits: Number of folds
+        cache_dir: Where fold arrays are kept (None disables caching)
+
+    Returns:
+        int8 array with the test fold of every row
+    """
+    codes = np.ascontiguousarray(codes)
+    digest = hashlib.sha256(codes.tobytes() + str(codes.dtype).encode('ascii')).hexdigest()
+    path = None
+    if cache_dir:
+        path = os.path.join(cache_dir, f"folds-{digest[:16]}-k{n_splits}.npy")
+        if os.path.exists(path):
+            folds = np.load(path)
+            if folds.shape == codes.shape:
+                return folds
+
+    from sklearn.model_selection import StratifiedKFold
+    folds = np.empty(len(codes), dtype=np.int8)
+    # Unshuffled, exactly what cv=n_splits gives a classifier in GridSearchCV
+    splitter = StratifiedKFold(n_splits=n_splits)
+    for fold, (_, test_index) in enumerate(splitter.split(np.zeros((len(codes), 1)), codes)):
+        folds[test_index] = fold
+
+    if path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = path[:-len('.npy')] + '.tmp.npy'
+        np.save(tmp_path, folds)
+        os.replace(tmp_path, path)
+    return folds
+
+
+def fold_splits(folds: np.ndarray) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """(train, test) index pairs for the cv= argument of the searches"""
+    return [(np.flatnonzero(folds != fold), np.flatnonzero(folds == fold)) for fold in np.unique(folds)]
+
+
+def grid_search(X, y, splits: List[Tuple[np.ndarray, np.ndarray]], n_jobs: int = -1, verbose: int = 1):
+    """Exhaustive search over GRID_PARAMS (the original trainer behaviour)"""
+    from sklearn.model_selection import GridSearchCV
+
+    search = GridSearchCV(make_pipeline(), GRID_PARAMS, cv=splits, scoring='accuracy', n_jobs=n_jobs, verbose=verbose)
+    return search.fit(X, y)
+
+
+def halving_search(X, y, splits: List[Tuple[np.ndarray, np.ndarray]], resource: str = 'n_estimators',
+                   n_candidates: int = 27, factor: int = 3, max_trees: int = 200,
+                   seed: int = 42, n_jobs: int = -1, verbose: int = 1):
+    """
+    Successive-halving random search over HALVING_PARAMS
+
+    Args:
+        X, y: Training data
+        splits: Cross-validation folds (see fold_splits)
+        resource: 'n_estimators' grows the forest between rounds; 'n_samples'
+            grows the training subset of every fold instead
+        n_candidates: Configs sampled for the first round
+        factor: Budget multiplier / survivor divisor between rounds
+        max_trees: Tree budget of the final round (resource='n_estimators')
+        seed: Sampling seed
+        n_jobs: Parallel fits
+        verbose: Passed to sklearn
+
+    Returns:
+        Fitted HalvingRandomSearchCV
+    """
+    from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+    from sklearn.model_selection import HalvingRandomSearchCV
+
+    if resource not in RESOURCES:
+        raise ValueError(f"resource must be one of {', '.join(RESOURCES)}")
+
+    params = dict(HALVING_PARAMS)
+    if resource == 'n_estimators':
+        budget = {"resource": 'rf__n_estimators', "max_resources": max_trees, "min_resources": 'exhaust'}
+    else:
+        # sklearn starts a sample budget at 2 rows per class and fold
+        smallest = 2 * len(splits) * len(np.unique(y))
+        if smallest * factor > min(len(train) for train, _ in splits):
+            raise ValueError(f"Too few training rows for a sample budget (first round needs {smallest}); "
+                             f"use resource='n_estimators'")
+        params['rf__n_estimators'] = [50, 100, 200]
+        budget = {"resource": 'n_samples', "min_resources": 'exhaust'}
+
+    search = HalvingRandomSearchCV(
+        make_pipeline(), params, n_candidates=n_candidates, factor=factor, cv=splits,
+        scoring='accuracy', random_state=seed, n_jobs=n_jobs, verbose=verbose, **budget
+    )
+    return search.fit(X, y)
+
+
+def search_rounds(search) -> List[Dict]:
+    """Per-round candidates, budget, fit time and best score of a fitted search"""
+    results = search.cv_results_
+    n_fits = len(results['params'])
+    rounds = results['iter'] if 'iter' in results else np.zeros(n_fits, dtype=int)
+    n_splits = search.n_splits_
+    summary = []
+    for round_number in np.unique(rounds):
+        mask = rounds == round_number
+        row = {
+            "round": int(round_number),
+            "candidates": int(mask.sum()),
+            "fit_seconds": float((results['mean_fit_time'][mask] + results['mean_score_time'][mask]).sum() * n_splits),
+            "best_score": float(np.nanmax(results['mean_test_score'][mask]))
+        }
+        if 'n_resources' in results:
+            row["resources"] = int(results['n_resources'][mask][0])
+        summary.append(row)
+    return summary
+
+
+def print_search_report(search, wall_seconds: float, label: str):
+    """Timing table of a fitted search: rounds, summed fit time and wall clock"""
+    rounds = search_rounds(search)
+    print(f"\n{label}: {sum(r['candidates'] for r in rounds)} candidate fits x {search.n_splits_} folds "
+          f"in {wall_seconds:.1f}s wall clock")
+    print(f"{'round':>5}{'configs':>9}{'budget':>9}{'fit+score s':>13}{'best cv acc':>13}")
+    for r in rounds:
+        budget = r.get("resources", '-')
+        print(f"{r['round']:>5}{r['candidates']:>9}{budget:>9}{r['fit_seconds']:>13.1f}{r['best_score']:>13.4f}")
+    print(f"Best CV accuracy {search.best_score_:.4f} with {search.best_params_}")
+
+
+def worker_count(n_jobs: int) -> int:
+    """Process count for an n_jobs value with joblib semantics (-1 = all CPUs, -2 = all but one, ...)"""
+    if n_jobs == 0:
+        raise ValueError("n_jobs must not be 0")
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return n_jobs
+
+
+def run_search(mode: str, X, y, codes: np.ndarray, n_splits: int = DEFAULT_FOLDS, seed: int = 42,
+               cache_dir: Optional[str] = FOLDS_CACHE_DIR, n_jobs: int = -1, verbose: int = 1, **options):
+    """
+    Run one search mode on cached folds and print its timing report
+
+    Returns:
+        (fitted search, wall-clock seconds)
+    """
+    folds = fold_assignments(codes, n_splits, cache_dir)
+    splits = fold_splits(folds)
+    started = time.perf_counter()
+    if mode == 'grid':
+        search = grid_search(X, y, splits, n_jobs, verbose)
+    elif mode == 'grid-shared':
+        from parallel_cv import SharedMemoryGridSearch
+        search = SharedMemoryGridSearch(GRID_PARAMS, folds, worker_count(n_jobs), verbose=verbose).fit(X, y)
+    elif mode == 'halving':
+        search = halving_search(X, y, splits, seed=seed, n_jobs=n_jobs, verbose=verbose, **options)
+    else:
+        raise ValueError(f"Unknown search mode: {mode}")
+    wall_seconds = time.perf_counter() - started
+    print_search_report(search, wall_seconds, f"{mode} search")
+    if hasattr(search, 'task_report'):
+        report = search.task_report()
+        print(f"{report['tasks']} tasks, {report['task_seconds']:.1f}s of task time ({report['cpu_seconds']:.1f}s CPU) "
+              f"on {report['workers']} workers ({report['utilization']:.0%} pool utilization)")
+    return search, wall_seconds
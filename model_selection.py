@@ -0,0 +1,217 @@
+"""
+Latency-Aware Model Selection
+Scores candidate models on what serving them costs as well as on accuracy:
+held-out top-1/top-5 accuracy, single-row p50/p99 and batch latency through
+the same path /predict uses (the compiled forest for RandomForest pipelines,
+sklearn predict_proba otherwise), pickled size and node count.
+
+The trainer prints the candidates with the Pareto-optimal ones marked (no
+other candidate is at least as accurate, as fast at p99 and as small, and
+strictly better in one of them), then picks the final model by an objective:
+
+    accuracy   most accurate candidate within the latency/size budgets
+    latency    lowest single-row p99 within the budgets
+    size       smallest pickle within the budgets
+
+Only the scaler + RandomForest pipeline can be published: the compiled
+bundle, incremental training and /predict explanations all depend on it.
+HistGradientBoosting and kNN are report-only unless the selection is
+explicitly widened (publishable_only=False, --publish-any-model).
+"""
+
+import pickle
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+OBJECTIVES = ('accuracy', 'latency', 'size')
+
+# Rows timed one at a time, and the batch size used for batch latency
+SINGLE_ROW_SAMPLES = 500
+BATCH_ROWS = 256
+
+
+def candidate_models(random_state: int = 42) -> Dict[str, object]:
+    """Unfitted alternatives compared against the search winner"""
+    from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+    from sklearn.neighbors import KNeighborsClassifier
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    def forest(**params):
+        return Pipeline([('scaler', StandardScaler()), ('rf', RandomForestClassifier(random_state=random_state, **params))])
+
+    return {
+        'rf_50_depth12': forest(n_estimators=50, max_depth=12),
+        'rf_100_depth15': forest(n_estimators=100, max_depth=15),
+        'rf_200': forest(n_estimators=200),
+        'hist_gradient_boosting': HistGradientBoostingClassifier(max_iter=50, early_stopping=False,
+                                                                 random_state=random_state),
+        'knn_15': Pipeline([('scaler', StandardScaler()), ('knn', KNeighborsClassifier(n_neighbors=15, weights='distance'))])
+    }
+
+
+def node_count(model) -> Optional[int]:
+    """Total tree nodes of a forest or boosted model; None for models without trees"""
+    estimator = model.steps[-1][1] if hasattr(model, 'steps') else model
+    if hasattr(estimator, 'estimators_'):
+        return int(sum(tree.tree_.node_count for tree in estimator.estimators_))
+    if hasattr(estimator, '_predictors'):
+        return int(sum(len(predictor.nodes) for iteration in estimator._predictors for predictor in iteration))
+    return None
+
+
+def publishable(model) -> bool:
+    """Whether model is the scaler + RandomForest pipeline the serving and retraining tools expect"""
+    from sklearn.ensemble import RandomForestClassifier
+
+    steps = dict(model.steps) if hasattr(model, 'steps') else {}
+    return isinstance(steps.get('rf'), RandomForestClassifier)
+
+
+def serving_model(model):
+    """Wrap a fitted model the way the model registry serves it"""
+    from forest_compiler import compile_pipeline
+    from model_registry import LoadedModel
+
+    try:
+        compiled = compile_pipeline(model)
+    except ValueError:
+        compiled = None
+    return LoadedModel(model, compiled, 'candidate', 'trainer', 0.0)
+
+
+def measure_latency(loaded, X: np.ndarray, samples: int = SINGLE_ROW_SAMPLES,
+                    batch_rows: int = BATCH_ROWS) -> Dict[str, float]:
+    """Single-row p50/p99 and per-batch latency in milliseconds"""
+    rows = X[np.arange(samples) % len(X)]
+    for row in rows[:20]:
+        loaded.predict_proba(row[np.newaxis, :])
+
+    timings = np.empty(samples)
+    for i, row in enumerate(rows):
+        started = time.perf_counter()
+        loaded.predict_proba(row[np.newaxis, :])
+        timings[i] = time.perf_counter() - started
+
+    batch = X[np.arange(batch_rows) % len(X)]
+    batch_timings = []
+    for _ in range(5):
+        started = time.perf_counter()
+        loaded.predict_proba(batch)
+        batch_timings.append(time.perf_counter() - started)
+
+    return {
+        "p50_ms": float(np.percentile(timings, 50) * 1000),
+        "p99_ms": float(np.percentile(timings, 99) * 1000),
+        "batch_ms": float(np.median(batch_timings) * 1000)
+    }
+
+
+def evaluate(name: str, model, X_test: np.ndarray, y_test: np.ndarray, fit_seconds: float) -> Dict:
+    """Accuracy, latency, size and complexity of one fitted candidate"""
+    loaded = serving_model(model)
+    proba = np.asarray(loaded.predict_proba(X_test))
+    classes = np.asarray(loaded.classes_)
+    ranked = np.argsort(-proba, axis=1, kind='stable')
+    truth = np.asarray(y_test)
+    top5 = (classes[ranked[:, :5]] == truth[:, np.newaxis]).any(axis=1)
+
+    result = {
+        "name": name,
+        "accuracy": float(np.mean(classes[ranked[:, 0]] == truth)),
+        "top5_accuracy": float(np.mean(top5)),
+        "size_mb": len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)) / 1e6,
+        "nodes": node_count(model),
+        "compiled": loaded.compiled_model is not None,
+        "publishable": publishable(model),
+        "fit_seconds": fit_seconds
+    }
+    result.update(measure_latency(loaded, X_test))
+    return result
+
+
+def pareto_front(results: List[Dict]) -> List[str]:
+    """Names of candidates not dominated on (accuracy up, p99 down, size down)"""
+    def dominates(a, b):
+        at_least = a["accuracy"] >= b["accuracy"] and a["p99_ms"] <= b["p99_ms"] and a["size_mb"] <= b["size_mb"]
+        better = a["accuracy"] > b["accuracy"] or a["p99_ms"] < b["p99_ms"] or a["size_mb"] < b["size_mb"]
+        return at_least and better
+
+    return [r["name"] for r in results if not any(dominates(other, r) for other in results if other is not r)]
+
+
+def select_model(results: List[Dict], objective: str = 'accuracy', max_p99_ms: Optional[float] = None,
+                 max_size_mb: Optional[float] = None, publishable_only: bool = True) -> Tuple[Dict, bool]:
+    """
+    Pick a candidate by objective among those within the budgets
+
+    Args:
+        publishable_only: Only consider RandomForest pipelines (see publishable)
+
+    Returns:
+        (chosen result, whether it meets the budgets); when nothing fits, the
+        fastest candidate is returned with False
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"objective must be one of {', '.join(OBJECTIVES)}")
+    if publishable_only:
+        results = [r for r in results if r["publishable"]]
+        if not results:
+            raise ValueError("No publishable (scaler + RandomForest) candidate to select")
+    eligible = [r for r in results
+                if (max_p99_ms is None or r["p99_ms"] <= max_p99_ms)
+                and (max_size_mb is None or r["size_mb"] <= max_size_mb)]
+    if not eligible:
+        return min(results, key=lambda r: r["p99_ms"]), False
+    if objective == 'accuracy':
+        key = lambda r: (-r["accuracy"], -r["top5_accuracy"], r["p99_ms"])  # noqa: E731
+    elif objective == 'latency':
+        key = lambda r: (r["p99_ms"], -r["accuracy"])  # noqa: E731
+    else:
+        key = lambda r: (r["size_mb"], -r["accuracy"])  # noqa: E731
+    return min(eligible, key=key), True
+
+
+def compare_models(search_best, X_train, y_train, X_test, y_test,
+                   random_state: int = 42) -> Tuple[List[Dict], Dict[str, object]]:
+    """
+    Fit the alternative candidates and evaluate them next to the search winner
+
+    Returns:
+        (per-candidate results, fitted models by name)
+    """
+    models = {'search_best': search_best}
+    fit_times = {'search_best': None}
+    for name, model in candidate_models(random_state).items():
+        started = time.perf_counter()
+        models[name] = model.fit(X_train, y_train)
+        fit_times[name] = time.perf_counter() - started
+        print(f"Fitted {name} in {fit_times[name]:.1f}s")
+
+    X_test = np.asarray(X_test)
+    results = [evaluate(name, model, X_test, y_test, fit_times[name]) for name, model in models.items()]
+    return results, models
+
+
+def print_selection_report(results: List[Dict], chosen: Dict, within_budget: bool, publishable_only: bool = True):
+    """Candidate table with Pareto-optimal rows marked '*' and the chosen one '>'"""
+    front = set(pareto_front(results))
+    print(f"\n{'':2}{'candidate':<24}{'acc':>7}{'top5':>7}{'p50 ms':>9}{'p99 ms':>9}{'batch ms':>10}"
+          f"{'size MB':>9}{'nodes':>10}")
+    for r in sorted(results, key=lambda r: -r["accuracy"]):
+        mark = ('>' if r is chosen else ' ') + ('*' if r["name"] in front else ' ')
+        nodes = f"{r['nodes']:,}" if r["nodes"] is not None else '-'
+        print(f"{mark}{r['name']:<24}{r['accuracy']:>7.3f}{r['top5_accuracy']:>7.3f}{r['p50_ms']:>9.3f}"
+              f"{r['p99_ms']:>9.3f}{r['batch_ms']:>10.2f}{r['size_mb']:>9.1f}{nodes:>10}")
+    print("* Pareto-optimal on accuracy / p99 latency / size")
+    report_only = [r["name"] for r in results if not r["publishable"]]
+    if report_only and not chosen["publishable"]:
+        print("Warning: the selected model is not a RandomForest pipeline; it cannot be compiled, "
+              "grown with --incremental or explained")
+    elif report_only and publishable_only:
+        print(f"Report only (not RandomForest pipelines): {', '.join(report_only)}")
+    if not within_budget:
+        print(f"No candidate meets the budget; falling back to the fastest ({chosen['name']})")
+    print(f"Selected: {chosen['name']}")
@@ -0,0 +1,153 @@
+"""
+Parallel Cross-Validation with Shared-Memory Folds
+Grid search executor that writes the training matrix once as .npy files
+(uint8 answers, int32 label codes, int8 fold numbers) and lets every worker
+memory-map them, instead of GridSearchCV pickling the data out to the pool
+for each config and fold.
+
+Each (config, fold) pair is one task on a process pool. Tasks are queued
+largest forest first so the pool drains evenly, and each task reports its
+fit/score time, CPU time and worker pid. The result object has the same attributes
+as a fitted GridSearchCV (cv_results_, best_params_, best_estimator_, ...),
+so model_search.print_search_report works on it unchanged.
+"""
+
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Arrays mapped once per worker process by _init_worker
+_shared: Dict[str, np.ndarray] = {}
+
+
+def write_shared(directory: str, X, codes: np.ndarray, folds: np.ndarray):
+    """Write the arrays the workers map"""
+    np.save(os.path.join(directory, 'X.npy'), np.ascontiguousarray(np.asarray(X)))
+    np.save(os.path.join(directory, 'y.npy'), np.ascontiguousarray(codes, dtype=np.int32))
+    np.save(os.path.join(directory, 'folds.npy'), np.ascontiguousarray(folds, dtype=np.int8))
+
+
+def _init_worker(directory: str):
+    for name in ('X', 'y', 'folds'):
+        _shared[name] = np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+
+
+def _run_task(config_index: int, params: Dict, fold: int) -> Dict:
+    """Fit one config on every fold but one and score it on that fold"""
+    from model_search import make_pipeline
+
+    X, y, folds = _shared['X'], _shared['y'], _shared['folds']
+    test = folds == fold
+    model = make_pipeline().set_params(**params)
+
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    model.fit(X[~test], y[~test])
+    fit_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    score = model.score(X[test], y[test])
+    score_seconds = time.perf_counter() - started
+    # Wall time of a task also counts time spent waiting for a CPU when
+    # there are more workers than cores; CPU time does not
+    cpu_seconds = time.process_time() - cpu_started
+    return {"config": config_index, "fold": fold, "score": float(score), "fit_seconds": fit_seconds,
+            "score_seconds": score_seconds, "cpu_seconds": cpu_seconds, "pid": os.getpid()}
+
+
+def expand_grid(param_grid: Dict[str, List]) -> List[Dict]:
+    """Configs of a parameter grid in GridSearchCV's order"""
+    keys = sorted(param_grid)
+    return [dict(zip(keys, values)) for values in product(*(param_grid[key] for key in keys))]
+
+
+class SharedMemoryGridSearch:
+    """Exhaustive grid search over a process pool with memory-mapped training data"""
+
+    def __init__(self, param_grid: Dict[str, List], folds: np.ndarray, n_workers: Optional[int] = None,
+                 refit: bool = True, verbose: int = 1):
+        self.param_grid = param_grid
+        self.folds = np.asarray(folds, dtype=np.int8)
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.refit = refit
+        self.verbose = verbose
+        self.n_splits_ = len(np.unique(self.folds))
+        self.tasks_: List[Dict] = []
+
+    def fit(self, X, y):
+        from model_search import make_pipeline
+
+        configs = expand_grid(self.param_grid)
+        # Same class order as sklearn (sorted labels), so argmax ties break identically
+        classes, codes = np.unique(np.asarray(y), return_inverse=True)
+
+        # Largest forests first: long tasks never end up alone at the tail
+        order = sorted(range(len(configs)), key=lambda i: -configs[i].get('rf__n_estimators', 100))
+        tasks = [(i, fold) for i in order for fold in range(self.n_splits_)]
+        if self.verbose:
+            print(f"Fitting {self.n_splits_} folds for each of {len(configs)} candidates, totalling "
+                  f"{len(tasks)} fits on {self.n_workers} worker processes")
+
+        started = time.perf_counter()
+        with tempfile.TemporaryDirectory(prefix='jobsensei-cv-') as directory:
+            write_shared(directory, X, codes, self.folds)
+            with ProcessPoolExecutor(self.n_workers, initializer=_init_worker, initargs=(directory,)) as pool:
+                futures = [pool.submit(_run_task, i, configs[i], fold) for i, fold in tasks]
+                self.tasks_ = [future.result() for future in as_completed(futures)]
+        self.wall_seconds_ = time.perf_counter() - started
+
+        scores = np.zeros((len(configs), self.n_splits_))
+        fit_times = np.zeros_like(scores)
+        score_times = np.zeros_like(scores)
+        for task in self.tasks_:
+            scores[task["config"], task["fold"]] = task["score"]
+            fit_times[task["config"], task["fold"]] = task["fit_seconds"]
+            score_times[task["config"], task["fold"]] = task["score_seconds"]
+
+        mean_scores = scores.mean(axis=1)
+        # Rank 1 is best; ties share the lowest rank like GridSearchCV
+        ranks = np.array([1 + int((mean_scores > score).sum()) for score in mean_scores])
+        self.cv_results_ = {
+            "params": configs,
+            "mean_test_score": mean_scores,
+            "std_test_score": scores.std(axis=1),
+            "rank_test_score": ranks,
+            "mean_fit_time": fit_times.mean(axis=1),
+            "mean_score_time": score_times.mean(axis=1)
+        }
+        for fold in range(self.n_splits_):
+            self.cv_results_[f"split{fold}_test_score"] = scores[:, fold]
+
+        self.best_index_ = int(np.argmax(mean_scores))
+        self.best_params_ = configs[self.best_index_]
+        self.best_score_ = float(mean_scores[self.best_index_])
+        if self.refit:
+            self.best_estimator_ = make_pipeline().set_params(**self.best_params_).fit(X, y)
+        return self
+
+    def task_report(self) -> Dict:
+        """
+        Busy time per worker and pool utilization of the last fit
+
+        Utilization is task CPU time over the CPU time the pool could have
+        used (wall time x min(workers, CPUs)), so oversubscribed pools are
+        not reported as busy while their workers wait for a core.
+        """
+        busy: Dict[int, float] = {}
+        for task in self.tasks_:
+            busy[task["pid"]] = busy.get(task["pid"], 0.0) + task["fit_seconds"] + task["score_seconds"]
+        cpu_seconds = sum(task["cpu_seconds"] for task in self.tasks_)
+        capacity = self.wall_seconds_ * min(self.n_workers, os.cpu_count() or 1)
+        return {
+            "tasks": len(self.tasks_),
+            "wall_seconds": self.wall_seconds_,
+            "task_seconds": sum(busy.values()),
+            "cpu_seconds": cpu_seconds,
+            "workers": len(busy),
+            "utilization": cpu_seconds / capacity if capacity else 0.0,
+            "busy_seconds_per_worker": sorted(busy.values(), reverse=True)
+        }
@@ -0,0 +1,146 @@
+"""
+Prediction Micro-Batcher
+Coalesces concurrent single-row /predict calls into one vectorized scoring
+call, trading a bounded queueing delay for much higher throughput under
+gunicorn's threaded workers.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class BatchStats:
+    """Running batch-size and queue-wait metrics (thread-safe)"""
+
+    # Upper bounds of the queue-wait histogram buckets, in seconds
+    wait_buckets = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1, float('inf'))
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.rows = 0
+        self.max_batch_size = 0
+        self.batch_size_counts: Dict[int, int] = {}
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.wait_counts = [0] * len(self.wait_buckets)
+        self.total_score_time = 0.0
+
+    def record(self, waits: List[float], score_time: float):
+        with self._lock:
+            size = len(waits)
+            self.batches += 1
+            self.rows += size
+            self.max_batch_size = max(self.max_batch_size, size)
+            self.batch_size_counts[size] = self.batch_size_counts.get(size, 0) + 1
+            self.total_score_time += score_time
+            for wait in waits:
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+                for i, bound in enumerate(self.wait_buckets):
+                    if wait <= bound:
+                        self.wait_counts[i] += 1
+                        break
+
+    def snapshot(self) -> Dict:
+        """Copy of the current metrics, e.g. for a status endpoint"""
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "rows": self.rows,
+                "mean_batch_size": self.rows / self.batches if self.batches else 0.0,
+                "max_batch_size": self.max_batch_size,
+                "batch_size_counts": dict(sorted(self.batch_size_counts.items())),
+                "mean_queue_wait_ms": 1000 * self.total_wait / self.rows if self.rows else 0.0,
+                "max_queue_wait_ms": 1000 * self.max_wait,
+                "queue_wait_buckets_ms": {
+                    ('+Inf' if bound == float('inf') else f"{bound * 1000:g}"): count
+                    for bound, count in zip(self.wait_buckets, self.wait_counts)
+                },
+                "mean_score_time_ms": 1000 * self.total_score_time / self.batches if self.batches else 0.0
+            }
+
+
+class MicroBatcher:
+    """
+    Queue response vectors and score them together
+
+    A batch is flushed when it reaches max_batch_size rows or when its oldest
+    row has waited max_wait seconds, whichever comes first. Each caller blocks
+    only for its own row's result.
+    """
+
+    def __init__(self, score_fn: Callable[[np.ndarray], np.ndarray],
+                 max_batch_size: int = 64, max_wait: float = 0.002):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.stats = BatchStats()
+
+        self._pending: List[Tuple[np.ndarray, float, Future]] = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name='predict-batcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, row) -> Future:
+        """Enqueue one response vector; the future resolves to its score row"""
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._pending.append((np.asarray(row), time.perf_counter(), future))
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch_size:
+                self._cond.notify()
+        return future
+
+    def predict(self, row, timeout: Optional[float] = None) -> np.ndarray:
+        """Score one response vector through the shared batch"""
+        return self.submit(row).result(timeout)
+
+    def close(self):
+        """Stop accepting rows; queued rows are still scored"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._worker.join()
+
+    def _next_batch(self) -> List[Tuple[np.ndarray, float, Future]]:
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            if self._pending and len(self._pending) < self.max_batch_size and not self._closed:
+                deadline = self._pending[0][1] + self.max_wait
+                while len(self._pending) < self.max_batch_size and not self._closed:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+
+            started = time.perf_counter()
+            waits = [started - enqueued for _, enqueued, _ in batch]
+            try:
+                scores = self.score_fn(np.stack([row for row, _, _ in batch]))
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.stats.record(waits, time.perf_counter() - started)
+
+            for i, (_, _, future) in enumerate(batch):
+                future.set_result(scores[i])
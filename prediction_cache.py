@@ -0,0 +1,288 @@
+"""
+Prediction Cache
+Memoizes predict_proba for single quiz submissions. Answers are 20 integers
+from 1 to 5, so a submission packs losslessly into one base-5 integer
+(< 5**20, fits a signed 64-bit SQLite key).
+
+Two tiers:
+    - an in-process LRU with a TTL (no locking beyond one mutex, no I/O)
+    - an optional SQLite table shared by every gunicorn worker on the host,
+      bounded by a row limit and trimmed least-recently-used first
+
+Entries are keyed by model version as well, so a hot reload invalidates
+them automatically.
+
+The shared tier fails open: a locked, full or corrupt database is counted in
+the stats as a shared error and the request falls through to inference.
+Hits only read; their recency is batched into the next write transaction, so
+repeated submissions do not serialize the workers on the database lock.
+
+Only single-row predictions go through the cache; batch scoring is already
+vectorized and rarely repeats whole batches.
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+MIN_ANSWER = 1
+MAX_ANSWER = 5
+N_QUESTIONS = 20
+RADIX = MAX_ANSWER - MIN_ANSWER + 1
+
+
+def pack_responses(responses) -> Optional[int]:
+    """Pack 20 answers into a base-5 integer; None if any answer is out of range"""
+    if len(responses) != N_QUESTIONS:
+        return None
+    key = 0
+    for answer in responses:
+        if type(answer) is not int or not MIN_ANSWER <= answer <= MAX_ANSWER:
+            return None
+        key = key * RADIX + (answer - MIN_ANSWER)
+    return key
+
+
+def unpack_responses(key: int):
+    """Inverse of pack_responses"""
+    responses = []
+    for _ in range(N_QUESTIONS):
+        key, digit = divmod(key, RADIX)
+        responses.append(digit + MIN_ANSWER)
+    return responses[::-1]
+
+
+class CacheStats:
+    """Hit/miss/eviction counters for one process (thread-safe)"""
+
+    fields = ('hits', 'shared_hits', 'misses', 'evictions', 'shared_evictions', 'shared_errors', 'expired',
+              'invalidations')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = dict.fromkeys(self.fields, 0)
+
+    def add(self, field: str, count: int = 1):
+        with self._lock:
+            self.counts[field] += count
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counts = dict(self.counts)
+        lookups = counts['hits'] + counts['shared_hits'] + counts['misses']
+        counts['lookups'] = lookups
+        counts['hit_rate'] = (counts['hits'] + counts['shared_hits']) / lookups if lookups else 0.0
+        return counts
+
+
+class SharedPredictionStore:
+    """SQLite table of probability vectors shared across worker processes"""
+
+    # Trim the table back to max_entries once every this many inserts
+    trim_interval = 256
+    # Write the recency of hits once this many are pending (otherwise with the next insert)
+    touch_batch = 256
+
+    def __init__(self, path: str, max_entries: int = 100000):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._inserts = 0
+        self._touched: Dict[tuple, float] = {}
+        self._touched_lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS predictions (
+                    version TEXT NOT NULL,
+                    key INTEGER NOT NULL,
+                    proba BLOB NOT NULL,
+                    expires REAL NOT NULL,
+                    used REAL NOT NULL,
+                    PRIMARY KEY (version, key)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS predictions_used ON predictions (used);
+            """)
+        # Created at import under gunicorn --preload: SQLite connections must not
+        # cross fork(), so every worker opens its own on first use
+        self._close_local()
+
+    def _close_local(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')  # cache contents are disposable
+            self._local.conn = conn
+        return conn
+
+    def get(self, version: str, key: int) -> Optional[bytes]:
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT proba FROM predictions WHERE version = ? AND key = ? AND expires > ?",
+            (version, key, now)
+        ).fetchone()
+        if row is None:
+            return None
+        with self._touched_lock:
+            self._touched[(version, key)] = now
+            flush = len(self._touched) >= self.touch_batch
+        if flush:
+            with conn:
+                self._write_touched(conn)
+        return row[0]
+
+    def _write_touched(self, conn: sqlite3.Connection):
+        """Update 'used' of every hit since the last write (caller holds a transaction)"""
+        with self._touched_lock:
+            touched, self._touched = self._touched, {}
+        if touched:
+            conn.executemany("UPDATE predictions SET used = ? WHERE version = ? AND key = ?",
+                             [(used, version, key) for (version, key), used in touched.items()])
+
+    def put(self, version: str, key: int, proba: bytes, ttl: float) -> int:
+        """Store one vector; returns the number of rows evicted by trimming"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO predictions (version, key, proba, expires, used) VALUES (?, ?, ?, ?, ?)",
+                (version, key, proba, now + ttl, now)
+            )
+            self._write_touched(conn)
+        self._inserts += 1
+        if self._inserts % self.trim_interval == 0:
+            return self.trim()
+        return 0
+
+    def trim(self) -> int:
+        """Drop expired rows, then least-recently-used rows above max_entries"""
+        with self._connect() as conn:
+            evicted = conn.execute("DELETE FROM predictions WHERE expires <= ?", (time.time(),)).rowcount
+            excess = conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0] - self.max_entries
+            if excess > 0:
+                evicted += conn.execute(
+                    "DELETE FROM predictions WHERE (version, key) IN "
+                    "(SELECT version, key FROM predictions ORDER BY used LIMIT ?)",
+                    (excess,)
+                ).rowcount
+        return evicted
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+
+
+class PredictionCache:
+    """
+    LRU/TTL cache of probability vectors keyed by (model version, packed answers)
+
+    Cached vectors are read-only numpy arrays shared between requests.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl: float = 3600.0,
+                 shared: Optional[SharedPredictionStore] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.shared = shared
+        self.stats = CacheStats()
+        self.version: Optional[str] = None
+
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _check_version(self, version: str):
+        # Caller holds self._lock
+        if version != self.version:
+            # Shared rows of the old version are never read again and age out
+            # through the LRU trim; dropping them here would race with workers
+            # that have not swapped yet
+            if self.version is not None:
+                self.stats.add('invalidations', len(self._entries))
+            self._entries.clear()
+            self.version = version
+
+    def get(self, version: str, key: int):
+        """Cached probability vector, or None"""
+        now = time.monotonic()
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                proba, expires = entry
+                if expires > now:
+                    self._entries.move_to_end(key)
+                    self.stats.add('hits')
+                    return proba
+                del self._entries[key]
+                self.stats.add('expired')
+
+        if self.shared is not None:
+            try:
+                blob = self.shared.get(version, key)
+            except sqlite3.Error as e:
+                self._shared_failed('read', e)
+                blob = None
+            if blob is not None:
+                import numpy as np
+                proba = np.frombuffer(blob, dtype=np.float64)
+                self._store(version, key, proba)
+                self.stats.add('shared_hits')
+                return proba
+
+        self.stats.add('misses')
+        return None
+
+    def _store(self, version: str, key: int, proba):
+        with self._lock:
+            if version != self.version:
+                return
+            self._entries[key] = (proba, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.add('evictions')
+
+    def put(self, version: str, key: int, proba):
+        """Cache a freshly computed vector in both tiers"""
+        import numpy as np
+        proba = np.array(proba, dtype=np.float64)
+        proba.flags.writeable = False
+        self._store(version, key, proba)
+        if self.shared is not None:
+            try:
+                self.stats.add('shared_evictions', self.shared.put(version, key, proba.tobytes(), self.ttl))
+            except sqlite3.Error as e:
+                self._shared_failed('write', e)
+
+    def _shared_failed(self, operation: str, error: Exception):
+        # The cache is only an optimisation: count the failure and carry on without the shared tier
+        self.stats.add('shared_errors')
+        print(f"Shared prediction cache {operation} failed: {str(error)}")
+
+    def describe(self) -> Dict:
+        """Configuration, sizes and counters for the stats endpoint"""
+        with self._lock:
+            size = len(self._entries)
+        shared_entries = None
+        if self.shared is not None:
+            try:
+                shared_entries = self.shared.count()
+            except sqlite3.Error as e:
+                self._shared_failed('count', e)
+        return {
+            "version": self.version,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "entries": size,
+            "shared_path": self.shared.path if self.shared is not None else None,
+            "shared_entries": shared_entries,
+            "shared_max_entries": self.shared.max_entries if self.shared is not None else None,
+            "stats": self.stats.snapshot()
+        }
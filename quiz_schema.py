@@ -0,0 +1,188 @@
+"""
+Quiz Schema
+Answer columns, answer validation and career display names shared by the
+web app (app.py) and offline scoring (bulk_score.py), so both accept the
+same inputs and report the same careers.
+
+Answers are integers from 1 to 5. Booleans, strings, non-integral numbers
+and NaN are rejected rather than coerced (3.7 is not read as 3, nor true
+as 1). numpy is imported inside the functions so importing this module
+stays cheap for the web tier.
+"""
+
+from typing import Tuple
+
+QUESTION_COLUMNS = [f'Q{i}' for i in range(1, 21)]  # Q1 to Q20
+
+# Mapping from model class labels to display names
+career_label_to_name = {
+    "Career_0": "Data Scientist",
+    "Career_1": "Psychologist",
+    "Career_2": "Software Engineer",
+    "Career_3": "Artist",
+    "Career_4": "Doctor",
+    "Career_5": "Teacher",
+    "Career_6": "Business Analyst",
+    "Career_7": "Engineer",
+    "Career_8": "Biologist",
+    "Career_9": "Entrepreneur",
+    "Career_10": "Journalist",
+    "Career_11": "Marketing Manager",
+    "Career_12": "Nurse",
+    "Career_13": "Accountant",
+    "Career_14": "UX Designer",
+    "Career_15": "Financial Analyst",
+    "Career_16": "Architect",
+    "Career_17": "Social Worker",
+    "Career_18": "IT Support Specialist",
+    "Career_19": "Chef",
+    "Career_20": "Human Resources Manager",
+    "Career_21": "Research Scientist",
+    "Career_22": "Lawyer",
+    "Career_23": "Electrician",
+    "Career_24": "Graphic Designer",
+    "Career_25": "Product Manager",
+    "Career_26": "Civil Engineer",
+    "Career_27": "Veterinarian",
+    "Career_28": "Consultant",
+    "Career_29": "Pharmacist",
+    "Career_30": "Event Planner",
+    "Career_31": "Mechanical Engineer",
+    "Career_32": "Environmental Scientist",
+    "Career_33": "Real Estate Agent",
+    "Career_34": "Physical Therapist",
+    "Career_35": "Supply Chain Manager",
+    "Career_36": "Web Developer",
+    "Career_37": "Customer Service Rep",
+    "Career_38": "Project Manager",
+    "Career_39": "College Professor",
+    "Career_40": "Dental Hygienist",
+    "Career_41": "Pilot",
+    "Career_42": "Cybersecurity Analyst",
+    "Career_43": "Fashion Designer",
+    "Career_44": "Speech Therapist",
+    "Career_45": "Investment Banker",
+    "Career_46": "Photographer",
+    "Career_47": "Clinical Psychologist",
+    "Career_48": "Game Developer",
+    "Career_49": "Urban Planner",
+    "Career_50": "Flight Attendant",
+    "Career_51": "Robotics Engineer",
+    "Career_52": "Environmental Lawyer",
+    "Career_53": "Interior Designer",
+    "Career_54": "Music Teacher",
+    "Career_55": "Data Analyst",
+    "Career_56": "Dentist",
+    "Career_57": "Fitness Trainer",
+    "Career_58": "Aerospace Engineer",
+    "Career_59": "Content Creator",
+    "Career_60": "Occupational Therapist",
+    "Career_61": "Financial Planner",
+    "Career_62": "App Developer",
+    "Career_63": "Marriage Counselor",
+    "Career_64": "Geologist",
+    "Career_65": "Chef de Cuisine",
+    "Career_66": "Public Relations Specialist",
+    "Career_67": "Neurologist",
+    "Career_68": "Architect (Software)",
+    "Career_69": "Social Media Manager",
+    "Career_70": "Physicist",
+    "Career_71": "Landscape Designer",
+    "Career_72": "Emergency Medical Technician",
+    "Career_73": "Air Traffic Controller",
+    "Career_74": "Historian",
+    "Career_75": "Hotel Manager",
+    "Career_76": "Nuclear Engineer",
+    "Career_77": "Marine Biologist",
+    "Career_78": "Art Director",
+    "Career_79": "Dental Assistant",
+    "Career_80": "Mechanical Technician",
+    "Career_81": "Special Education Teacher",
+    "Career_82": "Technical Writer",
+    "Career_83": "Pharmaceutical Sales",
+    "Career_84": "Forensic Scientist",
+    "Career_85": "Athletic Trainer",
+    "Career_86": "Database Administrator",
+    "Career_87": "Interior Decorator",
+    "Career_88": "Nurse Practitioner",
+    "Career_89": "Financial Controller",
+    "Career_90": "UI Developer",
+    "Career_91": "School Counselor",
+    "Career_92": "Geophysicist",
+    "Career_93": "Executive Chef",
+    "Career_94": "Digital Marketing Specialist",
+    "Career_95": "Cardiologist",
+    "Career_96": "DevOps Engineer",
+    "Career_97": "Public Speaker",
+    "Career_98": "Quantum Physicist",
+    "Career_99": "Floral Designer",
+    "Career_100": "Speech-Language Pathologist",
+    "Career_101": "Investment Analyst",
+    "Career_102": "3D Artist",
+    "Career_103": "Clinical Nurse Specialist",
+    "Career_104": "Tax Accountant",
+    "Career_105": "UX Researcher",
+    "Career_106": "Marriage Therapist",
+    "Career_107": "Astronomer",
+    "Career_108": "Restaurant Manager",
+    "Career_109": "SEO Specialist",
+    "Career_110": "Surgical Technologist",
+    "Career_111": "Machine Learning Engineer",
+    "Career_112": "Event Host",
+    "Career_113": "Meteorologist",
+    "Career_114": "Fashion Merchandiser",
+    "Career_115": "Physical Education Teacher",
+    "Career_116": "Systems Administrator",
+    "Career_117": "Interior Architect",
+    "Career_118": "Genetic Counselor",
+    "Career_119": "Actuary",
+    "Career_120": "Video Game Artist",
+    "Career_121": "Speech Coach",
+    "Career_122": "Astronaut"
+}
+
+
+def invalid_answers(values) -> Tuple['np.ndarray', 'np.ndarray']:
+    """
+    Check an (N, 20) array of answers
+
+    Returns:
+        (answers as float64 with NaN for non-numbers, mask of the entries
+        that are not integers from 1 to 5)
+    """
+    import numpy as np
+    answers = np.asarray(values)
+    if answers.dtype.kind == 'O':
+        # Mixed columns (e.g. a CSV with a stray string): keep the numbers, reject the rest
+        numeric = np.vectorize(lambda value: isinstance(value, (int, float, np.integer, np.floating))
+                               and not isinstance(value, (bool, np.bool_)), otypes=[bool])(answers)
+        numbers = np.where(numeric, answers, np.nan).astype(np.float64)
+    elif answers.dtype.kind in 'iuf':
+        numeric = np.ones(answers.shape, dtype=bool)
+        numbers = answers.astype(np.float64)
+    else:
+        # Strings and booleans are never valid answers
+        numeric = np.zeros(answers.shape, dtype=bool)
+        numbers = np.full(answers.shape, np.nan)
+    with np.errstate(invalid='ignore'):
+        invalid = ~numeric | np.isnan(numbers) | (numbers != np.floor(numbers)) | (numbers < 1) | (numbers > 5)
+    return numbers, invalid
+
+
+def answer_error(column: str, value) -> str:
+    """Message for an answer that is not an integer from 1 to 5"""
+    import numpy as np
+    return f"{column} must be an integer from 1 to 5 (got {value.item() if isinstance(value, np.generic) else value!r})"
+
+
+def validate_answers(values) -> 'np.ndarray':
+    """(N, 20) int64 array of answers; ValueError naming the first value that is not an integer from 1 to 5"""
+    import numpy as np
+    answers = np.asarray(values)
+    if answers.ndim != 2 or answers.shape[1] != len(QUESTION_COLUMNS):
+        raise ValueError(f"Each response vector must contain {len(QUESTION_COLUMNS)} answers")
+    numbers, invalid = invalid_answers(answers)
+    if invalid.any():
+        row, question = np.argwhere(invalid)[0]
+        raise ValueError(f"Row {row}: {answer_error(QUESTION_COLUMNS[question], answers[row, question])}")
+    return numbers.astype(np.int64)
@@ -0,0 +1,249 @@
+"""
+On-Demand Request Profiler
+Profiles the next N requests (or the next T seconds of requests) of one
+live worker, then writes the result to a local directory:
+
+    cprofile  deterministic cProfile of each request, merged into one .pstats
+              file (snakeviz, flameprof, or `python -m pstats`)
+    sample    a background thread samples the stacks of threads that are
+              serving a profiled request every interval and writes collapsed
+              stacks (flamegraph.pl, speedscope, inferno)
+
+While no session is armed, the profiler's request hooks are not registered
+with Flask at all, so the normal request path runs no profiler code.
+"""
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+MODES = ('cprofile', 'sample')
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}"
+
+
+def collapse_stack(frame) -> str:
+    """Root-first 'file:function:line;...' stack as used by collapsed-stack flame graph tools"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class ProfileSession:
+    """One armed profiling run: its limits, collected data and output path"""
+
+    def __init__(self, mode: str, max_requests: int, max_seconds: float,
+                 interval: float, route: Optional[str], output_dir: str):
+        self.mode = mode
+        self.max_requests = max_requests
+        self.max_seconds = max_seconds
+        self.interval = interval
+        self.route = route
+        self.output_dir = output_dir
+        self.started = time.monotonic()
+        self.started_at = datetime.now()
+        self.requests = 0
+        self.skipped = 0
+        self.samples = 0
+
+        self.stats: Optional[pstats.Stats] = None
+        self.stacks: Counter = Counter()
+        self.threads: Dict[int, str] = {}
+        self.lock = threading.Lock()
+        self.cprofile_lock = threading.Lock()
+        self.done = threading.Event()
+
+    def expired(self) -> bool:
+        return (self.requests >= self.max_requests
+                or time.monotonic() - self.started >= self.max_seconds)
+
+    def describe(self) -> Dict:
+        return {
+            "mode": self.mode,
+            "route": self.route,
+            "max_requests": self.max_requests,
+            "max_seconds": self.max_seconds,
+            "interval_ms": self.interval * 1000 if self.mode == 'sample' else None,
+            "requests": self.requests,
+            "skipped": self.skipped,
+            "samples": self.samples if self.mode == 'sample' else None,
+            "started_at": self.started_at.isoformat(),
+            "elapsed_seconds": round(time.monotonic() - self.started, 3)
+        }
+
+
+class RequestProfiler:
+    """Arms profiling sessions on a Flask app and writes their output"""
+
+    def __init__(self, app, output_dir: str = 'profiles'):
+        self.app = app
+        self.output_dir = output_dir
+        self.session: Optional[ProfileSession] = None
+        self.last_result: Optional[Dict] = None
+        self._lock = threading.Lock()
+
+    def start(self, mode: str = 'sample', max_requests: int = 100, max_seconds: float = 60.0,
+              interval: float = 0.005, route: Optional[str] = None) -> ProfileSession:
+        """Profile the next max_requests requests or max_seconds, whichever ends first"""
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}")
+        if max_requests < 1 or max_seconds <= 0 or interval <= 0:
+            raise ValueError("requests, seconds and interval must be positive")
+        with self._lock:
+            if self.session is not None:
+                raise RuntimeError("A profiling session is already running")
+            session = ProfileSession(mode, max_requests, max_seconds, interval, route, self.output_dir)
+            self.session = session
+            self._install_hooks()
+
+        threading.Thread(target=self._supervise, args=(session,), name='request-profiler', daemon=True).start()
+        print(f"Profiling armed: {mode}, {max_requests} requests / {max_seconds}s"
+              + (f" on {route}" if route else ""))
+        return session
+
+    def stop(self) -> Optional[Dict]:
+        """End the running session early and write what was collected"""
+        session = self.session
+        if session is None:
+            return None
+        session.done.set()
+        return self._finish(session)
+
+    def describe(self) -> Dict:
+        session = self.session
+        return {
+            "active": session is not None,
+            "session": session.describe() if session is not None else None,
+            "last_result": self.last_result,
+            "output_dir": self.output_dir,
+            "pid": os.getpid()
+        }
+
+    def _install_hooks(self):
+        # Copy-on-write so requests iterating the old list are unaffected
+        before = self.app.before_request_funcs
+        before[None] = list(before.get(None, [])) + [self._before_request]
+
+    def _remove_hooks(self):
+        before = self.app.before_request_funcs
+        before[None] = [func for func in before.get(None, []) if func != self._before_request]
+
+    def _before_request(self):
+        from flask import after_this_request, request
+
+        session = self.session
+        if session is None or session.done.is_set():
+            return
+        if session.route and (request.url_rule is None or request.url_rule.rule != session.route):
+            return
+
+        profile = None
+        if session.mode == 'cprofile':
+            # cProfile can only run one profiler at a time on 3.12+, so
+            # concurrent requests are skipped rather than interleaved
+            if not session.cprofile_lock.acquire(blocking=False):
+                with session.lock:
+                    session.skipped += 1
+                return
+            profile = cProfile.Profile()
+        else:
+            with session.lock:
+                session.threads[threading.get_ident()] = request.path
+
+        # A per-request callback (not an app hook) ends the profile, so it
+        # still runs if the session finishes while this request is in flight
+        @after_this_request
+        def _end_request(response):
+            self._end_request(session, profile)
+            return response
+
+        if profile is not None:
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler is already active in this process
+                session.cprofile_lock.release()
+                raise
+
+    def _end_request(self, session: ProfileSession, profile: Optional[cProfile.Profile]):
+        if profile is not None:
+            profile.disable()
+            with session.lock:
+                if session.stats is None:
+                    session.stats = pstats.Stats(profile)
+                else:
+                    session.stats.add(profile)
+            session.cprofile_lock.release()
+        else:
+            with session.lock:
+                session.threads.pop(threading.get_ident(), None)
+
+        with session.lock:
+            session.requests += 1
+            if session.expired():
+                session.done.set()
+
+    def _supervise(self, session: ProfileSession):
+        interval = session.interval if session.mode == 'sample' else 0.05
+        while not session.done.wait(interval):
+            if time.monotonic() - session.started >= session.max_seconds:
+                break
+            if session.mode == 'sample':
+                self._sample(session)
+        self._finish(session)
+
+    def _sample(self, session: ProfileSession):
+        with session.lock:
+            threads = dict(session.threads)
+        if not threads:
+            return
+        frames = sys._current_frames()
+        with session.lock:
+            for thread_id in threads:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    session.stacks[collapse_stack(frame)] += 1
+                    session.samples += 1
+
+    def _finish(self, session: ProfileSession) -> Optional[Dict]:
+        with self._lock:
+            if self.session is not session:
+                return self.last_result
+            self.session = None
+            self._remove_hooks()
+
+        session.done.set()
+        result = dict(session.describe(), path=self._write(session))
+        self.last_result = result
+        print(f"Profiling finished: {result['requests']} requests -> {result['path']}")
+        return result
+
+    def _write(self, session: ProfileSession) -> Optional[str]:
+        os.makedirs(session.output_dir, exist_ok=True)
+        stem = os.path.join(session.output_dir,
+                            f"{session.started_at:%Y%m%d-%H%M%S}-{os.getpid()}-{session.mode}")
+        with session.lock:
+            if session.mode == 'cprofile':
+                if session.stats is None:
+                    return None
+                path = stem + '.pstats'
+                session.stats.dump_stats(path)
+            else:
+                if not session.stacks:
+                    return None
+                path = stem + '.collapsed'
+                lines: List[str] = [f"{stack} {count}" for stack, count in session.stacks.most_common()]
+                with open(path, 'w') as file:
+                    file.write('\n'.join(lines) + '\n')
+        return path
@@ -0,0 +1,383 @@
+"""
+Server-Side Session Store
+Keeps session payloads (career recommendations, generated roadmaps) on the
+server so the cookie only carries a signed, opaque session ID.
+
+Each session key is stored as its own compactly serialized record and is only
+fetched when a route reads that key, so requests that never touch the session,
+or only read a small key, don't pay for the large payloads.
+"""
+
+import os
+import secrets
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, List, Optional
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+
+# Payloads larger than this are zlib-compressed before storage
+COMPRESS_THRESHOLD = 256
+
+_RAW = b'\x00'
+_ZLIB = b'\x01'
+
+_serializer = TaggedJSONSerializer()
+
+
+def encode_value(value) -> bytes:
+    """Serialize a session value (tagged JSON, compressed when large)"""
+    data = _serializer.dumps(value).encode('utf-8')
+    if len(data) > COMPRESS_THRESHOLD:
+        return _ZLIB + zlib.compress(data, 6)
+    return _RAW + data
+
+
+def decode_value(blob: bytes):
+    """Inverse of encode_value"""
+    blob = bytes(blob)
+    data = zlib.decompress(blob[1:]) if blob[:1] == _ZLIB else blob[1:]
+    return _serializer.loads(data.decode('utf-8'))
+
+
+class SessionStore:
+    """Backend interface: per-key blobs grouped under an expiring session ID"""
+
+    def load_item(self, sid: str, key: str) -> Optional[bytes]:
+        """Return the stored blob for one key, or None if missing/expired"""
+        raise NotImplementedError
+
+    def load_keys(self, sid: str) -> List[str]:
+        """Return all keys stored for a live session"""
+        raise NotImplementedError
+
+    def save_items(self, sid: str, items: Dict[str, Optional[bytes]], expires: float):
+        """Write changed keys (None deletes a key) and extend the expiry"""
+        raise NotImplementedError
+
+    def delete(self, sid: str):
+        """Remove a session and all of its keys"""
+        raise NotImplementedError
+
+    def cleanup(self):
+        """Remove expired sessions"""
+        raise NotImplementedError
+
+
+class SQLiteSessionStore(SessionStore):
+    """Local SQLite backend, safe across threads and gunicorn worker processes"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    sid TEXT PRIMARY KEY,
+                    expires REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS session_items (
+                    sid TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    data BLOB NOT NULL,
+                    PRIMARY KEY (sid, key)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires);
+            """)
+        # Created at import under gunicorn --preload: SQLite connections must not
+        # cross fork(), so every worker opens its own on first use
+        self._close_local()
+
+    def _close_local(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def load_item(self, sid: str, key: str) -> Optional[bytes]:
+        row = self._connect().execute(
+            "SELECT data FROM session_items JOIN sessions USING (sid) "
+            "WHERE sid = ? AND key = ? AND expires > ?",
+            (sid, key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def load_keys(self, sid: str) -> List[str]:
+        rows = self._connect().execute(
+            "SELECT key FROM session_items JOIN sessions USING (sid) "
+            "WHERE sid = ? AND expires > ?",
+            (sid, time.time())
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def save_items(self, sid: str, items: Dict[str, Optional[bytes]], expires: float):
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO sessions (sid, expires) VALUES (?, ?)", (sid, expires))
+            for key, data in items.items():
+                if data is None:
+                    conn.execute("DELETE FROM session_items WHERE sid = ? AND key = ?", (sid, key))
+                else:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO session_items (sid, key, data) VALUES (?, ?, ?)",
+                        (sid, key, data)
+                    )
+
+    def delete(self, sid: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM session_items WHERE sid = ?", (sid,))
+            conn.execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+    def cleanup(self):
+        with self._connect() as conn:
+            now = time.time()
+            conn.execute(
+                "DELETE FROM session_items WHERE sid IN (SELECT sid FROM sessions WHERE expires <= ?)",
+                (now,)
+            )
+            conn.execute("DELETE FROM sessions WHERE expires <= ?", (now,))
+
+
+class FileSessionStore(SessionStore):
+    """One directory per session, one file per key; writes are atomic renames"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _session_dir(self, sid: str) -> str:
+        return os.path.join(self.directory, sid)
+
+    def _key_path(self, sid: str, key: str) -> str:
+        # Hex-encode keys so any session key is a safe file name
+        return os.path.join(self._session_dir(sid), key.encode('utf-8').hex())
+
+    def _alive(self, sid: str) -> bool:
+        try:
+            with open(os.path.join(self._session_dir(sid), 'expires')) as file:
+                return float(file.read()) > time.time()
+        except (OSError, ValueError):
+            return False
+
+    def _write(self, path: str, data: bytes):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+
+    def load_item(self, sid: str, key: str) -> Optional[bytes]:
+        if not self._alive(sid):
+            return None
+        try:
+            with open(self._key_path(sid, key), 'rb') as file:
+                return file.read()
+        except OSError:
+            return None
+
+    def load_keys(self, sid: str) -> List[str]:
+        if not self._alive(sid):
+            return []
+        return [
+            bytes.fromhex(name).decode('utf-8')
+            for name in os.listdir(self._session_dir(sid))
+            if name != 'expires' and not name.startswith('tmp')
+        ]
+
+    def save_items(self, sid: str, items: Dict[str, Optional[bytes]], expires: float):
+        os.makedirs(self._session_dir(sid), exist_ok=True)
+        for key, data in items.items():
+            path = self._key_path(sid, key)
+            if data is None:
+                if os.path.exists(path):
+                    os.remove(path)
+            else:
+                self._write(path, data)
+        self._write(os.path.join(self._session_dir(sid), 'expires'), repr(expires).encode('ascii'))
+
+    def delete(self, sid: str):
+        session_dir = self._session_dir(sid)
+        if os.path.isdir(session_dir):
+            for name in os.listdir(session_dir):
+                os.remove(os.path.join(session_dir, name))
+            os.rmdir(session_dir)
+
+    def cleanup(self):
+        for sid in os.listdir(self.directory):
+            if not self._alive(sid):
+                self.delete(sid)
+
+
+class ServerSideSession(SessionMixin):
+    """Session whose values are fetched from the store on first access, per key"""
+
+    def __init__(self, store: SessionStore, sid: Optional[str] = None):
+        self.store = store
+        self.sid = sid
+        self.new = sid is None
+        self.modified = False
+        self._values: Dict = {}
+        self._blobs: Dict[str, bytes] = {}
+        self._missing = set()
+        self._deleted = set()
+        self._all_keys_loaded = self.new
+
+    def _load(self, key):
+        if key in self._values:
+            return True
+        if key in self._missing or key in self._deleted or self._all_keys_loaded:
+            return False
+        blob = self.store.load_item(self.sid, key)
+        if blob is None:
+            self._missing.add(key)
+            return False
+        self._blobs[key] = bytes(blob)
+        self._values[key] = decode_value(blob)
+        return True
+
+    def _load_all(self):
+        if not self._all_keys_loaded:
+            for key in self.store.load_keys(self.sid):
+                if key not in self._deleted:
+                    self._load(key)
+            self._all_keys_loaded = True
+
+    def __getitem__(self, key):
+        if not self._load(key):
+            raise KeyError(key)
+        return self._values[key]
+
+    def __setitem__(self, key, value):
+        self._values[key] = value
+        self._missing.discard(key)
+        self._deleted.discard(key)
+        self.modified = True
+
+    def __delitem__(self, key):
+        if not self._load(key):
+            raise KeyError(key)
+        del self._values[key]
+        self._deleted.add(key)
+        self.modified = True
+
+    def __contains__(self, key):
+        return self._load(key)
+
+    def __iter__(self) -> Iterator:
+        self._load_all()
+        return iter(list(self._values))
+
+    def __len__(self) -> int:
+        self._load_all()
+        return len(self._values)
+
+    def clear(self):
+        self._load_all()
+        self._deleted.update(self._values)
+        self._values.clear()
+        self.modified = True
+
+    def changes(self) -> Dict[str, Optional[bytes]]:
+        """Encoded records to write back; None marks a deleted key"""
+        # Values may have been mutated in place (Flask expects session.modified
+        # = True in that case), so loaded values are re-encoded and compared
+        items: Dict[str, Optional[bytes]] = {}
+        for key, value in self._values.items():
+            blob = encode_value(value)
+            if self._blobs.get(key) != blob:
+                items[key] = blob
+        items.update({key: None for key in self._deleted})
+        return items
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Flask session interface storing payloads in a SessionStore"""
+
+    salt = 'jobsensei-session-id'
+    # Expired sessions are purged once every this many saves per process
+    cleanup_interval = 1000
+
+    def __init__(self, store: SessionStore):
+        self.store = store
+        self._saves = 0
+
+    def _signer(self, app) -> Signer:
+        return Signer(app.secret_key, salt=self.salt)
+
+    def open_session(self, app, request) -> Optional[ServerSideSession]:
+        if not app.secret_key:
+            return None
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        sid = None
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode('ascii')
+            except BadSignature:
+                sid = None
+        return ServerSideSession(self.store, sid)
+
+    def save_session(self, app, session: ServerSideSession, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        partitioned = self.get_cookie_partitioned(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+
+        if session.accessed:
+            response.vary.add("Cookie")
+
+        # Untouched sessions cost nothing: no store round trip, no cookie
+        if not session.modified:
+            return
+
+        if not session:
+            if session.sid is not None:
+                self.store.delete(session.sid)
+                response.delete_cookie(
+                    name,
+                    domain=domain,
+                    path=path,
+                    secure=secure,
+                    partitioned=partitioned,
+                    samesite=samesite,
+                    httponly=httponly,
+                )
+                response.vary.add("Cookie")
+            return
+
+        if session.sid is None:
+            session.sid = secrets.token_urlsafe(32)
+
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        self.store.save_items(session.sid, session.changes(), time.time() + lifetime)
+
+        self._saves += 1
+        if self._saves % self.cleanup_interval == 0:
+            self.store.cleanup()
+
+        response.set_cookie(
+            name,
+            self._signer(app).sign(session.sid).decode('ascii'),
+            expires=self.get_expiration_time(app, session),
+            httponly=httponly,
+            domain=domain,
+            path=path,
+            secure=secure,
+            partitioned=partitioned,
+            samesite=samesite,
+        )
+        response.vary.add("Cookie")
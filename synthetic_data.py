@@ -0,0 +1,172 @@
+"""
+Synthetic Psychometric Dataset Generator
+Learns per-job-role answer distributions from the real dataset and emits
+arbitrarily large datasets with the same class balance, for scale testing
+of training, batch scoring and the caches.
+
+Every job role keeps its share of rows, and every answer is drawn from that
+role's distribution over 1-5 for that question (smoothed towards the overall
+distribution, so roles with a single row do not always repeat it). Rows are
+generated and written block by block, so memory stays at one block however
+many rows are requested. The same seed, source and block size always
+produce the same file.
+
+    csv  psychometric_dataset.csv layout (Q1..Q20, Job_Role)
+    npy  a dataset cache directory (answers.npy, codes.npy, meta.json) that
+         training_data.load_dataset_cache maps directly
+
+Run:  python synthetic_data.py --rows 10000000 --output synthetic.csv [--format csv|npy] [--seed 0]
+"""
+
+import os
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from training_data import CACHE_META, LABEL_COLUMN, QUESTION_COLUMNS, CompactDataset, load_dataset, write_cache_meta
+
+ANSWER_LEVELS = 5
+DEFAULT_BLOCK_ROWS = 100000
+FORMATS = ('csv', 'npy')
+
+
+class AnswerModel:
+    """Class priors plus one categorical answer distribution per (job role, question)"""
+
+    def __init__(self, categories: List[str], priors: np.ndarray, probabilities: np.ndarray):
+        self.categories = list(categories)
+        self.priors = priors
+        self.probabilities = probabilities  # (n_classes, n_questions, ANSWER_LEVELS)
+        self._class_cdf = np.cumsum(priors)
+        self._class_cdf[-1] = 1.0
+        # Only the first ANSWER_LEVELS - 1 boundaries are needed for sampling;
+        # float32 keeps the per-block gather of boundaries small
+        self._answer_cdf = np.ascontiguousarray(np.cumsum(probabilities, axis=2)[:, :, :-1], dtype=np.float32)
+
+    @classmethod
+    def fit(cls, dataset: CompactDataset, smoothing: float = 1.0) -> 'AnswerModel':
+        """
+        Estimate the distributions from a dataset
+
+        Args:
+            dataset: Real answers and job role codes
+            smoothing: Pseudo-rows of the overall answer distribution added to every role
+        """
+        n_classes, n_questions = len(dataset.categories), len(QUESTION_COLUMNS)
+        answers = np.asarray(dataset.answers, dtype=np.int64)
+        codes = np.asarray(dataset.codes, dtype=np.int64)
+        if answers.min() < 1 or answers.max() > ANSWER_LEVELS:
+            raise ValueError(f"Answers must be between 1 and {ANSWER_LEVELS}")
+
+        # One bincount over (class, question, answer) cells
+        cells = (codes[:, np.newaxis] * n_questions + np.arange(n_questions)) * ANSWER_LEVELS + answers - 1
+        counts = np.bincount(cells.ravel(), minlength=n_classes * n_questions * ANSWER_LEVELS)
+        counts = counts.reshape(n_classes, n_questions, ANSWER_LEVELS).astype(np.float64)
+
+        overall = counts.sum(axis=0)
+        overall /= overall.sum(axis=1, keepdims=True)
+        counts += smoothing * overall
+        probabilities = counts / counts.sum(axis=2, keepdims=True)
+
+        priors = np.bincount(codes, minlength=n_classes).astype(np.float64)
+        priors /= priors.sum()
+        return cls(dataset.categories, priors, probabilities)
+
+    def sample(self, n: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        """n rows as (uint8 answers, int32 job role codes)"""
+        codes = np.searchsorted(self._class_cdf, rng.random(n), side='right').astype(np.int32)
+        np.minimum(codes, len(self.categories) - 1, out=codes)
+        u = rng.random((n, len(QUESTION_COLUMNS)), dtype=np.float32)
+        # Answer = 1 + number of CDF boundaries below u
+        answers = (u[:, :, np.newaxis] >= self._answer_cdf[codes]).sum(axis=2, dtype=np.uint8) + 1
+        return answers, codes
+
+
+def generate_blocks(model: AnswerModel, rows: int, seed: int = 0, block_rows: int = DEFAULT_BLOCK_ROWS):
+    """Yield (answers, codes) blocks; block i always comes from the generator seeded with (seed, i)"""
+    for index, start in enumerate(range(0, rows, block_rows)):
+        rng = np.random.default_rng([seed, index])
+        yield model.sample(min(block_rows, rows - start), rng)
+
+
+def _csv_lines(answers: np.ndarray, codes: np.ndarray, labels: np.ndarray) -> bytes:
+    """'a1,a2,...,a20,' for every row built in one array, then the label and newline appended"""
+    n, width = answers.shape
+    buffer = np.full((n, 2 * width), ord(','), dtype=np.uint8)
+    buffer[:, 0::2] = answers + ord('0')
+    prefixes = buffer.view(f'S{2 * width}').ravel()
+    return b''.join([prefix + label for prefix, label in zip(prefixes.tolist(), labels[codes].tolist())])
+
+
+def write_csv(model: AnswerModel, path: str, rows: int, seed: int = 0, block_rows: int = DEFAULT_BLOCK_ROWS,
+              verbose: bool = True):
+    """Stream rows into a CSV with the psychometric_dataset.csv header"""
+    labels = np.array([f"{category}\n".encode('utf-8') for category in model.categories], dtype=object)
+    tmp_path = path + '.tmp'
+    written = 0
+    with open(tmp_path, 'wb') as file:
+        file.write((','.join(QUESTION_COLUMNS + [LABEL_COLUMN]) + '\n').encode('ascii'))
+        for answers, codes in generate_blocks(model, rows, seed, block_rows):
+            file.write(_csv_lines(answers, codes, labels))
+            written += len(codes)
+            if verbose:
+                print(f"  wrote {written:,}/{rows:,} rows")
+    os.replace(tmp_path, path)
+
+
+def _npy_header(file, dtype, shape: Tuple[int, ...]):
+    np.lib.format.write_array_header_1_0(file, {"descr": np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                                                "fortran_order": False, "shape": shape})
+
+
+def write_npy(model: AnswerModel, directory: str, rows: int, seed: int = 0,
+              block_rows: int = DEFAULT_BLOCK_ROWS, verbose: bool = True):
+    """Stream rows into answers.npy / codes.npy plus a cache meta.json"""
+    os.makedirs(directory, exist_ok=True)
+    meta_path = os.path.join(directory, CACHE_META)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    # Header with the final shape first, then the rows appended block by block
+    # (plain writes, so finished blocks do not stay resident like a memmap)
+    written = 0
+    with open(os.path.join(directory, 'answers.npy'), 'wb') as answers_file, \
+            open(os.path.join(directory, 'codes.npy'), 'wb') as codes_file:
+        _npy_header(answers_file, np.uint8, (rows, len(QUESTION_COLUMNS)))
+        _npy_header(codes_file, np.int32, (rows,))
+        for answers, codes in generate_blocks(model, rows, seed, block_rows):
+            answers_file.write(np.ascontiguousarray(answers).tobytes())
+            codes_file.write(codes.tobytes())
+            written += len(codes)
+            if verbose:
+                print(f"  wrote {written:,}/{rows:,} rows")
+
+    # Written last, so an interrupted run never looks like a complete entry
+    write_cache_meta(directory, f"synthetic-seed{seed}-rows{rows}-block{block_rows}",
+                     'synthetic_data.py', 1, rows, model.categories)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate a large synthetic psychometric dataset")
+    parser.add_argument('--source', default='psychometric_dataset.csv', help='real dataset to learn from')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--output', required=True, help='CSV path, or directory for --format npy')
+    parser.add_argument('--format', choices=FORMATS, default='csv')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--block-rows', type=int, default=DEFAULT_BLOCK_ROWS)
+    parser.add_argument('--smoothing', type=float, default=1.0,
+                        help='pseudo-rows of the overall answer distribution per job role')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    model = AnswerModel.fit(load_dataset(args.source, min_class_count=1, verbose=False), args.smoothing)
+    print(f"Learned {len(model.categories)} job roles from {args.source}")
+    if args.format == 'csv':
+        write_csv(model, args.output, args.rows, args.seed, args.block_rows)
+    else:
+        write_npy(model, args.output, args.rows, args.seed, args.block_rows)
+    elapsed = time.perf_counter() - start
+    print(f"Generated {args.rows:,} rows into {args.output} in {elapsed:.1f}s ({args.rows / elapsed:,.0f} rows/s)")
@@ -0,0 +1,71 @@
+"""
+The precomputed recommendation table must rank paths exactly like
+CareerEngine.recommend_paths. Builds the full table (~15s, ~240 MB) once.
+"""
+
+import random
+
+import pytest
+
+from career_engine import CareerEngine
+from career_lookup import RecommendationTable, build_table, load_table, save_table
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return CareerEngine().freeze()
+
+
+@pytest.fixture(scope='module')
+def table(engine):
+    return RecommendationTable(*build_table(engine))
+
+
+def sample_inputs(engine, count, seed=0):
+    rng = random.Random(seed)
+    # Times on and around every threshold, plus the form default
+    thresholds = sorted(set(engine.min_time_per_week.tolist()))
+    times = [0, 10, 100] + [t + d for t in thresholds for d in (-1, -0.5, 0, 0.5)]
+    for _ in range(count):
+        responses = [rng.randint(1, 5) for _ in range(20)]
+        constraints = {
+            "time_per_week": rng.choice(times),
+            "internet": rng.random() < 0.7,
+            "financial": rng.choice(["low", "medium", "high"])
+        }
+        yield responses, constraints
+
+
+def test_lookup_matches_recommend_paths(engine, table):
+    for responses, constraints in sample_inputs(engine, 5000):
+        primary, secondary = engine.recommend_paths(engine.diagnose_profile(responses, constraints))
+        expected = ((primary["key"], primary["score"]), (secondary["key"], secondary["score"]))
+        assert table.lookup(responses, constraints) == expected, (responses, constraints)
+
+
+def test_lookup_matches_extreme_answers(engine, table):
+    constraints = {"time_per_week": 10}
+    for answer in range(1, 6):
+        responses = [answer] * 20
+        primary, secondary = engine.recommend_paths(engine.diagnose_profile(responses, constraints))
+        assert table.lookup(responses, constraints) == ((primary["key"], primary["score"]),
+                                                        (secondary["key"], secondary["score"]))
+
+
+def test_lookup_rejects_inputs_outside_the_table(table):
+    constraints = {"time_per_week": 10}
+    assert table.lookup([3] * 19, constraints) is None
+    assert table.lookup([3] * 19 + [6], constraints) is None
+    assert table.lookup([3] * 19 + [3.0], constraints) is None
+    assert table.lookup([3] * 20, {"time_per_week": "10"}) is None
+
+
+def test_saved_table_round_trips(engine, table, tmp_path):
+    table_path, meta_path = str(tmp_path / 'table.npy'), str(tmp_path / 'table.json')
+    save_table(table.table, table.meta, table_path, meta_path)
+    loaded = load_table(engine.path_fingerprint, table_path, meta_path)
+    assert loaded is not None
+    for responses, constraints in sample_inputs(engine, 200, seed=1):
+        assert loaded.lookup(responses, constraints) == table.lookup(responses, constraints)
+    assert load_table('stale', table_path, meta_path) is None
+
@@ -0,0 +1,66 @@
+"""
+The compiled forest must reproduce the shipped pipeline's predict_proba bit
+for bit, both in memory and after a round trip through the mmap bundle.
+"""
+
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forest_compiler import compile_pipeline, load_compiled, save_compiled
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(ROOT, 'career_recommendation_model.pkl')
+COLUMNS = [f'Q{i}' for i in range(1, 21)]
+
+
+@pytest.fixture(scope='module')
+def model():
+    if not os.path.exists(MODEL_PATH):
+        pytest.skip(f"{MODEL_PATH} not found (train it with career_model_trainer.py)")
+    with open(MODEL_PATH, 'rb') as file:
+        return pickle.load(file)
+
+
+@pytest.fixture(scope='module')
+def compiled(model):
+    return compile_pipeline(model)
+
+
+@pytest.fixture(scope='module')
+def batch():
+    return np.random.default_rng(0).integers(1, 6, size=(500, len(COLUMNS)))
+
+
+def sklearn_proba(model, X):
+    return model.predict_proba(pd.DataFrame(X, columns=COLUMNS))
+
+
+def test_predict_proba_matches_sklearn(model, compiled, batch):
+    assert list(compiled.classes_) == list(model.classes_)
+    assert np.array_equal(compiled.predict_proba(batch), sklearn_proba(model, batch))
+
+
+def test_single_row_matches_sklearn(model, compiled, batch):
+    for row in batch[:20]:
+        assert np.array_equal(compiled.predict_proba(row), sklearn_proba(model, row[np.newaxis, :]))
+
+
+def test_bundle_round_trip(model, compiled, batch, tmp_path):
+    manifest = save_compiled(compiled, str(tmp_path), MODEL_PATH)
+    loaded = load_compiled(str(tmp_path), mmap=True, verify=True)
+    assert isinstance(loaded.value, np.memmap)
+    assert loaded.version == manifest["version"]
+    assert np.array_equal(loaded.predict_proba(batch), sklearn_proba(model, batch))
+
+
+def test_bundle_rejects_modified_arrays(compiled, tmp_path):
+    save_compiled(compiled, str(tmp_path))
+    threshold = np.load(tmp_path / 'threshold.npy')
+    threshold[0] += 1.0
+    np.save(tmp_path / 'threshold.npy', threshold)
+    with pytest.raises(ValueError):
+        load_compiled(str(tmp_path))
@@ -0,0 +1,318 @@
+"""
+Training Data Ingestion
+Streams the psychometric dataset into compact arrays for the trainer.
+
+The CSV is read in chunks with uint8 answers, and Job_Role is parsed as a
+categorical and kept as int32 codes into a small category list instead of
+per-row Python strings. Rows go straight into arrays preallocated from a
+newline count, and the class counts come from those codes, so dropping
+single-entry job roles is an in-place compaction of the arrays rather than
+a second read of the file. Peak memory stays close to n_rows * 24 bytes
+plus one chunk.
+
+The result can be cached as .npy files keyed by the CSV's content hash
+(load_cached_dataset); later runs memory-map them in milliseconds instead
+of parsing the CSV again.
+
+Build the cache with:  python training_data.py [dataset.csv]
+"""
+
+import json
+import os
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from forest_compiler import file_sha256
+
+QUESTION_COLUMNS = [f'Q{i}' for i in range(1, 21)]  # Q1 to Q20
+LABEL_COLUMN = 'Job_Role'
+
+DEFAULT_CHUNKSIZE = 100000
+
+# Binary cache: one directory per (source content hash, min_class_count)
+DATASET_CACHE_DIR = 'dataset_cache'
+CACHE_INDEX = 'index.json'
+CACHE_META = 'meta.json'
+CACHE_FORMAT = 1
+
+
+class CompactDataset:
+    """Answers as an (N, 20) uint8 matrix plus int32 label codes"""
+
+    def __init__(self, answers: np.ndarray, codes: np.ndarray, categories: List[str]):
+        self.answers = answers
+        self.codes = codes
+        self.categories = categories
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        return self.answers.nbytes + self.codes.nbytes
+
+    def class_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.codes, minlength=len(self.categories))
+        return {category: int(count) for category, count in zip(self.categories, counts) if count}
+
+    def features(self) -> pd.DataFrame:
+        """Answers as a DataFrame with the Q1..Q20 column names the model is fitted with"""
+        return pd.DataFrame(self.answers, columns=QUESTION_COLUMNS, copy=False)
+
+    def labels(self) -> pd.Categorical:
+        """Job_Role labels as a categorical (one small string table plus the codes)"""
+        return pd.Categorical.from_codes(self.codes, categories=self.categories)
+
+
+def count_rows(path: str, block_size: int = 1 << 22) -> int:
+    """Number of data rows in a CSV with a header line (newline count, no parsing)"""
+    lines = 0
+    last = b'\n'
+    with open(path, 'rb') as file:
+        while True:
+            block = file.read(block_size)
+            if not block:
+                break
+            lines += block.count(b'\n')
+            last = block[-1:]
+    if last != b'\n':
+        lines += 1  # final line without a trailing newline
+    return max(lines - 1, 0)
+
+
+def read_chunks(path: str, chunksize: int = DEFAULT_CHUNKSIZE):
+    """Iterate over the CSV as DataFrames with uint8 answers and categorical labels"""
+    dtypes = {column: np.uint8 for column in QUESTION_COLUMNS}
+    dtypes[LABEL_COLUMN] = 'category'
+    return pd.read_csv(path, usecols=QUESTION_COLUMNS + [LABEL_COLUMN], dtype=dtypes, chunksize=chunksize)
+
+
+def load_dataset(path: str = 'psychometric_dataset.csv', chunksize: int = DEFAULT_CHUNKSIZE,
+                 min_class_count: int = 2, verbose: bool = True) -> CompactDataset:
+    """
+    Stream a psychometric CSV into a CompactDataset
+
+    Args:
+        path: CSV with Q1..Q20 answers and a Job_Role column
+        chunksize: Rows parsed per chunk
+        min_class_count: Job roles with fewer rows are dropped (2 removes single-entry jobs)
+        verbose: Print progress and the class distribution
+
+    Returns:
+        CompactDataset with the remaining rows in file order
+    """
+    capacity = count_rows(path)
+    answers = np.empty((capacity, len(QUESTION_COLUMNS)), dtype=np.uint8)
+    codes = np.empty(capacity, dtype=np.int32)
+    category_index: Dict[str, int] = {}
+    categories: List[str] = []
+
+    filled = 0
+    for chunk in read_chunks(path, chunksize):
+        if chunk[LABEL_COLUMN].isnull().any():
+            raise ValueError(f"Missing {LABEL_COLUMN} values in {path} near row {filled}")
+        n = len(chunk)
+        if filled + n > capacity:
+            raise ValueError(f"{path} has more rows than counted ({capacity}); was it modified while reading?")
+
+        answers[filled:filled + n] = chunk[QUESTION_COLUMNS].to_numpy()
+        # Each chunk has its own categories; map them onto the global code list
+        labels = chunk[LABEL_COLUMN].cat
+        for label in labels.categories:
+            if label not in category_index:
+                category_index[label] = len(categories)
+                categories.append(label)
+        chunk_to_global = np.array([category_index[label] for label in labels.categories], dtype=np.int32)
+        codes[filled:filled + n] = chunk_to_global[labels.codes.to_numpy()]
+        filled += n
+        if verbose and capacity > chunksize:
+            print(f"  read {filled:,}/{capacity:,} rows")
+
+    answers = answers[:filled]
+    codes = codes[:filled]
+    if verbose:
+        print("Dataset Shape:", (filled, len(QUESTION_COLUMNS) + 1))
+        print(f"Compact size: {(answers.nbytes + codes.nbytes) / 1e6:.1f} MB "
+              f"(uint8 answers, {len(categories)} job role codes)")
+
+    counts = np.bincount(codes, minlength=len(categories))
+    rare = np.flatnonzero(counts < min_class_count)
+    if len(rare):
+        if verbose:
+            print(f"\nRemoving {len(rare)} job roles with fewer than {min_class_count} entries")
+        filled = compact_rows(answers, codes, counts >= min_class_count, chunksize)
+        answers = answers[:filled]
+        codes = codes[:filled]
+
+    # Drop the removed roles from the category list and renumber the codes
+    used = np.flatnonzero(np.bincount(codes, minlength=len(categories)))
+    if len(used) < len(categories):
+        remap = np.full(len(categories), -1, dtype=np.int32)
+        remap[used] = np.arange(len(used), dtype=np.int32)
+        codes[:] = remap[codes]
+        categories = [categories[i] for i in used]
+
+    return CompactDataset(answers, codes, categories)
+
+
+def compact_rows(answers: np.ndarray, codes: np.ndarray, keep_class: np.ndarray,
+                 block_size: int = DEFAULT_CHUNKSIZE) -> int:
+    """
+    Move rows whose class is kept to the front, in place and in order
+
+    Works block by block so the only temporary is one block of kept rows.
+
+    Returns:
+        Number of rows kept
+    """
+    write = 0
+    for start in range(0, len(codes), block_size):
+        block_codes = codes[start:start + block_size]
+        mask = keep_class[block_codes]
+        kept = int(mask.sum())
+        if kept == len(block_codes) and write == start:
+            write += kept
+            continue
+        # write <= start, so the destination never overlaps unread rows
+        answers[write:write + kept] = answers[start:start + block_size][mask]
+        codes[write:write + kept] = block_codes[mask]
+        write += kept
+    return write
+
+
+def describe(dataset: CompactDataset, head: int = 5, show_distribution: bool = True,
+             max_classes: Optional[int] = None) -> None:
+    """Print the first rows and the class distribution like the original trainer"""
+    print("\nFirst few rows:")
+    preview = dataset.features().head(head).copy()
+    preview[LABEL_COLUMN] = [dataset.categories[code] for code in dataset.codes[:head]]
+    print(preview)
+    if show_distribution:
+        print("\nJob role distribution:")
+        for i, (job, count) in enumerate(dataset.class_counts().items()):
+            if max_classes is not None and i >= max_classes:
+                print(f"... ({len(dataset.categories) - max_classes} more)")
+                break
+            print(f"{job}: {count}")
+
+
+def source_hash(path: str, cache_dir: str = DATASET_CACHE_DIR) -> str:
+    """
+    Content hash of a source CSV
+
+    The hash is remembered per (path, size, mtime) in the cache index, so an
+    unchanged file is not re-read just to find its cache entry.
+    """
+    index_path = os.path.join(cache_dir, CACHE_INDEX)
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    index = {}
+    if os.path.exists(index_path):
+        try:
+            with open(index_path) as file:
+                index = json.load(file)
+        except (OSError, ValueError):
+            index = {}
+    entry = index.get(key)
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return entry["sha256"]
+
+    digest = file_sha256(path)
+    index[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+    os.makedirs(cache_dir, exist_ok=True)
+    _write_json(index_path, index)
+    return digest
+
+
+def _write_json(path: str, payload: Dict):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    with os.fdopen(fd, 'w') as file:
+        json.dump(payload, file, indent=2)
+    os.replace(tmp_path, path)
+
+
+def cache_entry_dir(digest: str, min_class_count: int, cache_dir: str = DATASET_CACHE_DIR) -> str:
+    """Cache directory for one source hash and filtering setting"""
+    return os.path.join(cache_dir, f"{digest[:16]}-min{min_class_count}")
+
+
+def save_dataset_cache(dataset: CompactDataset, directory: str, digest: str, source_path: str,
+                       min_class_count: int):
+    """Write answers.npy, codes.npy and meta.json (written last, so its presence marks a complete entry)"""
+    os.makedirs(directory, exist_ok=True)
+    for name, array in (('answers', dataset.answers), ('codes', dataset.codes)):
+        tmp_path = os.path.join(directory, f"{name}.tmp.npy")
+        np.save(tmp_path, np.ascontiguousarray(array))
+        os.replace(tmp_path, os.path.join(directory, f"{name}.npy"))
+    write_cache_meta(directory, digest, os.path.abspath(source_path), min_class_count, len(dataset), dataset.categories)
+
+
+def write_cache_meta(directory: str, digest: str, source: str, min_class_count: int, rows: int,
+                     categories: List[str]):
+    """meta.json of a cache entry whose answers.npy and codes.npy are complete"""
+    _write_json(os.path.join(directory, CACHE_META), {
+        "format": CACHE_FORMAT,
+        "source": source,
+        "source_sha256": digest,
+        "min_class_count": min_class_count,
+        "rows": rows,
+        "columns": QUESTION_COLUMNS,
+        "categories": categories
+    })
+
+
+def load_dataset_cache(directory: str, digest: Optional[str] = None) -> Optional[CompactDataset]:
+    """Memory-map a cache entry; None if it is missing, incomplete or for another source"""
+    meta_path = os.path.join(directory, CACHE_META)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as file:
+        meta = json.load(file)
+    if meta.get("format") != CACHE_FORMAT or (digest is not None and meta.get("source_sha256") != digest):
+        return None
+    answers = np.load(os.path.join(directory, 'answers.npy'), mmap_mode='r')
+    codes = np.load(os.path.join(directory, 'codes.npy'), mmap_mode='r')
+    if answers.shape != (meta["rows"], len(QUESTION_COLUMNS)) or codes.shape != (meta["rows"],):
+        return None
+    return CompactDataset(answers, codes, meta["categories"])
+
+
+def load_cached_dataset(path: str = 'psychometric_dataset.csv', cache_dir: str = DATASET_CACHE_DIR,
+                        chunksize: int = DEFAULT_CHUNKSIZE, min_class_count: int = 2,
+                        rebuild: bool = False, verbose: bool = True) -> CompactDataset:
+    """
+    Load the dataset from the binary cache, (re)building it from the CSV when the source changed
+
+    Returns:
+        CompactDataset backed by read-only memory maps
+    """
+    started = time.perf_counter()
+    digest = source_hash(path, cache_dir)
+    directory = cache_entry_dir(digest, min_class_count, cache_dir)
+
+    dataset = None if rebuild else load_dataset_cache(directory, digest)
+    if dataset is not None:
+        if verbose:
+            print(f"Dataset cache hit: {directory} ({len(dataset):,} rows, "
+                  f"{dataset.nbytes / 1e6:.1f} MB mapped in {1000 * (time.perf_counter() - started):.1f} ms)")
+        return dataset
+
+    if verbose:
+        print(f"Building dataset cache {directory} from {path}")
+    dataset = load_dataset(path, chunksize, min_class_count, verbose)
+    save_dataset_cache(dataset, directory, digest, path, min_class_count)
+    return load_dataset_cache(directory, digest)
+
+
+if __name__ == '__main__':
+    import sys
+
+    start = time.perf_counter()
+    dataset = load_cached_dataset(sys.argv[1] if len(sys.argv) > 1 else 'psychometric_dataset.csv')
+    print(f"Loaded {len(dataset):,} rows, {len(dataset.categories)} job roles, "
+          f"{dataset.nbytes / 1e6:.1f} MB in {time.perf_counter() - start:.2f}s")
+    describe(dataset, max_classes=20)